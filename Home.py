@@ -5,10 +5,9 @@ import logging
 import traceback
 from pathlib import Path
 from dotenv import load_dotenv
-from liquid import Template
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
-from agents.content_generation_agent import ContentGenerationAgent
+from agents.content_generation_agent import ContentGenerationAgent, get_reuse_stats
 from agents.translation_agent import TranslationAgent
 from agents.evaluation_agent import EvaluationAgent
 from agents.platform_optimizer_agent import optimize_for_platform
@@ -17,20 +16,23 @@ from agents.agent_state import AgentState
 from audience import Audience
 from repositories.audience_repository import AudienceRepository
 from repositories.campaign_repository import CampaignRepository
+from repositories.template_repository import TemplateRepository
+from repositories.vector_reconciliation import start_background_reconciliation
 from utils.ui_components import init_page_settings, load_css
 from utils.llm_queries import predefined_query, DefaultPrompts
 from utils.mongodb_utils import MongoDBClient
-from campaign import Campaign
+from utils.template_cache import get_template_cache
+from utils.liquid_templates import render_languages, get_liquid_stats
+from campaign import Campaign, prompt_hash
 from components import CampaignWizard
 import streamlit as st
 from utils.deepeval_openai import DeepEvalOpenAI
 from utils.openai_utils import get_openai_model
-from weasyprint import HTML
+from utils.export_pipeline import MIME_TYPES, get_export_pipeline
+from utils.artifact_cache import get_artifact_cache
 from html2docx import html2docx
-from pdf2docx import Converter
 import pypandoc
 import ssl
-import io
 
 # Monitoring and compliance
 from utils.monitoring import track_execution_time, track_metric
@@ -41,30 +43,32 @@ ssl._create_default_https_context = ssl._create_unverified_context
 load_dotenv(override=True)
 logging.basicConfig(level=logging.INFO)
 
+# Campaigns listed per page in the Campaigns tab
+CAMPAIGN_PAGE_SIZE = 50
+
 # Set Streamlit page configuration
 init_page_settings()
 load_css("./static/ui/css/styles.css")
 
 def apply_template(content_dict, html_template):
     try:
-        template = Template(html_template)
-        return {lang: template.render(**content) for lang, content in content_dict.items()}
+        # Accept a parsed template or Liquid source (parsed once via the shared cache)
+        return render_languages(html_template, content_dict)
     except Exception as e:
         logging.error(f"Error applying template: {e}")
         return {}
 
-def generate_content(user_query, template_name, state, prompts, add_context, selected_audience_name, selected_audience_description, selected_platform=None):
+def generate_content(user_query, template_name, state, prompts, add_context, selected_audience_name, selected_audience_description, selected_platform=None, reuse_campaigns=True):
     try:
         model = get_openai_model()
-        mongodb_client = MongoDBClient("content_templates")
-        content_template = mongodb_client.get_template_by_name(template_name)
+        content_template = get_template_cache().get(template_name)
 
         if not content_template:
             logging.warning(f"Template '{template_name}' not found.")
             return f"Template '{template_name}' not found.", state
 
         repository = CampaignRepository("campaigns", "campaign_embedding_collection")
-        content_agent = ContentGenerationAgent(model, repository, prompts['system_prompt'], add_context=add_context)
+        content_agent = ContentGenerationAgent(model, repository, prompts['system_prompt'], add_context=add_context, reuse_campaigns=reuse_campaigns)
         user_query_template = ChatPromptTemplate.from_template(
             "{user_query}\nTemplate: ```{html_template}```\nTemplate items: ```{template_items}```"
         )
@@ -81,10 +85,16 @@ def generate_content(user_query, template_name, state, prompts, add_context, sel
             content_template=content_template,
             selected_audience_name=selected_audience_name,
             selected_audience_description=selected_audience_description,
-            selected_platform=selected_platform
+            selected_platform=selected_platform,
+            user_query=user_query
         )
 
         interim_state = content_agent.graph.invoke(agent_state)
+        # Generation inputs, saved with the campaign so reuse only matches identical ones
+        state['user_query'] = user_query
+        state['selected_audience_name'] = selected_audience_name
+        state['selected_platform'] = selected_platform
+        state['system_prompt_hash'] = prompt_hash(prompts['system_prompt'])
         state.update(interim_state)
 
         # Log generated JSON content
@@ -92,11 +102,19 @@ def generate_content(user_query, template_name, state, prompts, add_context, sel
         logging.info(f"Generated JSON content: {json.dumps(generated_json, indent=2)}")
 
         content_dict = {'en-US': generated_json}
-        translated_htmls = apply_template(content_dict, content_template['liquid_template'])
+        parsed_template = get_template_cache().get_parsed(template_name)
+        if parsed_template is None:
+            # Deleted while the content was being generated
+            logging.warning(f"Template '{template_name}' not found.")
+            return f"Template '{template_name}' not found.", state
+        translated_htmls = apply_template(content_dict, parsed_template)
 
         english_html = translated_htmls['en-US']
         logging.info(f"english_html: {english_html}")
 
+        # Buffered write-behind increment, no database round trip here
+        TemplateRepository().increment_usage_count(template_name, content_template.get('workspace_id'))
+
         # Week 4: Platform optimization (if platform selected)
         if selected_platform:
             logging.info(f"Optimizing content for platform: {selected_platform}")
@@ -131,6 +149,13 @@ def generate_content(user_query, template_name, state, prompts, add_context, sel
             # Return HTML with language header (no optimization)
             formatted_html = f"<h3>Generated Content (en-US)</h3>\n{english_html}"
 
+        reused = interim_state.get('reused_campaign')
+        if reused:
+            formatted_html = (
+                f"<p>♻️ Reused saved campaign <b>{reused['name']}</b> (query distance {reused['distance']:.3f}); "
+                f"generation, translation and evaluation were skipped.</p>\n{formatted_html}"
+            )
+
         return formatted_html, state
     except Exception as e:
         logging.error(f"Error generating content: {e}")
@@ -147,7 +172,10 @@ def translate_content(state, selected_languages, prompts):
         )
 
         state['selected_languages'] = selected_languages
-        final_state = translation_agent.graph.invoke(state)
+        if state.get('reused_campaign') and all(lang in state.get('translations', {}) for lang in selected_languages):
+            final_state = state  # translations come with the reused campaign
+        else:
+            final_state = {**translation_agent.graph.invoke(state), 'reused_campaign': None}
         state.update(final_state)
 
         translations = {lang: final_state['translations'][lang] for lang in selected_languages}
@@ -173,8 +201,7 @@ def evaluate_translations(state, eval_model, selected_metrics):
 def update_query():
     try:
         template_name = st.session_state.template_name
-        mongodb_client = MongoDBClient("content_templates")
-        content_template = mongodb_client.get_template_by_name(template_name)
+        content_template = get_template_cache().get(template_name)
         st.session_state.user_query = content_template['example_query']
     except Exception as e:
         logging.error(f"Error updating query: {e}")
@@ -215,9 +242,19 @@ def save_campaign_dialog(state):
         if st.button("Save"):
             if campaign_name:
                 localized_content = {'en-US': json.loads(state['initial_english_content']), **state['translations']}
-                campaign = Campaign(name=campaign_name, localized_content=localized_content, liquid_template=state['content_template']['liquid_template'])
+                campaign = Campaign(
+                    name=campaign_name,
+                    localized_content=localized_content,
+                    liquid_template=state['content_template']['liquid_template'],
+                    workspace_id=state['content_template'].get('workspace_id') or "default",
+                    platform=state.get('selected_platform'),
+                    source_query=state.get('user_query'),
+                    audience_name=state.get('selected_audience_name') or "",
+                    system_prompt_hash=state.get('system_prompt_hash')
+                )
                 repository = CampaignRepository("campaigns", "campaign_embedding_collection")
                 repository.save_campaign(campaign)
+                st.session_state.pop('campaign_summaries', None)  # reload listing
                 st.success(f"Campaign '{campaign_name}' saved successfully!")
             else:
                 st.error("Campaign name cannot be empty.")
@@ -232,33 +269,60 @@ def save_campaign_dialog(state):
         st.error("An error occurred while saving the campaign.")
 
 
-# Функция для сохранения HTML в PDF и DOCX
-def generate_pdf(html_content):
-    pdf = HTML(string=html_content).write_pdf()
-    return io.BytesIO(pdf)
-
-
-def generate_docx(html_content):
-    # Конвертируем HTML в PDF в памяти
-    pdf_io = generate_pdf(html_content)
-
-    # Конвертируем PDF в DOCX
-    docx_io = io.BytesIO()
-    with open("temp.pdf", "wb") as temp_pdf:
-        temp_pdf.write(pdf_io.getvalue())
-
-    cv = Converter("temp.pdf")
-    cv.convert(docx_io, start=0, end=None)
-    cv.close()
-
-    return docx_io
+def load_shown_campaign(campaigns_client, campaign_id):
+    """Campaign name and per-language HTML, kept in session state across reruns (None if the campaign is gone)."""
+    shown = st.session_state.get('shown_campaign')
+    if shown and shown['id'] == campaign_id:
+        return shown
+
+    campaign = campaigns_client.get_campaign(campaign_id)
+    if campaign is None:
+        # Deleted or unknown: forget it so later reruns don't keep failing
+        st.session_state.pop('shown_campaign_id', None)
+        st.session_state.pop('shown_campaign', None)
+        return None
+    shown = {
+        'id': campaign_id,
+        'name': campaign.name,
+        'htmls': apply_template(campaign.localized_content, campaign.liquid_template)
+    }
+    st.session_state['shown_campaign'] = shown
+    return shown
+
+def show_export_download(placeholder, shown, lang, fmt, data):
+    placeholder.download_button(
+        label=f"Download {lang} as {fmt.upper()}",
+        data=data,
+        file_name=f"{shown['name']}_{lang}.{fmt}",
+        mime=MIME_TYPES[fmt],
+        key=f"{fmt}_{shown['id']}_{lang}"
+    )
+
+def export_campaign(shown, fmt, placeholders, exported):
+    """Export languages not in the artifact cache yet, showing each download as it finishes."""
+    pending = [(lang, html) for lang, html in shown['htmls'].items() if lang not in exported]
+    for lang, _ in pending:
+        placeholders[lang].caption(f"⏳ Exporting {lang} to {fmt.upper()}...")
+
+    for lang, data, error in get_export_pipeline().export_many(pending, fmt):
+        if error is not None:
+            placeholders[lang].error(f"Export of {lang} to {fmt.upper()} failed.")
+            continue
+        show_export_download(placeholders[lang], shown, lang, fmt, data)
 
 @st.cache_resource(ttl=10)  # Cache for 10 seconds
 def get_cached_tracker():
     """Get cached API usage tracker to avoid file I/O on every rerun"""
     return get_tracker()
 
+@st.cache_resource
+def start_vector_reconciliation():
+    """Start the vector store reconciliation job once per server process"""
+    return start_background_reconciliation()
+
 def main():
+    start_vector_reconciliation()
+
     # Show disclaimer on first load
     if 'disclaimer_shown' not in st.session_state:
         show_first_time_disclaimer()
@@ -283,6 +347,24 @@ def main():
 
         st.metric("Total Tokens", f"{summary['total_tokens']:,}")
 
+        reuse_stats = get_reuse_stats()
+        if reuse_stats['checked']:
+            st.metric("Campaign Reuse Rate", f"{reuse_stats['reuse_rate']:.0%}", help=f"{reuse_stats['reused']} of {reuse_stats['checked']} generations served from saved campaigns")
+
+        liquid_stats = get_liquid_stats()
+        if liquid_stats['renders']:
+            st.caption(
+                f"Liquid: {liquid_stats['hit_rate']:.0%} parse cache hits, "
+                f"{liquid_stats['avg_parse_ms']:.1f} ms/parse, {liquid_stats['avg_render_ms']:.1f} ms/render"
+            )
+
+        export_cache_stats = get_artifact_cache().get_stats()
+        if export_cache_stats['hits'] + export_cache_stats['misses']:
+            st.caption(
+                f"Exports: {export_cache_stats['hit_rate']:.0%} served from cache, "
+                f"{export_cache_stats['bytes'] / 1024 / 1024:.1f} MB cached"
+            )
+
         if summary['total_cost'] > 80:
             st.warning("⚠️ Approaching budget limit!")
 
@@ -331,8 +413,7 @@ def main():
 
     with ((main_tabs[0])):  # "Create New" tab
         try:
-            mongodb_client = MongoDBClient("content_templates")
-            templates = mongodb_client.get_templates()
+            templates = get_template_cache().get_all()
             template_names = [template['name'] for template in templates]
             default_template = template_names[0] if template_names else ""
             # "Game Features Promotion"
@@ -351,18 +432,12 @@ def main():
             state = st.session_state.get('state', {'messages': [], 'evaluation': {}, 'translations': {}, 'initial_english_content': '', 'selected_languages': [], 'content_template': None, 'criticisms': '', 'selected_audience_name': '', 'selected_audience_description': ''})
             prompts = st.session_state.get('prompts', default_prompts)
             history = st.session_state.get('history', [])
-            campaigns = st.session_state.get('campaigns', [])
-            campaigns_client = MongoDBClient("campaigns")
 
             # Audience repository and fetching audiences
             audience_repository = AudienceRepository("audiences")
             audiences = audience_repository.get_audiences()
             audience_names = [audience.name for audience in audiences]
 
-            if not campaigns:
-                campaigns = campaigns_client.get_campaigns()
-                st.session_state['campaigns'] = campaigns
-
             # Check for demo data loaded from Getting Started page
             if st.session_state.get('demo_loaded', False):
                 st.session_state['user_query'] = st.session_state.get('demo_query', default_query)
@@ -532,6 +607,12 @@ def main():
                         key='add_context',
                         help="🔍 Use RAG to find similar campaigns and improve content quality"
                     )
+                    st.checkbox(
+                        "Reuse Similar Campaigns",
+                        value=True,
+                        key='reuse_campaigns',
+                        help="♻️ Reuse a saved campaign generated from a near-identical query instead of generating again"
+                    )
                     col1_1, col1_2 = st.columns(2)
                     generate_button = col1_1.button("Generate", use_container_width=True)
                     show_template_button = col1_2.button("Show Template", use_container_width=True)
@@ -581,7 +662,7 @@ def main():
                 save_campaign_dialog(state)
 
             if show_template_button:
-                handle_show_template(template_name, mongodb_client, history)
+                handle_show_template(template_name, history)
 
             with chat_placeholder:
                 for query, response in history:
@@ -608,47 +689,62 @@ def main():
 
     with main_tabs[1]:  # "Campaigns" tab
         try:
+            campaigns_client = MongoDBClient("campaigns")
+
+            # Listing holds only id/name/created_at; pages are fetched on demand
+            if 'campaign_summaries' not in st.session_state:
+                load_campaign_page(campaigns_client)
+            campaign_summaries = st.session_state['campaign_summaries']
+            campaign_names = {summary['id']: summary['name'] for summary in campaign_summaries}
+
             col1, col2 = st.columns([1, 2])
 
             with col1:
                 st.subheader("Saved Campaigns")
-                campaign_names = [campaign.name for campaign in campaigns]
-                selected_campaign_name = st.selectbox("Select Campaign", campaign_names)
+                selected_campaign_id = st.selectbox(
+                    "Select Campaign",
+                    list(campaign_names),
+                    format_func=lambda campaign_id: campaign_names[campaign_id]
+                )
                 col1_7, col1_8 = st.columns(2)
                 refresh_button = col1_7.button("Refresh", use_container_width=True)
                 show_campaign_button = col1_8.button("Show Campaign", use_container_width=True)
+                if st.session_state.get('campaign_cursor'):
+                    if st.button("Load More", use_container_width=True):
+                        load_campaign_page(campaigns_client, st.session_state['campaign_cursor'])
+                        st.rerun()
 
             with col2:
-                if show_campaign_button:
-                    selected_campaign = next(
-                        campaign for campaign in campaigns if campaign.name == selected_campaign_name)
-                    content_dict = selected_campaign.localized_content
-                    translated_htmls = apply_template(content_dict, selected_campaign.liquid_template)
-
-                    st.markdown(f"### Campaign: {selected_campaign_name}")
-
-                    for lang, html in translated_htmls.items():
+                if show_campaign_button and selected_campaign_id:
+                    st.session_state['shown_campaign_id'] = selected_campaign_id
+
+                # Stays shown across reruns (e.g. after a download click)
+                shown_campaign_id = st.session_state.get('shown_campaign_id')
+                shown = load_shown_campaign(campaigns_client, shown_campaign_id) if shown_campaign_id else None
+                if shown_campaign_id and shown is None:
+                    st.warning("This campaign no longer exists.")
+                if shown:
+                    st.markdown(f"### Campaign: {shown['name']}")
+
+                    # Nothing is exported until a format is requested
+                    col2_1, col2_2 = st.columns(2)
+                    export_format = col2_1.selectbox("Export Format", list(MIME_TYPES), format_func=str.upper, key='export_format')
+                    export_button = col2_2.button("Export All Languages", use_container_width=True)
+
+                    # Already exported documents are served from the disk cache (no rendering)
+                    export_pipeline = get_export_pipeline()
+                    placeholders, exported = {}, set()
+                    for lang, html in shown['htmls'].items():
                         with st.expander(f"Language: {lang}"):
                             st.components.v1.html(html, height=600, scrolling=True)
+                            placeholders[lang] = st.empty()
+                            data = export_pipeline.cached(html, export_format)
+                            if data is not None:
+                                exported.add(lang)
+                                show_export_download(placeholders[lang], shown, lang, export_format, data)
 
-                            pdf_io = generate_pdf(html)
-                            docx_io = generate_docx(html)
-
-                            st.download_button(
-                                label=f"Download {lang} as PDF",
-                                data=pdf_io,
-                                file_name=f"{selected_campaign_name}_{lang}.pdf",
-                                mime="application/pdf",
-                                key=f"pdf_{selected_campaign_name}_{lang}"
-                            )
-
-                            st.download_button(
-                                label=f"Download {lang} as DOCX",
-                                data=docx_io,
-                                file_name=f"{selected_campaign_name}_{lang}.docx",
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                key=f"docx_{selected_campaign_name}_{lang}"
-                            )
+                    if export_button:
+                        export_campaign(shown, export_format, placeholders, exported)
 
             if refresh_button:
                 handle_refresh(campaigns_client, spinner_placeholder)
@@ -755,6 +851,8 @@ def handle_generate(user_query, template_name, state, prompts, history, spinner_
                         "pattern": viral_result.get('pattern_name', '')
                     }
                     state['initial_english_content'] = json.dumps(viral_content_json)
+                    # Not generated from the system prompt: never offered for reuse
+                    state.update({'user_query': user_query, 'selected_audience_name': selected_audience_name, 'selected_platform': selected_platform, 'system_prompt_hash': None})
                     new_state = state
 
                 else:
@@ -767,7 +865,8 @@ def handle_generate(user_query, template_name, state, prompts, history, spinner_
                         add_context,
                         selected_audience_name,
                         selected_audience_description,
-                        selected_platform  # Week 4: Platform optimization
+                        selected_platform,  # Week 4: Platform optimization
+                        st.session_state.get('reuse_campaigns', True)
                     )
 
         # Update the chat history with the generated content
@@ -808,6 +907,9 @@ def handle_clear(default_prompts):
 
 def handle_evaluate(state, selected_metrics, history, spinner_placeholder):
     try:
+        if state.get('reused_campaign'):
+            st.info(f"Content reused from saved campaign '{state['reused_campaign']['name']}', evaluation skipped.")
+            return
         eval_model = DeepEvalOpenAI(model=get_openai_model())
         with spinner_placeholder:
             with st.spinner("Evaluating..."):
@@ -833,22 +935,33 @@ def handle_update_prompts(system_prompt, translate_prompt, criticize_prompt, ref
         logging.error(f"Error updating prompts: {e}")
         st.error("An error occurred while updating prompts.")
 
+def load_campaign_page(campaigns_client, after=None):
+    """Fetch one page of campaign summaries into session state (appends when after is set)."""
+    summaries, next_cursor = campaigns_client.get_campaign_page(limit=CAMPAIGN_PAGE_SIZE, after=after)
+    if after:
+        summaries = st.session_state.get('campaign_summaries', []) + summaries
+    st.session_state['campaign_summaries'] = summaries
+    st.session_state['campaign_cursor'] = next_cursor
+
 def handle_refresh(campaigns_client, spinner_placeholder):
     try:
         with spinner_placeholder:
             with st.spinner("Refreshing..."):
-                campaigns = campaigns_client.get_campaigns()
-                st.session_state['campaigns'] = campaigns
+                load_campaign_page(campaigns_client)
     except Exception as e:
         logging.error(f"Error refreshing campaigns: {e}")
         st.error("An error occurred while refreshing campaigns.")
 
-def handle_show_campaign(selected_campaign_name, campaigns, history, spinner_placeholder):
+def handle_show_campaign(selected_campaign_id, campaigns_client, history, spinner_placeholder):
     try:
-        if selected_campaign_name:
+        if selected_campaign_id:
             with spinner_placeholder:
                 with st.spinner("Loading..."):
-                    selected_campaign = next(campaign for campaign in campaigns if campaign.name == selected_campaign_name)
+                    selected_campaign = campaigns_client.get_campaign(selected_campaign_id)
+                    if selected_campaign is None:
+                        st.warning("This campaign no longer exists.")
+                        return
+                    selected_campaign_name = selected_campaign.name
                     content_dict = selected_campaign.localized_content
                     translated_htmls = apply_template(content_dict, selected_campaign.liquid_template)
                     st.markdown(f"### Campaign: {selected_campaign_name}")
@@ -858,9 +971,9 @@ def handle_show_campaign(selected_campaign_name, campaigns, history, spinner_pla
         logging.error(f"Error showing campaign: {e}")
         st.error("An error occurred while showing the campaign.")
 
-def handle_show_template(template_name, mongodb_client, history):
+def handle_show_template(template_name, history):
     try:
-        content_template = mongodb_client.get_template_by_name(template_name)
+        content_template = get_template_cache().get(template_name)
         template_content = content_template['liquid_template']
 
         # Support both old format (Name/Type/MaxLength) and new format (name/type/label)
@@ -20,6 +20,8 @@ class AgentState(TypedDict):
     evaluation: dict
     selected_audience_name: str
     selected_audience_description: str
+    user_query: str  # query as typed, before the template is appended
+    reused_campaign: Optional[dict]  # near-duplicate saved campaign the content was taken from
 
     # Week 4: Platform optimization fields
     selected_platform: Optional[str]  # instagram, facebook, telegram, linkedin
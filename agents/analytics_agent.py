@@ -6,15 +6,19 @@ insights explaining WHY content performed the way it did - the killer feature!
 
 Workflow:
 1. analyze_performance - Compare with industry benchmarks
-2. detect_patterns - Detect engagement patterns (spikes, declines, etc.)
+2. detect_patterns - Detect engagement patterns (spikes, declines, etc.) statistically
 3. generate_insights - Explain WHY content performed (KILLER FEATURE)
 4. generate_recommendations - Generate actionable next steps
 """
 
 import json
 import logging
-from datetime import date
-from typing import TypedDict, List, Dict, Optional
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, List, Dict, Optional, Tuple, Union
+
+import numpy as np
 
 from langgraph.graph import StateGraph, END
 from openai import OpenAI
@@ -25,6 +29,10 @@ from analytics.analytics_models import (
     EngagementPattern,
     ContentInsight,
 )
+from analytics.metrics_frame import MetricsFrame
+from analytics.pattern_detector import EngagementPatternDetector
+from analytics.running_aggregates import RunningAggregates
+from utils.api_cost_tracker import PRICING, track_openai_request
 from utils.openai_utils import get_openai_client
 
 logger = logging.getLogger(__name__)
@@ -34,7 +42,7 @@ logger = logging.getLogger(__name__)
 class AnalyticsState(TypedDict):
     """State for Analytics workflow."""
     campaign_id: str
-    metrics: List[CampaignMetrics]  # 30 days of data
+    metrics: Union[List[CampaignMetrics], MetricsFrame]  # 30 days of data
     benchmark: BenchmarkData
 
     # Analysis results
@@ -63,17 +71,17 @@ def analyze_performance(state: AnalyticsState) -> AnalyticsState:
         "worst_day": {"date": "2025-12-22", "views": 450}
     }
     """
-    metrics = state['metrics']
+    frame = MetricsFrame.coerce(state['metrics'])
     benchmark = state['benchmark']
 
     # Calculate totals
-    total_views = sum(m.views for m in metrics)
-    total_engagement = sum(m.likes + m.comments + m.shares for m in metrics)
+    total_views = int(frame.views.sum())
+    total_engagement = int(frame.total_engagement.sum())
     avg_engagement_rate = total_engagement / total_views if total_views > 0 else 0
 
-    # Find best/worst days
-    best_day = max(metrics, key=lambda m: m.views)
-    worst_day = min(metrics, key=lambda m: m.views)
+    # Find best/worst days (first occurrence)
+    best = int(np.argmax(frame.views))
+    worst = int(np.argmin(frame.views))
 
     # Compare with benchmark
     vs_benchmark_pct = ((avg_engagement_rate / benchmark.avg_engagement_rate) - 1) * 100
@@ -94,8 +102,8 @@ def analyze_performance(state: AnalyticsState) -> AnalyticsState:
         "total_views": total_views,
         "total_engagement": total_engagement,
         "avg_engagement_rate": avg_engagement_rate,
-        "best_day": {"date": str(best_day.date), "views": best_day.views},
-        "worst_day": {"date": str(worst_day.date), "views": worst_day.views}
+        "best_day": {"date": str(frame.dates[best]), "views": int(frame.views[best])},
+        "worst_day": {"date": str(frame.dates[worst]), "views": int(frame.views[worst])}
     }
 
     state['performance_summary'] = performance_summary
@@ -107,55 +115,65 @@ def analyze_performance(state: AnalyticsState) -> AnalyticsState:
 # Node 2: Detect Patterns
 def detect_patterns(state: AnalyticsState) -> AnalyticsState:
     """
-    Detect engagement patterns using AI.
+    Detect engagement patterns with the deterministic NumPy detector.
 
     Patterns to detect:
-    - Viral spikes (sudden 3x+ increase)
+    - Viral spikes (rolling z-score vs trailing week)
     - Weekend drops (consistent Sat/Sun decrease)
-    - Trending growth (increasing trend over time)
-    - Steep decline (sharp drop after initial surge)
+    - Trending growth (regression slope over time)
+    - Steep decline (sharp drop after initial surge, changepoint)
     - Consistent performance (stable engagement)
+
+    Borderline signals are dropped unless ANALYTICS_LLM_TIEBREAKER=true,
+    in which case the LLM decides which of them to keep.
     """
     metrics = state['metrics']
-    openai_client = get_openai_client()
 
-    # Prepare data for AI analysis
-    metrics_summary = [
-        {
-            "date": str(m.date),
-            "views": m.views,
-            "engagement_rate": f"{m.engagement_rate:.3f}",
-            "weekday": m.date.strftime("%A")
-        }
-        for m in metrics
-    ]
+    try:
+        patterns, borderline = EngagementPatternDetector().detect_with_candidates(metrics)
+
+        if borderline and os.getenv("ANALYTICS_LLM_TIEBREAKER", "false").lower() == "true":
+            patterns = sorted(
+                patterns + _break_pattern_ties(borderline, state.get('performance_summary', {})),
+                key=lambda p: p.date_range[0]
+            )
+
+        state['detected_patterns'] = patterns
+        logger.info(f"Detected {len(patterns)} engagement patterns ({len(borderline)} borderline)")
+
+    except Exception as e:
+        logger.error(f"Error detecting patterns: {e}")
+        state['detected_patterns'] = []
+
+    return state
+
+
+def _break_pattern_ties(
+    candidates: List[EngagementPattern],
+    performance: Dict
+) -> List[EngagementPattern]:
+    """
+    Ask the LLM which borderline patterns are worth reporting.
+
+    Only the candidate descriptions and the performance summary are sent,
+    not the raw daily metrics.
+    """
+    openai_client = get_openai_client()
 
     prompt = f"""
-Analyze these 30 days of campaign metrics and detect engagement patterns:
+These engagement patterns were detected just below statistical significance:
+
+{json.dumps([{"index": i, "type": p.pattern_type, "description": p.description} for i, p in enumerate(candidates)], indent=2)}
 
-Metrics: {json.dumps(metrics_summary, indent=2)}
+Performance Summary:
+{json.dumps(performance, indent=2)}
 
-Detect patterns such as:
-1. Viral Spike - Sudden 3x+ increase in views/engagement on specific day(s)
-2. Weekend Drop - Consistent decrease on Saturdays/Sundays
-3. Trending Growth - Steady increase over time
-4. Steep Decline - Sharp drop after initial surge
-5. Consistent Performance - Stable engagement throughout
+Which of them are meaningful enough to report to a marketer?
 
 Return JSON:
 {{
-    "patterns": [
-        {{
-            "pattern_type": "spike|decline|weekend_drop|consistent|trending",
-            "description": "Spike on Dec 15 (+350% views)",
-            "date_range": ["2025-12-15", "2025-12-17"],
-            "impact": "high|medium|low"
-        }},
-        ...
-    ]
+    "keep": [0, 2]
 }}
-
-Only report patterns that are clearly visible in the data.
 """
 
     try:
@@ -165,33 +183,13 @@ Only report patterns that are clearly visible in the data.
             response_format={"type": "json_object"}
         )
 
-        content = response.choices[0].message.content
-        # Clean JSON markers if present
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-
-        result = json.loads(content)
-        patterns = [
-            EngagementPattern(
-                pattern_type=p["pattern_type"],
-                description=p["description"],
-                date_range=(date.fromisoformat(p["date_range"][0]), date.fromisoformat(p["date_range"][1])),
-                impact=p["impact"]
-            )
-            for p in result.get("patterns", [])
-        ]
-
-        state['detected_patterns'] = patterns
-        logger.info(f"Detected {len(patterns)} engagement patterns")
+        result = json.loads(response.choices[0].message.content.strip())
+        keep = {int(i) for i in result.get("keep", [])}
+        return [p for i, p in enumerate(candidates) if i in keep]
 
     except Exception as e:
-        logger.error(f"Error detecting patterns: {e}")
-        state['detected_patterns'] = []
-
-    return state
+        logger.error(f"Error breaking pattern ties: {e}")
+        return []
 
 
 # Node 3: Generate Insights (WHY)
@@ -422,3 +420,378 @@ def analyze_campaign(
             "next_month_strategy": "",
             "error": str(e)
         }
+
+
+# Incremental analysis
+REANALYSIS_THRESHOLD = 0.10  # Re-run patterns/insights when a key signal moves by >10%
+
+
+def update_campaign_analytics(
+    campaign_id: str,
+    new_metrics: List[CampaignMetrics],
+    benchmark: BenchmarkData,
+    aggregates: Optional[RunningAggregates] = None,
+    previous_analysis: Optional[Dict] = None,
+    metrics_history: Optional[List[CampaignMetrics]] = None,
+    threshold: float = REANALYSIS_THRESHOLD
+) -> Dict:
+    """
+    Incrementally update campaign analytics with newly arrived daily metrics.
+
+    Aggregates are updated in O(1) per new day and the performance summary is
+    rebuilt from them. Pattern detection and insight generation re-run only
+    if the aggregates drifted more than threshold since the last analysis
+    (or there is no previous analysis); otherwise the previous patterns,
+    insights and recommendations are reused.
+
+    Args:
+        campaign_id: Campaign identifier
+        new_metrics: New daily metrics (after aggregates.last_date)
+        benchmark: Industry benchmark data
+        aggregates: Running aggregates (built from metrics_history + new_metrics if None)
+        previous_analysis: Result of the last full/incremental analysis
+        metrics_history: Metrics before new_metrics (needed only when re-analyzing)
+        threshold: Relative drift that triggers re-analysis
+
+    Returns:
+        Dict like analyze_campaign plus:
+        - aggregates: Updated RunningAggregates
+        - analyzed_snapshot: Aggregate snapshot the analysis is based on
+        - reanalyzed: Whether patterns/insights were regenerated
+        - drift: Relative drift that was measured
+    """
+    history = list(metrics_history or [])
+
+    if aggregates is None:
+        aggregates = RunningAggregates.from_metrics(campaign_id, history)
+    for m in sorted(new_metrics, key=lambda m: m.date):
+        aggregates.update(m)
+
+    performance_summary = aggregates.performance_summary(benchmark)
+    previous_snapshot = (previous_analysis or {}).get("analyzed_snapshot")
+    drift = aggregates.drift_from(previous_snapshot)
+
+    if previous_analysis and drift <= threshold:
+        logger.info(f"Campaign {campaign_id}: drift {drift:.1%} <= {threshold:.0%}, reusing analysis")
+        return {
+            **previous_analysis,
+            "performance_summary": performance_summary,
+            "aggregates": aggregates,
+            "reanalyzed": False,
+            "drift": drift
+        }
+
+    logger.info(f"Campaign {campaign_id}: drift {drift:.1%} > {threshold:.0%}, re-analyzing")
+    state = {
+        "campaign_id": campaign_id,
+        "metrics": history + list(new_metrics),
+        "benchmark": benchmark,
+        "performance_summary": performance_summary,
+        "detected_patterns": [],
+        "content_insights": [],
+        "recommendations": [],
+        "next_month_strategy": "",
+        "error": ""
+    }
+
+    try:
+        for node in (detect_patterns, generate_insights, generate_recommendations):
+            state = node(state)
+    except Exception as e:
+        logger.error(f"Error re-analyzing campaign {campaign_id}: {e}")
+        state["error"] = str(e)
+
+    return {
+        "performance_summary": performance_summary,
+        "detected_patterns": state["detected_patterns"],
+        "content_insights": state["content_insights"],
+        "recommendations": state["recommendations"],
+        "next_month_strategy": state["next_month_strategy"],
+        "error": state.get("error", ""),
+        "aggregates": aggregates,
+        "analyzed_snapshot": aggregates.snapshot(),
+        "reanalyzed": True,
+        "drift": drift
+    }
+
+
+# Batch analysis
+def summarize_performance_batch(
+    campaigns: Dict[str, List[CampaignMetrics]],
+    benchmarks: Dict[str, BenchmarkData]
+) -> Dict[str, Dict]:
+    """
+    Compute analyze_performance summaries for many campaigns in one vectorized pass.
+
+    Args:
+        campaigns: campaign_id -> daily metrics (non-empty)
+        benchmarks: campaign_id -> industry benchmark
+
+    Returns:
+        campaign_id -> performance_summary (same shape as analyze_performance)
+    """
+    ids = list(campaigns)
+    if not ids:
+        return {}
+
+    lengths = np.array([len(campaigns[cid]) for cid in ids])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    all_metrics = [m for cid in ids for m in campaigns[cid]]
+    codes = np.repeat(np.arange(len(ids)), lengths)
+
+    views = np.fromiter((m.views for m in all_metrics), dtype=np.int64, count=len(all_metrics))
+    engagement = np.fromiter(
+        (m.likes + m.comments + m.shares for m in all_metrics), dtype=np.int64, count=len(all_metrics)
+    )
+
+    total_views = np.add.reduceat(views, offsets)
+    total_engagement = np.add.reduceat(engagement, offsets)
+    avg_rate = np.divide(
+        total_engagement, total_views,
+        out=np.zeros(len(ids)), where=total_views > 0
+    )
+
+    # Best/worst day = first occurrence of max/min views within each campaign
+    position = np.arange(len(all_metrics))
+    by_max = np.lexsort((-position, views, codes))
+    best_idx = by_max[offsets + lengths - 1]
+    worst_idx = np.lexsort((position, views, codes))[offsets]
+
+    bench_avg = np.array([benchmarks[cid].avg_engagement_rate for cid in ids])
+    p50 = np.array([benchmarks[cid].p50_engagement for cid in ids])
+    p75 = np.array([benchmarks[cid].p75_engagement for cid in ids])
+    p90 = np.array([benchmarks[cid].p90_engagement for cid in ids])
+    vs_benchmark_pct = ((avg_rate / bench_avg) - 1) * 100
+    ratings = np.select(
+        [avg_rate >= p90, avg_rate >= p75, avg_rate >= p50],
+        ["excellent", "good", "average"],
+        default="below_average"
+    )
+
+    summaries = {}
+    for i, cid in enumerate(ids):
+        best_day = all_metrics[best_idx[i]]
+        worst_day = all_metrics[worst_idx[i]]
+        pct = float(vs_benchmark_pct[i])
+        summaries[cid] = {
+            "overall_rating": str(ratings[i]),
+            "vs_benchmark": f"{pct:+.0f}% {'above' if pct > 0 else 'below'} industry average",
+            "total_views": int(total_views[i]),
+            "total_engagement": int(total_engagement[i]),
+            "avg_engagement_rate": float(avg_rate[i]),
+            "best_day": {"date": str(best_day.date), "views": best_day.views},
+            "worst_day": {"date": str(worst_day.date), "views": worst_day.views}
+        }
+
+    return summaries
+
+
+def generate_insights_and_recommendations(
+    campaign_id: str,
+    performance: Dict,
+    patterns: List[EngagementPattern]
+) -> Tuple[List[ContentInsight], List[str], str, Dict]:
+    """
+    Generate insights and recommendations in a single structured LLM call.
+
+    Args:
+        campaign_id: Campaign identifier
+        performance: Performance summary
+        patterns: Detected engagement patterns
+
+    Returns:
+        Tuple of (insights, recommendations, next_month_strategy, usage)
+        where usage has input_tokens, output_tokens and cost
+    """
+    openai_client = get_openai_client()
+    model = "gpt-4o-mini"
+
+    prompt = f"""
+You are an expert social media analyst. Explain WHY this campaign performed the way it did,
+then recommend what to do next.
+
+Performance Summary:
+{json.dumps(performance, indent=2)}
+
+Detected Patterns:
+{json.dumps([{"type": p.pattern_type, "desc": p.description, "impact": p.impact} for p in patterns], indent=2)}
+
+Insights should focus on actionable factors (hook effectiveness, posting timing,
+platform optimization, audience targeting, visual appeal, trending audio/hashtags).
+Recommendations should be specific, actionable and data-driven.
+
+Return JSON:
+{{
+    "insights": [
+        {{
+            "insight_type": "hook|timing|platform_fit|audience_match|visual_appeal",
+            "explanation": "Hook in first 3 seconds grabbed attention (spike on Dec 15)",
+            "confidence": 0.85,
+            "evidence": ["Views spiked 350% on day of posting"]
+        }}
+    ],
+    "recommendations": [
+        "Post on Wednesday-Thursday for best engagement (40% higher than weekend)"
+    ],
+    "next_month_strategy": "Focus on mid-week posting with strong hooks in first 3 seconds."
+}}
+
+Provide 3-5 insights and 5-7 recommendations.
+"""
+
+    response = openai_client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"}
+    )
+    track_openai_request(
+        model=model,
+        response=response,
+        metadata={"agent": "analytics", "step": "insights_and_recommendations", "campaign_id": campaign_id}
+    )
+
+    input_tokens = response.usage.prompt_tokens if response.usage else 0
+    output_tokens = response.usage.completion_tokens if response.usage else 0
+    usage = {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost": input_tokens * PRICING[model]["input"] + output_tokens * PRICING[model]["output"]
+    }
+
+    result = json.loads(response.choices[0].message.content.strip())
+    insights = [
+        ContentInsight(
+            campaign_id=campaign_id,
+            insight_type=i["insight_type"],
+            explanation=i["explanation"],
+            confidence=i["confidence"],
+            evidence=i["evidence"]
+        )
+        for i in result.get("insights", [])
+    ]
+
+    return insights, result.get("recommendations", []), result.get("next_month_strategy", ""), usage
+
+
+def _analyze_batch_item(
+    campaign_id: str,
+    metrics: List[CampaignMetrics],
+    performance: Dict,
+    generate_insights: bool
+) -> Dict:
+    """Run pattern detection and the merged insight call for one campaign."""
+    timing = {}
+    cost = {"input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+    result = {
+        "performance_summary": performance,
+        "detected_patterns": [],
+        "content_insights": [],
+        "recommendations": [],
+        "next_month_strategy": "",
+        "error": ""
+    }
+
+    try:
+        start = time.perf_counter()
+        result["detected_patterns"] = EngagementPatternDetector().detect(metrics)
+        timing["detect_patterns"] = time.perf_counter() - start
+
+        if generate_insights:
+            start = time.perf_counter()
+            insights, recommendations, strategy, cost = generate_insights_and_recommendations(
+                campaign_id, performance, result["detected_patterns"]
+            )
+            timing["insights_and_recommendations"] = time.perf_counter() - start
+            result.update({
+                "content_insights": insights,
+                "recommendations": recommendations,
+                "next_month_strategy": strategy
+            })
+    except Exception as e:
+        logger.error(f"Error analyzing campaign {campaign_id} in batch: {e}")
+        result["error"] = str(e)
+
+    result["timing"] = timing
+    result["cost"] = cost
+    return result
+
+
+def analyze_campaigns_batch(
+    campaigns: Dict[str, List[CampaignMetrics]],
+    benchmarks: Union[BenchmarkData, Dict[str, BenchmarkData]],
+    max_concurrency: int = 8,
+    generate_insights: bool = True
+) -> Dict:
+    """
+    Analyze many campaigns in one pass (e.g. a monthly report).
+
+    Performance aggregates are computed vectorized across all campaigns;
+    pattern detection and one merged insight/recommendation LLM call per
+    campaign then run concurrently, limited to max_concurrency in flight.
+
+    Args:
+        campaigns: campaign_id -> daily metrics
+        benchmarks: One benchmark for all campaigns, or campaign_id -> benchmark
+        max_concurrency: Maximum campaigns processed (and LLM calls in flight) at once
+        generate_insights: Set False to skip LLM calls (aggregates + patterns only)
+
+    Returns:
+        Dict with:
+        - campaigns: campaign_id -> analyze_campaign-style result plus
+          per-campaign "timing" (seconds per stage) and "cost" (tokens, USD)
+        - timing: batch-level stage timings
+        - cost: batch totals (input_tokens, output_tokens, cost)
+    """
+    batch_start = time.perf_counter()
+
+    if isinstance(benchmarks, BenchmarkData):
+        benchmarks = {cid: benchmarks for cid in campaigns}
+
+    results = {}
+    valid = {}
+    for cid, metrics in campaigns.items():
+        if not metrics or cid not in benchmarks:
+            results[cid] = {
+                "performance_summary": {},
+                "detected_patterns": [],
+                "content_insights": [],
+                "recommendations": [],
+                "next_month_strategy": "",
+                "error": "No metrics" if not metrics else "No benchmark",
+                "timing": {},
+                "cost": {"input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+            }
+        else:
+            valid[cid] = metrics
+
+    start = time.perf_counter()
+    summaries = summarize_performance_batch(valid, benchmarks)
+    performance_time = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        futures = {
+            cid: executor.submit(_analyze_batch_item, cid, metrics, summaries[cid], generate_insights)
+            for cid, metrics in valid.items()
+        }
+        for cid, future in futures.items():
+            results[cid] = future.result()
+
+    # Keep the caller's campaign order
+    results = {cid: results[cid] for cid in campaigns}
+
+    total_cost = {
+        "input_tokens": sum(r["cost"]["input_tokens"] for r in results.values()),
+        "output_tokens": sum(r["cost"]["output_tokens"] for r in results.values()),
+        "cost": sum(r["cost"]["cost"] for r in results.values())
+    }
+    timing = {
+        "analyze_performance": performance_time,
+        "total": time.perf_counter() - batch_start
+    }
+
+    logger.info(
+        f"Batch analyzed {len(results)} campaigns in {timing['total']:.2f}s "
+        f"(${total_cost['cost']:.4f})"
+    )
+
+    return {"campaigns": results, "timing": timing, "cost": total_cost}
@@ -1,22 +1,40 @@
 # content_generation_agent.py
+import json
 import logging
-from langchain_core.messages import SystemMessage
+import threading
+from langchain_core.messages import AIMessage, SystemMessage
 from langgraph.graph import StateGraph
 from agents.agent_state import AgentState
+from campaign import prompt_hash
 from repositories.campaign_repository import CampaignRepository
 from utils.api_cost_tracker import track_openai_request
+from utils.monitoring import track_metric
 import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Generations checked for a near-duplicate saved campaign / served from one
+_reuse_stats = {"checked": 0, "reused": 0}
+_reuse_stats_lock = threading.Lock()
+
+
+def get_reuse_stats():
+    """Near-duplicate reuse counters and rate for this process"""
+    with _reuse_stats_lock:
+        stats = dict(_reuse_stats)
+    stats["reuse_rate"] = stats["reused"] / stats["checked"] if stats["checked"] else 0.0
+    return stats
+
+
 class ContentGenerationAgent:
-    def __init__(self, model, campaign_repository: CampaignRepository, system="", add_context=True):
+    def __init__(self, model, campaign_repository: CampaignRepository, system="", add_context=True, reuse_campaigns=True):
         self.system = system
         self.model = model
         self.campaign_repository = campaign_repository
         self.add_context = add_context
+        self.reuse_campaigns = reuse_campaigns
         self.graph = self._initialize_graph()
         logger.info("ContentGenerationAgent initialized.")
 
@@ -31,12 +49,60 @@ class ContentGenerationAgent:
             logger.error(f"Error initializing StateGraph: {e}")
             raise
 
+    def find_reusable_campaign(self, state: AgentState):
+        """
+        Content of a saved campaign generated from a near-identical query with
+        the same template, audience, platform and system prompt, if any.
+
+        Returns:
+            State update with the campaign's English content and translations, or None
+        """
+        content_template = state.get('content_template') or {}
+        query = state.get('user_query') or state['messages'][-1].content
+        duplicate = self.campaign_repository.find_duplicate_campaign(
+            query,
+            content_template.get('liquid_template', ''),
+            workspace_id=content_template.get('workspace_id') or "default",
+            audience_name=state.get('selected_audience_name') or "",
+            platform=state.get('selected_platform'),
+            system_prompt_hash=prompt_hash(self.system)
+        )
+
+        with _reuse_stats_lock:
+            _reuse_stats["checked"] += 1
+            if duplicate:
+                _reuse_stats["reused"] += 1
+        track_metric("campaign_reuse", 1 if duplicate else 0, {"rate": get_reuse_stats()["reuse_rate"]})
+        if not duplicate:
+            return None
+
+        campaign, distance = duplicate
+        english_content = json.dumps(campaign.localized_content.get('en-US', {}))
+        translations = {lang: content for lang, content in campaign.localized_content.items() if lang != 'en-US'}
+        return {
+            'messages': [AIMessage(content=english_content)],
+            'initial_english_content': english_content,
+            'translations': translations,
+            'reused_campaign': {'id': str(campaign.id), 'name': campaign.name, 'distance': distance}
+        }
+
     def generate_campaign_content(self, state: AgentState):
         try:
             messages = state['messages']
             user_query = messages[-1].content
             logger.info("Generating campaign content.")
 
+            # Serve a near-duplicate saved campaign instead of generating again
+            if self.reuse_campaigns:
+                try:
+                    reused = self.find_reusable_campaign(state)
+                except Exception as e:
+                    logger.warning(f"Duplicate campaign check failed: {e}")
+                    reused = None
+                if reused:
+                    logger.info(f"Reusing content of campaign '{reused['reused_campaign']['name']}'.")
+                    return reused
+
             # Add system message if there is only a single message
             if len(messages) == 1 and self.system:
                 messages.insert(0, SystemMessage(content=self.system))
@@ -53,7 +119,8 @@ class ContentGenerationAgent:
 
             # Add context if applicable
             if self.add_context:
-                similar_contents = self.campaign_repository.search_similar_campaigns(user_query)
+                workspace_id = (state.get('content_template') or {}).get('workspace_id') or "default"
+                similar_contents = self.campaign_repository.search_similar_campaigns(user_query, workspace_id=workspace_id)
                 if similar_contents:
                     context = "\n".join(similar_contents)
                     context_message = SystemMessage(content=f"Similar Content:\n{context}")
@@ -72,7 +139,7 @@ class ContentGenerationAgent:
 
             logger.info("Content generated successfully.")
 
-            return {'messages': [message], 'initial_english_content': message.content.replace("```json", "").replace("```", "")}
+            return {'messages': [message], 'initial_english_content': message.content.replace("```json", "").replace("```", ""), 'reused_campaign': None}
         except Exception as e:
             logger.error(f"Error generating campaign content: {e}")
             raise
\ No newline at end of file
@@ -5,8 +5,9 @@ import re
 from typing import TypedDict, Dict, List
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
-from liquid import Template, Environment
+from utils.liquid_templates import parse_template, render_template
 from utils.api_cost_tracker import track_openai_request
+from utils.intent_extraction import extract_intent
 from utils.template_utils import render_template_preview
 import os
 
@@ -135,46 +136,8 @@ class TemplateGeneratorAgent:
             description = state['description']
             logger.info(f"Analyzing template description: {description[:100]}...")
 
-            prompt = f"""Analyze this template request and extract structured intent.
-
-Request: "{description}"
-
-Return JSON with:
-{{
-    "content_type": "announcement|promotion|update|story|tutorial|testimonial|event|sale",
-    "industry": "fitness|ecommerce|saas|consulting|education|food|generic",
-    "key_elements": ["field names that should be included"],
-    "layout": "visual-focused|text-focused|balanced",
-    "cta": "buy|register|learn|share|contact|none",
-    "tone": "professional|casual|energetic|inspirational|urgent"
-}}
-
-IMPORTANT: Be specific about key_elements. Include fields like:
-- Text fields: title, description, name, tagline
-- Media fields: image, photo, logo, video
-- Data fields: date, time, price, location
-- Rich content: benefits, features, testimonials
-
-Return ONLY the JSON object.
-"""
-
-            # Use JSON mode to force pure JSON output
-            response = self.model.invoke(
-                [HumanMessage(content=prompt)],
-                response_format={"type": "json_object"}
-            )
-
-            # Track API usage
-            model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-            track_openai_request(
-                model=model_name,
-                response=response,
-                metadata={"agent": "template_generator", "step": "analyze_description"}
-            )
-
-            # Parse JSON response
-            json_str = self._extract_json_from_response(response.content)
-            parsed_intent = json.loads(json_str)
+            # Shared, content-hash cached intent extraction (reused across agents)
+            parsed_intent = extract_intent(description, model=self.model, agent="template_generator")
             logger.info(f"Intent parsed: content_type={parsed_intent.get('content_type')}, industry={parsed_intent.get('industry')}")
 
             return {
@@ -405,8 +368,7 @@ Return complete HTML with embedded <style> block and Liquid syntax. NO explanati
 
             # 1. Syntax validation - try to parse with Liquid
             try:
-                env = Environment()
-                template = env.from_string(liquid_template)
+                parse_template(liquid_template)
                 logger.info("✓ Liquid syntax is valid")
             except Exception as e:
                 validation_result['valid'] = False
@@ -517,9 +479,7 @@ Return complete HTML with embedded <style> block and Liquid syntax. NO explanati
                     sample_data[field_name] = True
 
             # Render template with sample data
-            env = Environment()
-            template = env.from_string(liquid_template)
-            preview_html = template.render(**sample_data)
+            preview_html = render_template(liquid_template, **sample_data)
 
             logger.info("Preview HTML generated successfully")
             return preview_html
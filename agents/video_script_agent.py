@@ -13,11 +13,13 @@ Workflow:
 """
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TypedDict, List, Dict, Optional
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, END
 from utils.viral_patterns import ViralPatternsDB
 from utils.api_cost_tracker import track_openai_request
+from utils.intent_extraction import extract_intent
 import os
 
 # Configure logging
@@ -182,49 +184,30 @@ class VideoScriptAgent:
             "urgency": "time-sensitive",
             "emotion": "exciting"
         }
+
+        If the state already carries a campaign_analysis (e.g. shared across a
+        multi-platform batch), it is reused and no LLM call is made.
         """
+        if state.get('campaign_analysis'):
+            logger.info("Reusing precomputed campaign analysis")
+            return {
+                'campaign_analysis': state['campaign_analysis'],
+                'script_sections': [],
+                'production_notes': {},
+                'virality_prediction': {},
+                'full_script': '',
+                'error': ''
+            }
+
         try:
             campaign = state['campaign_content']
             target_audience = state.get('target_audience', 'general audience')
             content_goal = state.get('content_goal', 'engage')
 
-            logger.info(f"Analyzing campaign: {campaign[:100]}...")
-
-            prompt = f"""Analyze this marketing campaign for video script generation:
-
-Campaign: "{campaign}"
-Target Audience: "{target_audience}"
-Goal: "{content_goal}"
-
-Extract the core intent and characteristics. Return JSON:
-{{
-    "content_type": "announcement|tutorial|promotion|story|transformation|testimonial|event",
-    "industry": "fitness|ecommerce|saas|consulting|education|food|generic",
-    "key_message": "main message in 5-10 words",
-    "urgency": "immediate|time-sensitive|evergreen",
-    "emotion": "exciting|helpful|inspiring|urgent|surprising|educational",
-    "hook_opportunity": "what makes this scroll-stopping (one sentence)"
-}}
-
-IMPORTANT: Be specific about content_type and industry for pattern matching.
-"""
-
-            # Use JSON mode for reliable output
-            response = self.model.invoke(
-                [HumanMessage(content=prompt)],
-                response_format={"type": "json_object"}
-            )
-
-            # Track API usage
-            model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-            track_openai_request(
-                model=model_name,
-                response=response,
-                metadata={"agent": "video_script", "step": "analyze_campaign"}
-            )
-
-            # Parse JSON
-            campaign_analysis = json.loads(response.content.strip())
+            # Shared, content-hash cached intent extraction (reused across agents)
+            campaign_analysis = extract_intent(campaign, model=self.model, agent="video_script")
+            campaign_analysis['target_audience'] = target_audience
+            campaign_analysis['content_goal'] = content_goal
             logger.info(f"Campaign analyzed: {campaign_analysis.get('content_type')} / {campaign_analysis.get('industry')}")
 
             return {
@@ -788,7 +771,8 @@ SCORING GUIDE:
         campaign_content: str,
         platform: str,
         target_audience: str = "general audience",
-        content_goal: str = "engage and convert"
+        content_goal: str = "engage and convert",
+        campaign_analysis: Optional[Dict] = None
     ) -> Dict:
         """
         Main entry point: Generate video script from campaign content.
@@ -798,6 +782,7 @@ SCORING GUIDE:
             platform: Target platform (instagram_reels, tiktok, youtube_shorts, etc.)
             target_audience: Target audience description
             content_goal: Goal of the video
+            campaign_analysis: Optional precomputed campaign analysis (skips the analyze step)
 
         Returns:
             Dict with script_sections, production_notes, virality_prediction, full_script
@@ -811,7 +796,7 @@ SCORING GUIDE:
                 'platform': platform,
                 'target_audience': target_audience,
                 'content_goal': content_goal,
-                'campaign_analysis': {},
+                'campaign_analysis': campaign_analysis or {},
                 'selected_pattern': {},
                 'script_sections': [],
                 'production_notes': {},
@@ -859,3 +844,81 @@ SCORING GUIDE:
                 'full_script': '',
                 'error': f"Video script generation failed: {str(e)}"
             }
+
+    def generate_video_scripts_for_platforms(
+        self,
+        campaign_content: str,
+        platforms: List[str],
+        target_audience: str = "general audience",
+        content_goal: str = "engage and convert",
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Batch entry point: Generate video scripts for several platforms at once.
+
+        The campaign is analyzed once and the analysis is shared by every
+        platform; pattern selection, script, production notes and virality
+        prediction then run concurrently per platform.
+
+        Args:
+            campaign_content: Marketing campaign text or idea
+            platforms: Target platforms (instagram_reels, tiktok, youtube_shorts, etc.)
+            target_audience: Target audience description
+            content_goal: Goal of the video
+            max_workers: Thread pool size (defaults to one worker per platform)
+
+        Returns:
+            Dict mapping platform name to the generate_video_script_from_campaign result
+        """
+        platforms = list(dict.fromkeys(platforms))
+        if not platforms:
+            return {}
+
+        logger.info(f"Starting batch video script generation for {len(platforms)} platforms: {platforms}")
+
+        # Node 1 runs once for the whole batch
+        analysis_state = self.analyze_campaign({
+            'campaign_content': campaign_content,
+            'platform': platforms[0],
+            'target_audience': target_audience,
+            'content_goal': content_goal,
+            'campaign_analysis': {}
+        })
+
+        if analysis_state.get('error'):
+            logger.error(f"Batch video script generation failed: {analysis_state['error']}")
+            return {
+                platform: {
+                    'campaign_analysis': {},
+                    'selected_pattern': {},
+                    'script_sections': [],
+                    'production_notes': {},
+                    'virality_prediction': {},
+                    'full_script': '',
+                    'error': analysis_state['error']
+                }
+                for platform in platforms
+            }
+
+        campaign_analysis = analysis_state['campaign_analysis']
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers or len(platforms)) as executor:
+            futures = {
+                executor.submit(
+                    self.generate_video_script_from_campaign,
+                    campaign_content=campaign_content,
+                    platform=platform,
+                    target_audience=target_audience,
+                    content_goal=content_goal,
+                    campaign_analysis=campaign_analysis
+                ): platform
+                for platform in platforms
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        logger.info(f"Batch video script generation complete for {len(results)} platforms")
+
+        # Preserve the requested platform order
+        return {platform: results[platform] for platform in platforms}
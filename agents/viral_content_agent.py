@@ -6,6 +6,7 @@ from typing import TypedDict, Optional, List, Dict
 from pathlib import Path
 from langgraph.graph import StateGraph, END
 from utils.openai_utils import get_openai_client
+from utils.intent_extraction import extract_intent
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,7 @@ class ViralContentState(TypedDict):
     content_type: str  # video, static, carousel
 
     # Processing
+    campaign_analysis: Dict  # Shared intent (content_type, industry, key_message, ...)
     all_patterns: List[Dict]
     selected_patterns: List[Dict]  # Top 3 patterns based on criteria
     pattern_scores: Dict[str, float]  # pattern_id -> score
@@ -61,6 +63,20 @@ def load_viral_patterns() -> List[Dict]:
         return []
 
 
+def analyze_query(state: ViralContentState) -> ViralContentState:
+    """Extract query intent via the shared cached intent extractor."""
+    logger.info("Analyzing query intent...")
+
+    try:
+        state['campaign_analysis'] = extract_intent(state['user_query'], agent="viral_content")
+    except Exception as e:
+        # Intent only refines scoring and prompts, so generation continues without it
+        logger.warning(f"Intent extraction failed, continuing without it: {e}")
+        state['campaign_analysis'] = {}
+
+    return state
+
+
 def select_patterns(state: ViralContentState) -> ViralContentState:
     """Select top 3 viral patterns based on platform, industry, and account type."""
     logger.info("Selecting viral patterns...")
@@ -71,6 +87,10 @@ def select_patterns(state: ViralContentState) -> ViralContentState:
     account_type = state['account_type']
     content_type = state['content_type']
 
+    # Resolve 'all' to the industry detected in the query, if any
+    if industry == 'all':
+        industry = state.get('campaign_analysis', {}).get('industry', industry)
+
     all_patterns = state['all_patterns']
     pattern_scores = {}
 
@@ -156,6 +176,7 @@ def generate_viral_content(state: ViralContentState) -> ViralContentState:
     selected_patterns = state['selected_patterns']
     platform = state['platform']
     industry = state['industry']
+    key_message = state.get('campaign_analysis', {}).get('key_message', '')
 
     generated_content = {}
 
@@ -174,6 +195,7 @@ def generate_viral_content(state: ViralContentState) -> ViralContentState:
 
 Generate viral content using the "{pattern_name}" pattern for this query:
 "{user_query}"
+{f'Key message: {key_message}' if key_message else ''}
 
 Pattern Guidelines:
 - Hook Template: {hook_template}
@@ -376,13 +398,15 @@ def create_viral_content_workflow():
     workflow = StateGraph(ViralContentState)
 
     # Add nodes
+    workflow.add_node("analyze_query", analyze_query)
     workflow.add_node("select_patterns", select_patterns)
     workflow.add_node("generate_viral_content", generate_viral_content)
     workflow.add_node("optimize_hooks", optimize_hooks)
     workflow.add_node("format_output", format_output)
 
     # Define edges
-    workflow.set_entry_point("select_patterns")
+    workflow.set_entry_point("analyze_query")
+    workflow.add_edge("analyze_query", "select_patterns")
     workflow.add_edge("select_patterns", "generate_viral_content")
     workflow.add_edge("generate_viral_content", "optimize_hooks")
     workflow.add_edge("optimize_hooks", "format_output")
@@ -431,6 +455,7 @@ def generate_viral_content_for_query(
         'follower_count': follower_count,
         'account_type': account_type,
         'content_type': content_type,
+        'campaign_analysis': {},
         'all_patterns': all_patterns,
         'selected_patterns': [],
         'pattern_scores': {},
@@ -4,6 +4,9 @@ Analytics package for campaign performance tracking and insights.
 This package provides:
 - Data models for analytics (analytics_models)
 - Mock data generation for testing (mock_analytics_generator)
+- Deterministic engagement pattern detection (pattern_detector)
+- Running aggregates for incremental analytics (running_aggregates)
+- Columnar metrics container (metrics_frame)
 - Analytics agent for generating insights (analytics_agent)
 """
 
@@ -14,7 +17,10 @@ from analytics.analytics_models import (
     ContentInsight,
     CampaignAnalytics,
 )
-from analytics.mock_analytics_generator import MockAnalyticsGenerator
+from analytics.metrics_frame import MetricsFrame
+from analytics.mock_analytics_generator import MockAnalyticsGenerator, MetricsBatch
+from analytics.pattern_detector import EngagementPatternDetector, detect_engagement_patterns
+from analytics.running_aggregates import RunningAggregates
 
 __all__ = [
     "CampaignMetrics",
@@ -22,5 +28,10 @@ __all__ = [
     "EngagementPattern",
     "ContentInsight",
     "CampaignAnalytics",
+    "MetricsFrame",
     "MockAnalyticsGenerator",
+    "MetricsBatch",
+    "EngagementPatternDetector",
+    "detect_engagement_patterns",
+    "RunningAggregates",
 ]
@@ -0,0 +1,253 @@
+"""
+Columnar container for daily campaign metrics.
+
+MetricsFrame stores one campaign's daily metrics as NumPy arrays instead
+of a list of CampaignMetrics dataclasses, so analytics can aggregate and
+slice without allocating an object per day.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from analytics.analytics_models import CampaignMetrics
+
+COUNTER_FIELDS = ["views", "likes", "comments", "shares", "saves", "clicks"]
+RATE_FIELDS = ["engagement_rate", "save_rate", "click_through_rate", "virality_score"]
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """numerator / denominator, 0 where denominator == 0."""
+    return np.divide(
+        numerator * scale, denominator,
+        out=np.zeros(len(denominator)), where=denominator > 0
+    )
+
+
+@dataclass
+class MetricsFrame:
+    """
+    Daily metrics for one campaign as parallel arrays (sorted by date).
+
+    Attributes:
+        campaign_id: Campaign identifier
+        platform: Platform name
+        dates: Daily dates (datetime64[D])
+        views / likes / comments / shares / saves / clicks: int64 counters
+        engagement_rate / save_rate / click_through_rate / virality_score:
+            float64 rates (as recorded, or derived from counters)
+    """
+    campaign_id: str
+    platform: str
+    dates: np.ndarray
+
+    views: np.ndarray
+    likes: np.ndarray
+    comments: np.ndarray
+    shares: np.ndarray
+    saves: np.ndarray
+    clicks: np.ndarray
+
+    engagement_rate: np.ndarray
+    save_rate: np.ndarray
+    click_through_rate: np.ndarray
+    virality_score: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: slice) -> "MetricsFrame":
+        """Slice days; basic slices share memory with this frame (zero-copy)."""
+        if not isinstance(index, slice):
+            raise TypeError("MetricsFrame supports slice indexing only; use to_metrics() for single days")
+        return self._take(index)
+
+    def _take(self, index) -> "MetricsFrame":
+        """Apply the same index to every array column."""
+        columns = {
+            f.name: getattr(self, f.name)[index]
+            for f in fields(self)
+            if isinstance(getattr(self, f.name), np.ndarray)
+        }
+        return MetricsFrame(campaign_id=self.campaign_id, platform=self.platform, **columns)
+
+    def between(self, start: Optional[date] = None, end: Optional[date] = None) -> "MetricsFrame":
+        """
+        Zero-copy slice of days in [start, end].
+
+        Args:
+            start: First day (inclusive, optional)
+            end: Last day (inclusive, optional)
+
+        Returns:
+            MetricsFrame view
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right'))
+        return self[lo:hi]
+
+    # Derived columns
+
+    @property
+    def total_engagement(self) -> np.ndarray:
+        """Likes + comments + shares per day."""
+        return self.likes + self.comments + self.shares
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """Weekday per day (0 = Monday)."""
+        return (self.dates.astype(np.int64) + 3) % 7
+
+    def derived_engagement_rate(self) -> np.ndarray:
+        """(likes + comments + shares) / views per day."""
+        return _ratio(self.total_engagement, self.views)
+
+    def day(self, index: int) -> date:
+        """Date of a single day as datetime.date."""
+        return self.dates[index].astype(date)
+
+    # Constructors
+
+    @classmethod
+    def from_counts(
+        cls,
+        campaign_id: str,
+        platform: str,
+        dates,
+        views,
+        likes,
+        comments,
+        shares,
+        saves,
+        clicks,
+        engagement_rate=None
+    ) -> "MetricsFrame":
+        """
+        Build a frame from counters, deriving rates vectorized.
+
+        Args:
+            campaign_id: Campaign identifier
+            platform: Platform name
+            dates: Daily dates (sorted)
+            views, likes, comments, shares, saves, clicks: Daily counters
+            engagement_rate: Recorded rate (defaults to derived from counters)
+
+        Returns:
+            MetricsFrame
+        """
+        views = np.asarray(views, dtype=np.int64)
+        likes = np.asarray(likes, dtype=np.int64)
+        comments = np.asarray(comments, dtype=np.int64)
+        shares = np.asarray(shares, dtype=np.int64)
+        saves = np.asarray(saves, dtype=np.int64)
+        clicks = np.asarray(clicks, dtype=np.int64)
+
+        if engagement_rate is None:
+            engagement_rate = _ratio(likes + comments + shares, views)
+
+        return cls(
+            campaign_id=campaign_id,
+            platform=platform,
+            dates=np.asarray(dates, dtype='datetime64[D]'),
+            views=views,
+            likes=likes,
+            comments=comments,
+            shares=shares,
+            saves=saves,
+            clicks=clicks,
+            engagement_rate=np.asarray(engagement_rate, dtype=np.float64),
+            save_rate=_ratio(saves, views),
+            click_through_rate=_ratio(clicks, views),
+            virality_score=_ratio(shares, views, 100.0)
+        )
+
+    @classmethod
+    def from_metrics(cls, metrics: List[CampaignMetrics]) -> "MetricsFrame":
+        """Build a frame from CampaignMetrics (sorted by date, rates kept as recorded)."""
+        ordered = sorted(metrics, key=lambda m: m.date)
+        n = len(ordered)
+        columns = {
+            name: np.fromiter((getattr(m, name) for m in ordered), dtype=np.int64, count=n)
+            for name in COUNTER_FIELDS
+        }
+        columns.update({
+            name: np.fromiter((getattr(m, name) for m in ordered), dtype=np.float64, count=n)
+            for name in RATE_FIELDS
+        })
+
+        return cls(
+            campaign_id=ordered[0].campaign_id if ordered else "",
+            platform=ordered[0].platform if ordered else "",
+            dates=np.array([m.date for m in ordered], dtype='datetime64[D]'),
+            **columns
+        )
+
+    @classmethod
+    def from_documents(cls, docs: List[Dict]) -> "MetricsFrame":
+        """
+        Build a frame from MongoDB documents.
+
+        Accepts time-series rows ({"date": datetime, "meta": {...}, counters, rates})
+        and legacy embedded metric dicts ({"campaign_id", "platform", "date": "YYYY-MM-DD", ...}).
+        """
+        docs = sorted(docs, key=lambda d: str(d["date"]))
+        meta = (docs[0].get("meta") or docs[0]) if docs else {}
+        n = len(docs)
+
+        columns = {
+            name: np.fromiter((d.get(name, 0) for d in docs), dtype=np.int64, count=n)
+            for name in COUNTER_FIELDS
+        }
+        columns.update({
+            name: np.fromiter((d.get(name, 0.0) for d in docs), dtype=np.float64, count=n)
+            for name in RATE_FIELDS
+        })
+
+        return cls(
+            campaign_id=meta.get("campaign_id", ""),
+            platform=meta.get("platform", ""),
+            dates=np.array([str(d["date"])[:10] for d in docs], dtype='datetime64[D]'),
+            **columns
+        )
+
+    @classmethod
+    def coerce(cls, metrics: Union["MetricsFrame", List[CampaignMetrics]]) -> "MetricsFrame":
+        """Return metrics as a frame (no copy if it already is one)."""
+        if isinstance(metrics, MetricsFrame):
+            return metrics
+        return cls.from_metrics(metrics)
+
+    # Conversions
+
+    def to_metrics(self) -> List[CampaignMetrics]:
+        """Materialize CampaignMetrics dataclasses (one per day)."""
+        days = self.dates.astype(date)
+        return [
+            CampaignMetrics(
+                campaign_id=self.campaign_id,
+                date=days[i],
+                platform=self.platform,
+                **{name: int(getattr(self, name)[i]) for name in COUNTER_FIELDS},
+                **{name: float(getattr(self, name)[i]) for name in RATE_FIELDS}
+            )
+            for i in range(len(self))
+        ]
+
+    def to_documents(self) -> List[Dict]:
+        """Convert to time-series documents (see MetricsRepository)."""
+        days = self.dates.astype(datetime)
+        counters = {name: getattr(self, name).tolist() for name in COUNTER_FIELDS}
+        rates = {name: getattr(self, name).tolist() for name in RATE_FIELDS}
+        meta = {"campaign_id": self.campaign_id, "platform": self.platform}
+
+        return [
+            {
+                "date": datetime(days[i].year, days[i].month, days[i].day),
+                "meta": dict(meta),
+                **{name: values[i] for name, values in counters.items()},
+                **{name: values[i] for name, values in rates.items()}
+            }
+            for i in range(len(self))
+        ]
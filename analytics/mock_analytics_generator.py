@@ -7,31 +7,166 @@ simulating real-world engagement patterns including:
 - Day-of-week engagement patterns
 - Content decay over time
 - Viral spikes
+
+Metrics for N campaigns x D days are generated in one vectorized NumPy pass
+with a reproducible seed; CampaignMetrics objects are only materialized on
+demand (MetricsBatch.to_metrics).
 """
 
-import random
-from datetime import datetime, date, timedelta
-from typing import List, Dict
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple, Union
 import logging
 
+import numpy as np
+
 from analytics.analytics_models import CampaignMetrics, BenchmarkData
+from analytics.metrics_frame import MetricsFrame
 
 logger = logging.getLogger(__name__)
 
+# Engagement split (share of total engagement)
+LIKES_SHARE = 0.70
+COMMENTS_SHARE = 0.15
+SHARES_SHARE = 0.10
+SAVES_SHARE = 0.05
+
+# Click-through rate (varies by platform)
+CTR_BASE = {"instagram_reels": 0.012, "tiktok": 0.008, "linkedin": 0.025}
+
+
+@dataclass
+class MetricsBatch:
+    """
+    Columnar synthetic metrics for N campaigns x D consecutive days.
+
+    Counter arrays have shape (N, D); dates has shape (D,).
+
+    Attributes:
+        campaign_ids: Campaign identifiers (length N)
+        platform: Platform name
+        dates: Daily dates (datetime64[D])
+        views / likes / comments / shares / saves / clicks: int64 counters
+        engagement_rate: Sampled engagement rate per day (float64)
+    """
+    campaign_ids: List[str]
+    platform: str
+    dates: np.ndarray
+
+    views: np.ndarray
+    likes: np.ndarray
+    comments: np.ndarray
+    shares: np.ndarray
+    saves: np.ndarray
+    clicks: np.ndarray
+    engagement_rate: np.ndarray
+
+    def __len__(self) -> int:
+        """Number of campaigns."""
+        return len(self.campaign_ids)
+
+    @property
+    def rows(self) -> int:
+        """Total number of campaign-days."""
+        return self.views.size
+
+    def _ratio(self, numerator: np.ndarray, scale: float = 1.0) -> np.ndarray:
+        """numerator / views, 0 where views == 0."""
+        return np.divide(
+            numerator * scale, self.views,
+            out=np.zeros(self.views.shape), where=self.views > 0
+        )
+
+    @property
+    def save_rate(self) -> np.ndarray:
+        return self._ratio(self.saves)
+
+    @property
+    def click_through_rate(self) -> np.ndarray:
+        return self._ratio(self.clicks)
+
+    @property
+    def virality_score(self) -> np.ndarray:
+        return self._ratio(self.shares, 100.0)
+
+    def to_metrics(self, index: int) -> List[CampaignMetrics]:
+        """
+        Materialize one campaign as a list of CampaignMetrics.
+
+        Args:
+            index: Campaign index (0..N-1)
+
+        Returns:
+            List of daily CampaignMetrics
+        """
+        save_rate = self._ratio(self.saves[index:index + 1])[0]
+        ctr = self._ratio(self.clicks[index:index + 1])[0]
+        virality = self._ratio(self.shares[index:index + 1], 100.0)[0]
+        days = self.dates.astype(date)
+
+        return [
+            CampaignMetrics(
+                campaign_id=self.campaign_ids[index],
+                date=days[d],
+                views=int(self.views[index, d]),
+                likes=int(self.likes[index, d]),
+                comments=int(self.comments[index, d]),
+                shares=int(self.shares[index, d]),
+                saves=int(self.saves[index, d]),
+                clicks=int(self.clicks[index, d]),
+                engagement_rate=float(self.engagement_rate[index, d]),
+                save_rate=float(save_rate[d]),
+                click_through_rate=float(ctr[d]),
+                virality_score=float(virality[d]),
+                platform=self.platform
+            )
+            for d in range(len(days))
+        ]
+
+    def to_frame(self, index: int) -> MetricsFrame:
+        """
+        View one campaign as a MetricsFrame (counters are not copied).
+
+        Args:
+            index: Campaign index (0..N-1)
+
+        Returns:
+            MetricsFrame for the campaign
+        """
+        return MetricsFrame.from_counts(
+            campaign_id=self.campaign_ids[index],
+            platform=self.platform,
+            dates=self.dates,
+            views=self.views[index],
+            likes=self.likes[index],
+            comments=self.comments[index],
+            shares=self.shares[index],
+            saves=self.saves[index],
+            clicks=self.clicks[index],
+            engagement_rate=self.engagement_rate[index]
+        )
+
+    def iter_metrics(self) -> Iterator[List[CampaignMetrics]]:
+        """Materialize campaigns one at a time."""
+        for index in range(len(self)):
+            yield self.to_metrics(index)
+
 
 class MockAnalyticsGenerator:
     """Generate realistic mock analytics data for campaigns."""
 
-    def __init__(self, industry: str = "fitness", platform: str = "instagram_reels"):
+    def __init__(self, industry: str = "fitness", platform: str = "instagram_reels", seed: Optional[int] = None):
         """
         Initialize mock data generator.
 
         Args:
             industry: Industry category (fitness, ecommerce, saas)
             platform: Platform name (instagram_reels, tiktok, linkedin, etc.)
+            seed: Random seed for reproducible data (None = fresh entropy)
         """
         self.industry = industry
         self.platform = platform
+        self.rng = np.random.default_rng(seed)
 
         # Industry-specific base metrics
         self.base_metrics = {
@@ -59,7 +194,8 @@ class MockAnalyticsGenerator:
         campaign_id: str,
         start_date: date,
         days: int = 30,
-        virality_factor: float = 1.0  # 1.0 = normal, 2.0 = viral content
+        virality_factor: float = 1.0,  # 1.0 = normal, 2.0 = viral content
+        day_offset: int = 0
     ) -> List[CampaignMetrics]:
         """
         Generate daily metrics for a campaign.
@@ -72,67 +208,126 @@ class MockAnalyticsGenerator:
                 1.0 = average performance
                 1.5 = good performance
                 2.0+ = viral performance
+            day_offset: Days already elapsed since posting (to continue a series)
 
         Returns:
             List of daily CampaignMetrics
         """
-        metrics = []
-        base = self._get_base_metrics()
-
-        for day_offset in range(days):
-            current_date = start_date + timedelta(days=day_offset)
+        batch = self.generate_batch(
+            n_campaigns=1,
+            start_date=start_date,
+            days=days,
+            virality_factors=virality_factor,
+            day_offset=day_offset,
+            campaign_ids=[campaign_id]
+        )
+        metrics = batch.to_metrics(0)
 
-            # Day-of-week patterns
-            weekday_factor = self._get_weekday_factor(current_date.weekday())
+        logger.info(f"Generated {len(metrics)} days of metrics for campaign {campaign_id}")
+        return metrics
 
-            # Decay over time (content gets less views after first few days)
-            decay_factor = self._get_decay_factor(day_offset)
+    def generate_batch(
+        self,
+        n_campaigns: int,
+        start_date: date,
+        days: int = 30,
+        virality_factors: Union[float, Sequence[float]] = 1.0,
+        day_offset: int = 0,
+        spike_days: Optional[Sequence[int]] = None,
+        spike_probability: float = 0.0,
+        spike_magnitude: Union[float, Tuple[float, float]] = (2.0, 5.0),
+        campaign_ids: Optional[List[str]] = None
+    ) -> MetricsBatch:
+        """
+        Generate metrics for many campaigns in one vectorized pass.
 
-            # Random variance (±20%)
-            variance = random.uniform(0.8, 1.2)
+        Args:
+            n_campaigns: Number of campaigns (N)
+            start_date: First day of every campaign
+            days: Number of days per campaign (D)
+            virality_factors: One factor for all campaigns or one per campaign
+            day_offset: Days already elapsed since posting (to continue a series)
+            spike_days: Day index of a viral spike per campaign (-1 = none)
+            spike_probability: Chance of a random spike per campaign (if spike_days is None)
+            spike_magnitude: Spike multiplier, or (min, max) range sampled per campaign
+            campaign_ids: Campaign identifiers (defaults to camp_000000...)
 
-            # Calculate views
-            views = int(
-                base["views"] *
-                weekday_factor *
-                decay_factor *
-                virality_factor *
-                variance
-            )
+        Returns:
+            MetricsBatch with (N, D) arrays
+        """
+        rng = self.rng
+        base = self._get_base_metrics()
+        shape = (n_campaigns, days)
+
+        dates = np.datetime64(start_date, 'D') + np.arange(days)
+        weekdays = (dates.astype(np.int64) + 3) % 7  # Monday = 0
+        weekday_factor = np.array([self._get_weekday_factor(w) for w in range(7)])[weekdays]
+        decay_factor = np.array([self._get_decay_factor(day_offset + d) for d in range(days)])
+        virality = np.broadcast_to(np.asarray(virality_factors, dtype=np.float64), (n_campaigns,))[:, None]
+
+        # Views: base x weekday x decay x virality x random variance (±20%)
+        variance = rng.uniform(0.8, 1.2, shape)
+        views = (base["views"] * weekday_factor * decay_factor * virality * variance).astype(np.int64)
+
+        # Engagement
+        engagement_rate = base["engagement_rate"] * virality * rng.uniform(0.9, 1.1, shape)
+        total_engagement = (views * engagement_rate).astype(np.int64)
+        likes = (total_engagement * LIKES_SHARE).astype(np.int64)
+        comments = (total_engagement * COMMENTS_SHARE).astype(np.int64)
+        shares = (total_engagement * SHARES_SHARE).astype(np.int64)
+        saves = (total_engagement * SAVES_SHARE).astype(np.int64)
+
+        ctr = CTR_BASE.get(self.platform, 0.01)
+        clicks = (views * ctr * rng.uniform(0.8, 1.2, shape)).astype(np.int64)
+
+        # Spike model
+        low, high = spike_magnitude if isinstance(spike_magnitude, tuple) else (spike_magnitude, spike_magnitude)
+        if spike_days is None and spike_probability > 0:
+            has_spike = rng.random(n_campaigns) < spike_probability
+            spike_days = np.where(has_spike, rng.integers(0, days, n_campaigns), -1)
+
+        if spike_days is not None:
+            magnitudes = rng.uniform(low, high, n_campaigns)
+            factor, active = self._spike_factors(np.asarray(spike_days), magnitudes, days)
+            views = (views * factor).astype(np.int64)
+            likes = (likes * np.where(active, factor * 1.2, 1.0)).astype(np.int64)  # Likes spike even more
+            shares = (shares * np.where(active, factor * 1.5, 1.0)).astype(np.int64)  # Shares spike most
+            comments = (comments * np.where(active, factor * 1.1, 1.0)).astype(np.int64)
+
+        if campaign_ids is None:
+            campaign_ids = [f"camp_{i:06d}" for i in range(n_campaigns)]
+
+        logger.info(f"Generated {n_campaigns} x {days} days of metrics")
+        return MetricsBatch(
+            campaign_ids=campaign_ids,
+            platform=self.platform,
+            dates=dates,
+            views=views,
+            likes=likes,
+            comments=comments,
+            shares=shares,
+            saves=saves,
+            clicks=clicks,
+            engagement_rate=engagement_rate
+        )
 
-            # Calculate engagement
-            engagement_rate = base["engagement_rate"] * virality_factor * random.uniform(0.9, 1.1)
-
-            # Generate engagement counts
-            total_engagement = int(views * engagement_rate)
-            likes = int(total_engagement * 0.70)  # 70% of engagement is likes
-            comments = int(total_engagement * 0.15)  # 15% comments
-            shares = int(total_engagement * 0.10)  # 10% shares
-            saves = int(total_engagement * 0.05)  # 5% saves
-
-            # Click-through rate (varies by platform)
-            ctr_base = {"instagram_reels": 0.012, "tiktok": 0.008, "linkedin": 0.025}
-            ctr = ctr_base.get(self.platform, 0.01)
-            clicks = int(views * ctr * random.uniform(0.8, 1.2))
-
-            metrics.append(CampaignMetrics(
-                campaign_id=campaign_id,
-                date=current_date,
-                views=views,
-                likes=likes,
-                comments=comments,
-                shares=shares,
-                saves=saves,
-                clicks=clicks,
-                engagement_rate=engagement_rate,
-                save_rate=saves / views if views > 0 else 0,
-                click_through_rate=clicks / views if views > 0 else 0,
-                virality_score=(shares / views * 100) if views > 0 else 0,
-                platform=self.platform
-            ))
+    @staticmethod
+    def _spike_factors(
+        spike_days: np.ndarray,
+        magnitudes: np.ndarray,
+        days: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-day multipliers for spikes: magnitude on the spike day, 40% of it
+        for the next 2 days, 1.0 elsewhere (and where spike_day < 0).
 
-        logger.info(f"Generated {len(metrics)} days of metrics for campaign {campaign_id}")
-        return metrics
+        Returns:
+            Tuple of (factor, active mask), both shaped (N, days)
+        """
+        offset = np.arange(days)[None, :] - spike_days[:, None]
+        active = (spike_days[:, None] >= 0) & (offset >= 0) & (offset < 3)
+        day_factor = np.where(offset == 0, magnitudes[:, None], magnitudes[:, None] * 0.4)
+        return np.where(active, day_factor, 1.0), active
 
     def _get_base_metrics(self) -> Dict:
         """Get base metrics for industry/platform."""
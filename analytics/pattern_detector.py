@@ -0,0 +1,356 @@
+"""
+Deterministic engagement pattern detection.
+
+Detects the same pattern types the analytics agent reports, using plain
+statistics over NumPy arrays instead of an LLM call:
+- Spikes: trailing rolling z-score of daily views
+- Weekend drops: weekday grouping of detrended views
+- Trends: linear regression slope of log views
+- Steep declines: single changepoint in log views (best two-segment split)
+- Consistent performance: low coefficient of variation
+
+All statistics are computed with cumulative sums, so detection is O(n) and
+runs in microseconds for a month and milliseconds for years of daily data.
+Signals that land just below a threshold are returned separately as
+borderline candidates (e.g. for an optional LLM tie-breaker).
+"""
+
+import logging
+from datetime import date
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from analytics.analytics_models import CampaignMetrics, EngagementPattern
+from analytics.metrics_frame import MetricsFrame
+
+logger = logging.getLogger(__name__)
+
+
+def _day(dates: np.ndarray, index: int) -> date:
+    """Convert one datetime64[D] entry to datetime.date."""
+    return dates[index].astype(date)
+
+
+def _fmt_day(d: date) -> str:
+    """Format a date like 'Dec 15'."""
+    return f"{d:%b} {d.day}"
+
+
+def _impact(strength: float, medium: float, high: float) -> str:
+    """Map a signal strength to an impact level."""
+    if strength >= high:
+        return "high"
+    if strength >= medium:
+        return "medium"
+    return "low"
+
+
+class EngagementPatternDetector:
+    """Detect engagement patterns in daily metrics with NumPy."""
+
+    def __init__(
+        self,
+        spike_window: int = 7,
+        spike_z_threshold: float = 3.0,
+        spike_ratio_threshold: float = 2.0,
+        weekend_drop_threshold: float = 0.15,
+        trend_threshold: float = 0.30,
+        trend_min_r2: float = 0.5,
+        decline_threshold: float = 0.5,
+        consistent_max_cv: float = 0.25,
+        borderline_margin: float = 0.8
+    ):
+        """
+        Initialize detector thresholds.
+
+        Args:
+            spike_window: Trailing window (days) for spike baseline
+            spike_z_threshold: Minimum z-score vs trailing window for a spike
+            spike_ratio_threshold: Minimum views ratio vs trailing mean for a spike
+            weekend_drop_threshold: Minimum relative Sat/Sun drop vs weekdays
+            trend_threshold: Minimum relative change over the period for a trend
+            trend_min_r2: Minimum R² of the regression for a trend
+            decline_threshold: Minimum relative drop at a changepoint for a steep decline
+            consistent_max_cv: Maximum coefficient of variation for consistent performance
+            borderline_margin: Signals >= margin * threshold are reported as borderline
+        """
+        self.spike_window = spike_window
+        self.spike_z_threshold = spike_z_threshold
+        self.spike_ratio_threshold = spike_ratio_threshold
+        self.weekend_drop_threshold = weekend_drop_threshold
+        self.trend_threshold = trend_threshold
+        self.trend_min_r2 = trend_min_r2
+        self.decline_threshold = decline_threshold
+        self.consistent_max_cv = consistent_max_cv
+        self.borderline_margin = borderline_margin
+
+    def detect(self, metrics: Union[List[CampaignMetrics], MetricsFrame]) -> List[EngagementPattern]:
+        """
+        Detect confident engagement patterns.
+
+        Args:
+            metrics: Daily metrics (list in any order, or MetricsFrame)
+
+        Returns:
+            List of EngagementPattern sorted by start date
+        """
+        patterns, _ = self.detect_with_candidates(metrics)
+        return patterns
+
+    def detect_with_candidates(
+        self,
+        metrics: Union[List[CampaignMetrics], MetricsFrame]
+    ) -> Tuple[List[EngagementPattern], List[EngagementPattern]]:
+        """
+        Detect patterns and borderline candidates.
+
+        Args:
+            metrics: Daily metrics (list in any order, or MetricsFrame)
+
+        Returns:
+            Tuple of (confident patterns, borderline candidates)
+        """
+        frame = MetricsFrame.coerce(metrics)
+        return self.detect_arrays(frame.dates, frame.views)
+
+    def detect_arrays(
+        self,
+        dates: Sequence[date],
+        views: np.ndarray
+    ) -> Tuple[List[EngagementPattern], List[EngagementPattern]]:
+        """
+        Detect patterns from date-sorted arrays.
+
+        Args:
+            dates: Consecutive daily dates (ascending; datetime64[D] or date objects)
+            views: Daily views aligned with dates
+
+        Returns:
+            Tuple of (confident patterns, borderline candidates)
+        """
+        views = np.asarray(views, dtype=np.float64)
+        confident: List[EngagementPattern] = []
+        borderline: List[EngagementPattern] = []
+
+        if len(views) < 3:
+            return confident, borderline
+
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        weekdays = (dates.astype(np.int64) + 3) % 7  # Monday = 0
+
+        for detect in (self._detect_spikes, self._detect_weekend_drop):
+            found, maybe = detect(dates, views, weekdays)
+            confident.extend(found)
+            borderline.extend(maybe)
+
+        # A steep decline explains a negative trend, so only one of them is reported
+        found, maybe = self._detect_steep_decline(dates, views)
+        confident.extend(found)
+        borderline.extend(maybe)
+        if not found:
+            found, maybe = self._detect_trend(dates, views)
+            confident.extend(found)
+            borderline.extend(maybe)
+
+        if not confident:
+            confident.extend(self._detect_consistent(dates, views))
+
+        confident.sort(key=lambda p: p.date_range[0])
+        borderline.sort(key=lambda p: p.date_range[0])
+        return confident, borderline
+
+    def _detect_spikes(self, dates, views, weekdays):
+        """Flag days far above the trailing window (rolling z-score and ratio)."""
+        n = len(views)
+        w = self.spike_window
+        cs = np.concatenate(([0.0], np.cumsum(views)))
+        cs2 = np.concatenate(([0.0], np.cumsum(views * views)))
+
+        idx = np.arange(n)
+        lo = np.maximum(idx - w, 0)
+        count = idx - lo
+        valid = count >= 3
+
+        safe_count = np.where(valid, count, 1)
+        mean = (cs[idx] - cs[lo]) / safe_count
+        var = np.maximum((cs2[idx] - cs2[lo]) / safe_count - mean * mean, 0.0)
+        # Floor std so flat baselines do not produce infinite z-scores
+        std = np.maximum(np.sqrt(var), np.maximum(0.05 * mean, 1.0))
+
+        z = np.where(valid, (views - mean) / std, 0.0)
+        ratio = np.where(valid & (mean > 0), views / np.maximum(mean, 1e-9), 0.0)
+
+        strong = (z >= self.spike_z_threshold) & (ratio >= self.spike_ratio_threshold)
+        weak = (
+            (z >= self.spike_z_threshold * self.borderline_margin)
+            & (ratio >= self.spike_ratio_threshold * self.borderline_margin)
+            & ~strong
+        )
+
+        return self._spike_events(dates, views, mean, ratio, strong), \
+            self._spike_events(dates, views, mean, ratio, weak)
+
+    def _spike_events(self, dates, views, mean, ratio, flags) -> List[EngagementPattern]:
+        """Group consecutive flagged days into spike patterns."""
+        patterns = []
+        flagged = np.flatnonzero(flags)
+        if flagged.size == 0:
+            return patterns
+
+        # Split into runs of consecutive days
+        runs = np.split(flagged, np.flatnonzero(np.diff(flagged) > 1) + 1)
+        for run in runs:
+            start = int(run[0])
+            baseline = mean[start]
+            end = int(run[-1])
+            # Extend through the afterglow while views stay well above baseline
+            while end + 1 < len(views) and views[end + 1] >= 1.5 * baseline:
+                end += 1
+
+            peak_ratio = float(views[start:end + 1].max() / baseline)
+            patterns.append(EngagementPattern(
+                pattern_type="spike",
+                description=f"Spike on {_fmt_day(_day(dates, start))} ({(peak_ratio - 1) * 100:+.0f}% views)",
+                date_range=(_day(dates, start), _day(dates, end)),
+                impact=_impact(peak_ratio, 2.0, 3.0)
+            ))
+        return patterns
+
+    def _detect_weekend_drop(self, dates, views, weekdays):
+        """Compare Sat/Sun views with weekdays after removing the 7-day trend."""
+        n = len(views)
+        if n < 10:
+            return [], []
+
+        # Centered 7-day mean averages out the weekday effect itself
+        cs = np.concatenate(([0.0], np.cumsum(views)))
+        centers = np.arange(3, n - 3)
+        rolling = (cs[centers + 4] - cs[centers - 3]) / 7.0
+        keep = rolling > 0
+        centers = centers[keep]
+        residual = views[centers] / rolling[keep]
+
+        weekend = weekdays[centers] >= 5
+        if weekend.sum() < 2 or (~weekend).sum() < 2:
+            return [], []
+
+        drop = 1.0 - residual[weekend].mean() / residual[~weekend].mean()
+        if drop < self.weekend_drop_threshold * self.borderline_margin:
+            return [], []
+
+        weekend_idx = centers[weekend]
+        pattern = EngagementPattern(
+            pattern_type="weekend_drop",
+            description=f"Weekend drop ({-drop * 100:.0f}% views on Sat/Sun vs weekdays)",
+            date_range=(_day(dates, int(weekend_idx[0])), _day(dates, int(weekend_idx[-1]))),
+            impact=_impact(drop, 0.2, 0.35)
+        )
+        if drop >= self.weekend_drop_threshold:
+            return [pattern], []
+        return [], [pattern]
+
+    def _detect_trend(self, dates, views):
+        """Fit a linear regression to log views."""
+        n = len(views)
+        if n < 7:
+            return [], []
+
+        y = np.log1p(views)
+        t = np.arange(n, dtype=np.float64)
+        t_c = t - t.mean()
+        y_c = y - y.mean()
+        denom = float(t_c @ t_c)
+        ss_tot = float(y_c @ y_c)
+        if denom == 0 or ss_tot == 0:
+            return [], []
+
+        slope = float(t_c @ y_c) / denom
+        r2 = slope * slope * denom / ss_tot
+        change = float(np.expm1(slope * (n - 1)))
+
+        margin = self.borderline_margin
+        if abs(change) < self.trend_threshold * margin or r2 < self.trend_min_r2 * margin:
+            return [], []
+
+        if change > 0:
+            pattern = EngagementPattern(
+                pattern_type="trending",
+                description=f"Trending growth ({change * 100:+.0f}% views over {n} days)",
+                date_range=(_day(dates, 0), _day(dates, -1)),
+                impact=_impact(change, 0.5, 1.0)
+            )
+        else:
+            pattern = EngagementPattern(
+                pattern_type="decline",
+                description=f"Gradual decline ({change * 100:+.0f}% views over {n} days)",
+                date_range=(_day(dates, 0), _day(dates, -1)),
+                impact=_impact(-change, 0.5, 0.75)
+            )
+
+        if abs(change) >= self.trend_threshold and r2 >= self.trend_min_r2:
+            return [pattern], []
+        return [], [pattern]
+
+    def _detect_steep_decline(self, dates, views):
+        """Find the best single changepoint in log views and check for a sharp drop."""
+        n = len(views)
+        if n < 6:
+            return [], []
+
+        y = np.log1p(views)
+        cs = np.concatenate(([0.0], np.cumsum(y)))
+        cs2 = np.concatenate(([0.0], np.cumsum(y * y)))
+
+        # Split k: segments [0, k) and [k, n), each at least 2 days
+        k = np.arange(2, n - 1)
+        left_sse = cs2[k] - cs[k] ** 2 / k
+        right_sse = (cs2[n] - cs2[k]) - (cs[n] - cs[k]) ** 2 / (n - k)
+        total_sse = cs2[n] - cs[n] ** 2 / n
+        if total_sse <= 0:
+            return [], []
+
+        best = int(np.argmin(left_sse + right_sse))
+        split = int(k[best])
+        explained = 1.0 - (left_sse[best] + right_sse[best]) / total_sse
+
+        before = views[:split].mean()
+        after = views[split:].mean()
+        if before <= 0:
+            return [], []
+        drop = 1.0 - after / before
+
+        if drop < self.decline_threshold * self.borderline_margin or explained < 0.5:
+            return [], []
+
+        pattern = EngagementPattern(
+            pattern_type="decline",
+            description=f"Steep decline after {_fmt_day(_day(dates, split - 1))} ({-drop * 100:.0f}% views)",
+            date_range=(_day(dates, split - 1), _day(dates, split)),
+            impact=_impact(drop, 0.6, 0.8)
+        )
+        if drop >= self.decline_threshold:
+            return [pattern], []
+        return [], [pattern]
+
+    def _detect_consistent(self, dates, views) -> List[EngagementPattern]:
+        """Report stable performance when daily views vary little."""
+        mean = views.mean()
+        if mean <= 0:
+            return []
+
+        cv = float(views.std() / mean)
+        if cv > self.consistent_max_cv:
+            return []
+
+        return [EngagementPattern(
+            pattern_type="consistent",
+            description=f"Consistent performance (±{cv * 100:.0f}% daily variation)",
+            date_range=(_day(dates, 0), _day(dates, -1)),
+            impact="low"
+        )]
+
+
+def detect_engagement_patterns(metrics: List[CampaignMetrics]) -> List[EngagementPattern]:
+    """Detect engagement patterns with default thresholds."""
+    return EngagementPatternDetector().detect(metrics)
@@ -0,0 +1,184 @@
+"""
+Running campaign aggregates for incremental analytics.
+
+Maintains totals, best/worst day, engagement rate and weekday profiles
+per campaign, updated in O(1) per new day instead of recomputing from the
+full metric list. A snapshot taken at the last full analysis lets callers
+decide whether aggregates drifted enough to re-run pattern detection and
+insight generation.
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+import logging
+
+from analytics.analytics_models import CampaignMetrics, BenchmarkData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunningAggregates:
+    """
+    Incrementally maintained aggregates for one campaign.
+
+    Attributes:
+        campaign_id: Campaign identifier
+        days: Number of days folded in
+        total_views / total_likes / ...: Running totals
+        best_day / worst_day: {"date": "YYYY-MM-DD", "views": int} (first occurrence wins)
+        weekday_views: Total views per weekday (0 = Monday)
+        weekday_days: Number of days per weekday
+        last_date: Most recent day folded in (ISO string)
+    """
+    campaign_id: str
+    days: int = 0
+
+    total_views: int = 0
+    total_likes: int = 0
+    total_comments: int = 0
+    total_shares: int = 0
+    total_saves: int = 0
+    total_clicks: int = 0
+
+    best_day: Optional[Dict] = None
+    worst_day: Optional[Dict] = None
+
+    weekday_views: List[int] = field(default_factory=lambda: [0] * 7)
+    weekday_days: List[int] = field(default_factory=lambda: [0] * 7)
+
+    last_date: Optional[str] = None
+
+    @classmethod
+    def from_metrics(cls, campaign_id: str, metrics: List[CampaignMetrics]) -> "RunningAggregates":
+        """Build aggregates from a full metric history."""
+        aggregates = cls(campaign_id=campaign_id)
+        for m in sorted(metrics, key=lambda m: m.date):
+            aggregates.update(m)
+        return aggregates
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RunningAggregates":
+        """Restore aggregates from a MongoDB document."""
+        return cls(**data)
+
+    def to_dict(self) -> Dict:
+        """Serialize aggregates for MongoDB."""
+        return asdict(self)
+
+    def update(self, metric: CampaignMetrics) -> bool:
+        """
+        Fold one new day into the aggregates in O(1).
+
+        Args:
+            metric: Metrics for a day after last_date
+
+        Returns:
+            True if applied, False if the day is not newer than last_date
+        """
+        day = str(metric.date)
+        if self.last_date is not None and day <= self.last_date:
+            logger.warning(f"Skipping {day} for campaign {self.campaign_id}: not after {self.last_date}")
+            return False
+
+        self.days += 1
+        self.total_views += metric.views
+        self.total_likes += metric.likes
+        self.total_comments += metric.comments
+        self.total_shares += metric.shares
+        self.total_saves += metric.saves
+        self.total_clicks += metric.clicks
+
+        if self.best_day is None or metric.views > self.best_day["views"]:
+            self.best_day = {"date": day, "views": metric.views}
+        if self.worst_day is None or metric.views < self.worst_day["views"]:
+            self.worst_day = {"date": day, "views": metric.views}
+
+        weekday = metric.date.weekday()
+        self.weekday_views[weekday] += metric.views
+        self.weekday_days[weekday] += 1
+
+        self.last_date = day
+        return True
+
+    @property
+    def total_engagement(self) -> int:
+        """Likes + comments + shares."""
+        return self.total_likes + self.total_comments + self.total_shares
+
+    @property
+    def engagement_rate(self) -> float:
+        """Overall engagement rate."""
+        return self.total_engagement / self.total_views if self.total_views > 0 else 0
+
+    @property
+    def weekday_profile(self) -> List[float]:
+        """Average views per weekday (0 = Monday), 0 for weekdays not seen."""
+        return [
+            views / days if days else 0.0
+            for views, days in zip(self.weekday_views, self.weekday_days)
+        ]
+
+    def performance_summary(self, benchmark: BenchmarkData) -> Dict:
+        """Build the analyze_performance summary without rescanning metrics."""
+        avg_engagement_rate = self.engagement_rate
+        vs_benchmark_pct = ((avg_engagement_rate / benchmark.avg_engagement_rate) - 1) * 100
+
+        if avg_engagement_rate >= benchmark.p90_engagement:
+            rating = "excellent"
+        elif avg_engagement_rate >= benchmark.p75_engagement:
+            rating = "good"
+        elif avg_engagement_rate >= benchmark.p50_engagement:
+            rating = "average"
+        else:
+            rating = "below_average"
+
+        return {
+            "overall_rating": rating,
+            "vs_benchmark": f"{vs_benchmark_pct:+.0f}% {'above' if vs_benchmark_pct > 0 else 'below'} industry average",
+            "total_views": self.total_views,
+            "total_engagement": self.total_engagement,
+            "avg_engagement_rate": avg_engagement_rate,
+            "best_day": dict(self.best_day) if self.best_day else {},
+            "worst_day": dict(self.worst_day) if self.worst_day else {}
+        }
+
+    def snapshot(self) -> Dict[str, float]:
+        """Key signals to compare against at the next update."""
+        profile = self.weekday_profile
+        weekend = [v for v in profile[5:] if v]
+        weekdays = [v for v in profile[:5] if v]
+        weekend_ratio = (
+            (sum(weekend) / len(weekend)) / (sum(weekdays) / len(weekdays))
+            if weekend and weekdays else 1.0
+        )
+
+        return {
+            "avg_daily_views": self.total_views / self.days if self.days else 0.0,
+            "engagement_rate": self.engagement_rate,
+            "best_day_views": float(self.best_day["views"]) if self.best_day else 0.0,
+            "weekend_ratio": weekend_ratio
+        }
+
+    def drift_from(self, snapshot: Optional[Dict[str, float]]) -> float:
+        """
+        Largest relative change of any snapshot signal.
+
+        Args:
+            snapshot: Snapshot taken at the last analysis (None = never analyzed)
+
+        Returns:
+            Max relative change (inf if there is no previous snapshot)
+        """
+        if not snapshot:
+            return float("inf")
+
+        current = self.snapshot()
+        drift = 0.0
+        for key, previous in snapshot.items():
+            value = current.get(key, 0.0)
+            if previous:
+                drift = max(drift, abs(value - previous) / abs(previous))
+            elif value:
+                drift = float("inf")
+        return drift
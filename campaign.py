@@ -1,20 +1,37 @@
 # campaign.py
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 from bson import ObjectId
+import hashlib
+
+# Fields loaded for campaign listings (no localized_content / liquid_template)
+CAMPAIGN_LIST_PROJECTION = {"name": 1, "created_at": 1}
 
 class Campaign:
-    def __init__(self, name: str, localized_content: Dict[str, str], liquid_template: str, _id: ObjectId = None):
+    def __init__(self, name: str, localized_content: Dict[str, str], liquid_template: str, _id: ObjectId = None, created_at: datetime = None, workspace_id: str = "default", platform: Optional[str] = None, source_query: Optional[str] = None, audience_name: Optional[str] = None, system_prompt_hash: Optional[str] = None):
         self.id = _id or ObjectId()
         self.name = name
         self.localized_content = localized_content
         self.liquid_template = liquid_template
+        self.created_at = created_at or datetime.now()
+        self.workspace_id = workspace_id
+        self.platform = platform
+        self.source_query = source_query  # user query the content was generated from
+        self.audience_name = audience_name  # audience selected for the generation
+        self.system_prompt_hash = system_prompt_hash  # prompt_hash() of the generation system prompt
 
     def to_dict(self):
         return {
             "_id": self.id,
             "name": self.name,
             "localized_content": self.localized_content,
-            "liquid_template": self.liquid_template
+            "liquid_template": self.liquid_template,
+            "created_at": self.created_at,
+            "workspace_id": self.workspace_id,
+            "platform": self.platform,
+            "source_query": self.source_query,
+            "audience_name": self.audience_name,
+            "system_prompt_hash": self.system_prompt_hash
         }
 
     @classmethod
@@ -23,5 +40,53 @@ class Campaign:
             name=data["name"],
             localized_content=data["localized_content"],
             liquid_template=data["liquid_template"],
-            _id=data["_id"]
-        )
\ No newline at end of file
+            _id=data["_id"],
+            created_at=data.get("created_at") or _id_time(data["_id"]),
+            workspace_id=data.get("workspace_id") or "default",
+            platform=data.get("platform"),
+            source_query=data.get("source_query"),
+            audience_name=data.get("audience_name"),
+            system_prompt_hash=data.get("system_prompt_hash")
+        )
+
+
+def prompt_hash(prompt: Optional[str]) -> str:
+    """Short fingerprint of a system prompt, stored instead of the prompt itself."""
+    return hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _id_time(_id) -> Optional[datetime]:
+    """Creation time encoded in an ObjectId (for documents saved before created_at)."""
+    if isinstance(_id, ObjectId):
+        return _id.generation_time.replace(tzinfo=None)
+    return None
+
+
+def campaign_summary(data: Dict) -> Dict:
+    """Listing entry (id, name, created_at) from a projected campaign document."""
+    return {
+        "id": str(data["_id"]),
+        "name": data.get("name", ""),
+        "created_at": data.get("created_at") or _id_time(data["_id"])
+    }
+
+
+def find_campaign_page(collection, limit: int = 50, after: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of campaign summaries, newest first, paginated by _id.
+
+    Args:
+        collection: Campaigns collection
+        limit: Page size
+        after: Cursor returned by the previous page (None for the first page)
+
+    Returns:
+        Tuple of (summaries, cursor for the next page or None if this was the last)
+    """
+    query = {"_id": {"$lt": ObjectId(after)}} if after else {}
+    # Fetch one extra document to know whether another page exists
+    docs = list(collection.find(query, CAMPAIGN_LIST_PROJECTION).sort("_id", -1).limit(limit + 1))
+
+    summaries = [campaign_summary(doc) for doc in docs[:limit]]
+    next_cursor = summaries[-1]["id"] if len(docs) > limit else None
+    return summaries, next_cursor
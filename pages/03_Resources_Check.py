@@ -4,11 +4,12 @@ from urllib.parse import urlparse
 # from azure.storage.blob import BlobServiceClient
 import psycopg2
 import pymilvus
-import pymongo
 import pymongo.errors as pymongo_errors
 import streamlit as st
 from PIL import Image
 
+from utils.milvus_utils import get_milvus_connection
+from utils.mongodb_utils import get_mongo_client, report_pool_metrics
 from utils.ui_components import init_page_settings, load_css
 
 ## Load the favico, you can set different favico (and all other settings) per page.
@@ -30,13 +31,15 @@ st.title("Resources Check")
 connection_string_mongo = getenv("CONNECTION_STRING_MONGO")
 if connection_string_mongo:
     "- ✅ CONNECTION_STRING_MONGO is set"
-    client = pymongo.MongoClient(
-        connection_string_mongo,
-        connectTimeoutMS=5000,
-    )
+    client = get_mongo_client(connection_string_mongo)
     try:
         client.admin.command("ping")
         "- ✅ Connection established"
+        for name, stats in report_pool_metrics().items():
+            (
+                f"- Pool `{name}`: {stats['checked_out']}/{stats['max_pool_size']} checked out, "
+                f"{stats['open_connections']} open, {stats['checkout_failures']} checkout failures"
+            )
     except pymongo_errors.ConnectionFailure as e:
         st.error("Server not available")
         st.exception(e)
@@ -77,6 +80,8 @@ if connection_string_postgres:
         f"- ✅ Connection established, Collections: {collections}"
     except Exception as e:
         st.error(f"Connection failed: {e}")
+    milvus_stats = get_milvus_connection().get_stats()
+    f"- RAG connection: {milvus_stats['state']} ({milvus_stats['failures']} failures, last error: {milvus_stats['last_error']})"
 else:
     st.error("CONNECTION_STRING_MILVUS is missing")
 
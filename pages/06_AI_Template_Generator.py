@@ -8,7 +8,7 @@ from langchain_openai import ChatOpenAI
 from agents.template_generator_agent import TemplateGeneratorAgent
 from repositories.template_repository import TemplateRepository
 from utils.ui_components import init_page_settings, load_css
-from liquid import Template, Environment
+from utils.liquid_templates import parse_template
 import logging
 
 # Load environment variables
@@ -388,8 +388,7 @@ if st.session_state.generated_template:
         if st.button("🔍 Validate Edited Template"):
             try:
                 # Re-validate the edited template
-                env = Environment()
-                template = env.from_string(edited_liquid)
+                parse_template(edited_liquid)
 
                 st.success("✅ Edited template syntax is valid!")
 
@@ -38,6 +38,8 @@ Transform your marketing campaigns into **viral-ready video scripts** with shot-
 # Initialize session state
 if 'generated_script' not in st.session_state:
     st.session_state.generated_script = None
+if 'generated_scripts' not in st.session_state:
+    st.session_state.generated_scripts = {}
 if 'video_script_agent' not in st.session_state:
     # Initialize AI agent
     model = ChatOpenAI(
@@ -241,6 +243,14 @@ Introducing our latest innovation...
     }
     st.caption(platform_info.get(platform, ""))
 
+    # Optional extra platforms (campaign is analyzed once and shared)
+    extra_platform_labels = st.multiselect(
+        "Also Generate For (optional)",
+        options=[label for label in platforms if label != selected_platform_label],
+        help="Generate variants for other platforms in one run - the campaign is analyzed once and scripts are generated in parallel"
+    )
+    selected_platforms = [platform] + [platforms[label] for label in extra_platform_labels]
+
     # Audience selector
     st.markdown("### 👥 Target Audience")
 
@@ -321,15 +331,26 @@ Introducing our latest innovation...
         else:
             with st.spinner("🎬 Generating viral video script..."):
                 try:
-                    result = st.session_state.video_script_agent.generate_video_script_from_campaign(
-                        campaign_content=campaign_content,
-                        platform=platform,
-                        target_audience=target_audience,
-                        content_goal=content_goal
-                    )
-
-                    st.session_state.generated_script = result
-                    st.success("✅ Video script generated successfully!")
+                    if len(selected_platforms) > 1:
+                        results = st.session_state.video_script_agent.generate_video_scripts_for_platforms(
+                            campaign_content=campaign_content,
+                            platforms=selected_platforms,
+                            target_audience=target_audience,
+                            content_goal=content_goal
+                        )
+                    else:
+                        results = {
+                            platform: st.session_state.video_script_agent.generate_video_script_from_campaign(
+                                campaign_content=campaign_content,
+                                platform=platform,
+                                target_audience=target_audience,
+                                content_goal=content_goal
+                            )
+                        }
+
+                    st.session_state.generated_scripts = results
+                    st.session_state.generated_script = results[platform]
+                    st.success(f"✅ Video script generated successfully for {len(results)} platform(s)!")
 
                 except Exception as e:
                     st.error(f"❌ Error generating script: {str(e)}")
@@ -344,6 +365,18 @@ with col2:
     if st.session_state.generated_script:
         result = st.session_state.generated_script
 
+        # Switch between platform variants from a batch run
+        generated_scripts = st.session_state.generated_scripts
+        if len(generated_scripts) > 1:
+            platform_labels = {value: label for label, value in platforms.items()}
+            shown_platform = st.radio(
+                "Platform Variant",
+                options=list(generated_scripts.keys()),
+                format_func=lambda p: platform_labels.get(p, p),
+                horizontal=True
+            )
+            result = generated_scripts[shown_platform]
+
         # Tabs for different sections
         script_tabs = st.tabs(["📜 Full Script", "🎥 Sections", "🎬 Production", "⚡ Virality", "🎯 Platform Tips"])
 
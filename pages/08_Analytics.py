@@ -9,9 +9,11 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import date, timedelta
-from agents.analytics_agent import analyze_campaign
+from agents.analytics_agent import analyze_campaign, update_campaign_analytics
 from analytics.mock_analytics_generator import MockAnalyticsGenerator
 from analytics.analytics_models import CampaignMetrics
+from analytics.metrics_frame import MetricsFrame
+from analytics.running_aggregates import RunningAggregates
 
 st.set_page_config(page_title="Campaign Analytics", page_icon="📊", layout="wide")
 
@@ -239,9 +241,15 @@ if generate_trigger:
                 benchmark=benchmark
             )
 
+            # Running aggregates let later days be folded in incrementally
+            aggregates = RunningAggregates.from_metrics(campaign_config["id"], metrics)
+            analysis['aggregates'] = aggregates
+            analysis['analyzed_snapshot'] = aggregates.snapshot()
+
             # Store in session state
             st.session_state['analytics_metrics'] = metrics
             st.session_state['analytics_result'] = analysis
+            st.session_state['analytics_campaign'] = campaign_config
 
             # Clear manual metrics flag
             st.session_state['use_manual_metrics'] = False
@@ -252,6 +260,39 @@ if generate_trigger:
             st.error(f"❌ Error: {str(e)}")
             st.exception(e)
 
+# Incremental update: fold in the next day instead of recomputing everything
+if 'analytics_result' in st.session_state and st.sidebar.button("➕ Add Next Day"):
+    metrics = st.session_state['analytics_metrics']
+    analysis = st.session_state['analytics_result']
+    config = st.session_state.get('analytics_campaign', campaign_config)
+
+    generator = MockAnalyticsGenerator(industry=config["industry"], platform=config["platform"])
+    new_metrics = generator.generate_campaign_metrics(
+        campaign_id=config["id"],
+        start_date=metrics[-1].date + timedelta(days=1),
+        days=1,
+        virality_factor=2.5 if config.get("viral") else 1.0,
+        day_offset=len(metrics)
+    )
+
+    with st.spinner("Updating analytics..."):
+        analysis = update_campaign_analytics(
+            campaign_id=config["id"],
+            new_metrics=new_metrics,
+            benchmark=generator.generate_benchmark_data(),
+            aggregates=analysis.get('aggregates'),
+            previous_analysis=analysis,
+            metrics_history=metrics
+        )
+
+    st.session_state['analytics_metrics'] = metrics + new_metrics
+    st.session_state['analytics_result'] = analysis
+
+    if analysis['reanalyzed']:
+        st.sidebar.success(f"Aggregates moved {analysis['drift']:.0%} - insights regenerated")
+    else:
+        st.sidebar.info(f"Aggregates moved {analysis['drift']:.1%} - insights reused")
+
 # Display analytics (if available)
 if 'analytics_result' in st.session_state:
     metrics = st.session_state['analytics_metrics']
@@ -297,10 +338,11 @@ if 'analytics_result' in st.session_state:
     st.markdown("---")
     st.subheader("📊 Engagement Over Time")
 
-    # Prepare data for chart
-    dates = [m.date for m in metrics]
-    views = [m.views for m in metrics]
-    engagement_rates = [m.engagement_rate * 100 for m in metrics]
+    # Prepare data for chart (columnar, no per-day objects)
+    frame = MetricsFrame.coerce(metrics)
+    dates = frame.dates
+    views = frame.views
+    engagement_rates = frame.engagement_rate * 100
 
     # Create dual-axis chart
     fig = go.Figure()
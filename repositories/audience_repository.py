@@ -1,4 +1,8 @@
-from pymongo import MongoClient, errors
+from pymongo import errors
+from utils.mongodb_utils import get_mongo_client
+from repositories.migrations import run_startup_migrations
+from repositories.bulk import BulkSaveResult, insert_many_unordered
+from typing import List
 from audience import Audience
 import os
 import logging
@@ -14,8 +18,9 @@ class AudienceRepository:
             if not connection_string:
                 raise ValueError("MongoDB connection string is not set in environment variables.")
             
-            self.mongo_client = MongoClient(connection_string)
+            self.mongo_client = get_mongo_client(connection_string)
             self.mongo_db = self.mongo_client.get_database()
+            run_startup_migrations(self.mongo_db)
             self.mongo_collection = self.mongo_db[mongo_collection_name]
             logger.info(f"Connected to MongoDB collection: {mongo_collection_name}")
         except errors.ConnectionError as e:
@@ -36,6 +41,18 @@ class AudienceRepository:
             logger.error(f"An unexpected error occurred while saving audience '{audience.name}': {e}")
             raise
 
+    def save_audiences(self, audiences: List[Audience]) -> BulkSaveResult:
+        """
+        Save many audiences with insert_many(ordered=False).
+
+        Args:
+            audiences: Audiences to save
+
+        Returns:
+            BulkSaveResult with per-audience errors
+        """
+        return insert_many_unordered(self.mongo_collection, [audience.to_dict() for audience in audiences])
+
     def get_audiences(self):
         try:
             audiences = self.mongo_collection.find()
@@ -0,0 +1,83 @@
+# bulk.py
+"""
+Bulk write helpers shared by repositories.
+
+Bulk saves use unordered writes so one bad document does not stop the
+rest, and report failures per input item instead of raising.
+"""
+from pymongo import errors
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class BulkSaveResult:
+    """
+    Outcome of a bulk save.
+
+    Attributes:
+        saved: Number of items written
+        inserted_ids: IDs of documents written (in input order)
+        errors: Per-item failures: {"index", "name", "stage", "error"}
+    """
+    saved: int = 0
+    inserted_ids: List[Any] = field(default_factory=list)
+    errors: List[Dict] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        """Number of items with at least one error."""
+        return len({e["index"] for e in self.errors})
+
+    def add_error(self, index: int, name: str, stage: str, error: str):
+        self.errors.append({"index": index, "name": name, "stage": stage, "error": error})
+
+
+def chunks(items: List, size: int):
+    """Yield (offset, chunk) pairs of at most size items."""
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def insert_many_unordered(collection, docs: List[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> BulkSaveResult:
+    """
+    Insert documents with insert_many(ordered=False) in batches.
+
+    Args:
+        collection: pymongo Collection
+        docs: Documents to insert (each should carry its _id)
+        batch_size: Documents per insert_many call
+
+    Returns:
+        BulkSaveResult; duplicates and invalid documents become per-item errors
+    """
+    result = BulkSaveResult()
+    failed = set()
+
+    for offset, batch in chunks(docs, batch_size):
+        try:
+            collection.insert_many(batch, ordered=False)
+        except errors.BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                index = offset + write_error["index"]
+                failed.add(index)
+                result.add_error(index, docs[index].get("name", ""), "mongo", write_error.get("errmsg", ""))
+        except errors.PyMongoError as e:
+            # Whole batch failed (e.g. connection error)
+            for index in range(offset, offset + len(batch)):
+                failed.add(index)
+                result.add_error(index, docs[index].get("name", ""), "mongo", str(e))
+
+    result.inserted_ids = [doc.get("_id") for i, doc in enumerate(docs) if i not in failed]
+    result.saved = len(result.inserted_ids)
+
+    if result.errors:
+        logger.warning(f"Bulk insert into {collection.name}: {result.saved} saved, {len(failed)} failed")
+    else:
+        logger.info(f"Bulk insert into {collection.name}: {result.saved} saved")
+    return result
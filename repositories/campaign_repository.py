@@ -1,57 +1,54 @@
-from pymongo import MongoClient, errors as mongo_errors
-from pymilvus import connections, FieldSchema, CollectionSchema, DataType, Collection, utility, exceptions as milvus_errors
-from utils.openai_utils import generate_embeddings  # Import from utils
-from campaign import Campaign
+from pymongo import errors as mongo_errors
+from pymilvus import FieldSchema, CollectionSchema, DataType, Collection, utility, exceptions as milvus_errors
+from utils.embedding_service import get_embedding_service
+from utils.mongodb_utils import get_mongo_client
+from utils.milvus_utils import get_milvus_connection
+from repositories.migrations import run_startup_migrations
+from repositories.bulk import BulkSaveResult, chunks, insert_many_unordered
+from repositories.local_vector_index import get_local_vector_index, normalize
+from repositories.vector_index_config import VectorIndexConfig
+from campaign import Campaign, find_campaign_page
 from bson import ObjectId
 from datetime import datetime
-from dataclasses import asdict
-from typing import List, Dict, Optional
+from dataclasses import replace
+from typing import Iterator, List, Dict, Optional, Tuple
+import json
 import os
-from urllib.parse import urlparse
 import logging
+import threading
+import time
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Parse Milvus connection string (optional - only if RAG is needed)
-milvus_conn_str = os.getenv("CONNECTION_STRING_MILVUS")
-milvus_available = False
-
-if milvus_conn_str:
-    try:
-        parsed_url = urlparse(milvus_conn_str)
-        milvus_host = parsed_url.hostname
-        milvus_port = parsed_url.port
-        milvus_user = parsed_url.username
-        milvus_password = parsed_url.password
-        milvus_database = parsed_url.path.lstrip('/')  # Extract the database from the path
-
-        connections.connect(
-            alias="default",
-            host=milvus_host,
-            port=str(milvus_port),
-            user=milvus_user,
-            password=milvus_password,
-            db_name=milvus_database
-        )
-        logger.info("Connected to Milvus successfully.")
-        milvus_available = True
-    except Exception as e:
-        logger.warning(f"Failed to connect to Milvus: {e}. RAG functionality will be disabled.")
-        milvus_available = False
-else:
-    logger.info("Milvus connection string not provided. RAG functionality will be disabled.")
+# Milvus schema version, appended to the collection name; bump when fields change
+# (Milvus cannot alter a collection's schema in place)
+MILVUS_SCHEMA_VERSION = 2
+EMBEDDING_LANGUAGE = "en-US"  # language of the text each campaign is embedded from
+HYDRATION_PROJECTION = {"name": 1, "created_at": 1, "workspace_id": 1, "platform": 1, "source_query": 1, f"localized_content.{EMBEDDING_LANGUAGE}": 1}
+DEFAULT_REUSE_MAX_COSINE_DISTANCE = 0.05
+
+# Milvus collections set up per connection generation, shared by repository instances
+_milvus_collections: Dict[Tuple[str, int], Collection] = {}
+_milvus_collections_lock = threading.Lock()
+
+# Background rebuilds of empty local indexes: collection name -> (thread, start time)
+LOCAL_BACKFILL_RETRY_SECONDS = float(os.getenv("LOCAL_BACKFILL_RETRY_SECONDS", 300))
+_local_backfills: Dict[str, Tuple[threading.Thread, float]] = {}
+_local_backfills_lock = threading.Lock()
 
 class CampaignRepository:
-    def __init__(self, mongo_collection_name, milvus_collection_name, similarity_threshold=0.5):
+    def __init__(self, mongo_collection_name, milvus_collection_name, similarity_threshold=None, index_config: Optional[VectorIndexConfig] = None):
         try:
             connection_string = os.getenv("CONNECTION_STRING_MONGO")
             if not connection_string:
                 raise ValueError("MongoDB connection string is not set in environment variables.")
             
-            self.mongo_client = MongoClient(connection_string)
+            self.mongo_client = get_mongo_client(connection_string)
             self.mongo_db = self.mongo_client.get_database()
+            run_startup_migrations(self.mongo_db)
             self.mongo_collection = self.mongo_db[mongo_collection_name]
             logger.info(f"Connected to MongoDB collection: {mongo_collection_name}")
         except mongo_errors.ConnectionError as e:
@@ -61,68 +58,291 @@ class CampaignRepository:
             logger.error(f"An error occurred during MongoDB connection setup: {e}")
             raise
 
-        self.milvus_collection_name = milvus_collection_name
-        self.similarity_threshold = similarity_threshold
-        self._setup_milvus()
+        self.milvus_collection_name = f"{milvus_collection_name}_v{MILVUS_SCHEMA_VERSION}"
+        self.index_config = index_config or VectorIndexConfig.from_env()
+        if similarity_threshold is not None:
+            self.index_config = replace(self.index_config, similarity_threshold=similarity_threshold)
+        self._metrics_repository = None
+        self.local_index = None
+        self.milvus = get_milvus_connection()
+        if not self.milvus.configured:
+            logger.info("Milvus connection string not provided. Using local vector index for RAG.")
+
+    @property
+    def metrics_repository(self):
+        """Time-series metrics repository (created on first use)."""
+        if self._metrics_repository is None:
+            from repositories.metrics_repository import MetricsRepository
+            self._metrics_repository = MetricsRepository()
+        return self._metrics_repository
         
-    def _setup_milvus(self):
-        global milvus_available
-
-        if not milvus_available:
-            logger.info("Milvus is not available. Skipping Milvus setup.")
-            self.milvus_collection = None
-            return
+    @property
+    def milvus_collection(self) -> Optional[Collection]:
+        """
+        Loaded Milvus collection, or None while Milvus is unavailable.
 
+        Never blocks on connecting: the connection is established in the
+        background and the collection is set up on first use after that.
+        """
+        if not self.milvus.is_available():
+            return None
+
+        key = (self.milvus_collection_name, self.milvus.generation)
+        collection = _milvus_collections.get(key)
+        if collection is None:
+            with _milvus_collections_lock:
+                collection = _milvus_collections.get(key)
+                if collection is None:
+                    collection = self._setup_milvus()
+                    if collection is not None:
+                        _milvus_collections[key] = collection
+        return collection
+
+    def _setup_milvus(self) -> Optional[Collection]:
         try:
             fields = [
                 FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-                FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=5000),
+                FieldSchema(name="campaign_id", dtype=DataType.VARCHAR, max_length=24),  # MongoDB _id
+                # Partition key: searches filtered by workspace only scan that workspace's partition
+                FieldSchema(name="workspace_id", dtype=DataType.VARCHAR, max_length=64, is_partition_key=True),
+                FieldSchema(name="platform", dtype=DataType.VARCHAR, max_length=32),
+                FieldSchema(name="language", dtype=DataType.VARCHAR, max_length=16),
                 FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1536)
             ]
-            schema = CollectionSchema(fields, "Campaign content embeddings")
+            schema = CollectionSchema(fields, "Campaign content embeddings", partition_key_field="workspace_id")
 
             if not utility.has_collection(self.milvus_collection_name):
-                self.milvus_collection = Collection(name=self.milvus_collection_name, schema=schema)
+                collection = Collection(name=self.milvus_collection_name, schema=schema)
                 logger.info(f"Created Milvus collection: {self.milvus_collection_name}")
             else:
-                self.milvus_collection = Collection(name=self.milvus_collection_name)
+                collection = Collection(name=self.milvus_collection_name)
                 logger.info(f"Using existing Milvus collection: {self.milvus_collection_name}")
 
-            index_params = {
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 128},
-                "metric_type": "L2"
-            }
-            if not self.milvus_collection.has_index():
-                self.milvus_collection.create_index(field_name="embedding", index_params=index_params)
-                logger.info(f"Created index on Milvus collection: {self.milvus_collection_name}")
+            if not collection.has_index():
+                collection.create_index(field_name="embedding", index_params=self.index_config.index_params())
+                logger.info(f"Created {self.index_config.index_type} index on Milvus collection: {self.milvus_collection_name}")
+            elif not self.index_config.matches_index(collection.index().params):
+                logger.warning(
+                    f"Milvus index on {self.milvus_collection_name} differs from the configured "
+                    f"{self.index_config.index_params()}; call rebuild_milvus_index() to apply it."
+                )
 
-            self.milvus_collection.load()
+            collection.load()
             logger.info(f"Loaded Milvus collection: {self.milvus_collection_name}")
+            return collection
+        except Exception as e:
+            logger.warning(f"Failed to set up Milvus collection: {e}.")
+            self.milvus.record_failure(e)
+            return None
+
+    def rebuild_milvus_index(self) -> bool:
+        """
+        Drop and recreate the Milvus index with the configured settings.
+
+        The collection is unavailable for search while the index builds.
+
+        Returns:
+            bool: Whether the index was rebuilt
+        """
+        collection = self.milvus_collection
+        if collection is None:
+            logger.warning("Milvus not available. Index not rebuilt.")
+            return False
+
+        collection.release()
+        if collection.has_index():
+            collection.drop_index()
+        collection.create_index(field_name="embedding", index_params=self.index_config.index_params())
+        collection.load()
+        logger.info(f"Rebuilt Milvus index on {self.milvus_collection_name}: {self.index_config.index_params()}")
+        return True
+
+    def _setup_local_index(self):
+        """Use the on-disk NumPy index for RAG while Milvus is unavailable."""
+        if self.local_index is not None or os.getenv("LOCAL_VECTOR_INDEX", "true").lower() == "false":
+            return
+        try:
+            self.local_index = get_local_vector_index(self.milvus_collection_name)
+            logger.info(f"Using local vector index for {self.milvus_collection_name} ({len(self.local_index)} vectors)")
+        except Exception as e:
+            logger.warning(f"Failed to open local vector index: {e}. RAG functionality will be disabled.")
+            self.local_index = None
+
+    def _vector_store(self):
+        """Milvus collection if connected, else the local index (may be None)."""
+        collection = self.milvus_collection
+        if collection is not None:
+            return collection
+        self._setup_local_index()
+        return self.local_index
+
+    @staticmethod
+    def _vector_metadata(campaign: Campaign) -> Dict:
+        """Scalar fields stored with a campaign's embedding."""
+        return {
+            "workspace_id": campaign.workspace_id or "default",
+            "platform": campaign.platform or "",
+            "language": EMBEDDING_LANGUAGE
+        }
+
+    def _insert_vectors(self, campaigns: List[Campaign], texts: List[str], embeddings: List):
+        """Insert embeddings into Milvus, or the local index as fallback."""
+        metadata = [self._vector_metadata(campaign) for campaign in campaigns]
+        collection = self.milvus_collection
+        if collection is not None:
+            try:
+                collection.insert([
+                    {"campaign_id": str(campaign.id), **meta, "embedding": embedding}
+                    for campaign, meta, embedding in zip(campaigns, metadata, embeddings)
+                ])
+                return
+            except milvus_errors.MilvusException as e:
+                self.milvus.record_failure(e)
+
+        self._setup_local_index()
+        if self.local_index is not None:
+            self.local_index.add([str(campaign.id) for campaign in campaigns], texts, embeddings, metadata)
+
+    def rebuild_local_index(self) -> int:
+        """
+        Rebuild the local vector index from all campaigns in MongoDB.
+
+        Returns:
+            int: Number of campaigns indexed
+        """
+        if self.local_index is None:
+            self._setup_local_index()
+        if self.local_index is None:
+            return 0
+
+        campaigns = (
+            Campaign.from_dict({**doc, "liquid_template": ""})
+            for doc in self.mongo_collection.find({}, {**HYDRATION_PROJECTION, "localized_content": 1})
+        )
+        records = (
+            (str(campaign.id), self._embedding_text(campaign), self._vector_metadata(campaign))
+            for campaign in campaigns
+        )
+        return self.local_index.rebuild(records, get_embedding_service().embed_array)
+
+    def _start_local_backfill(self):
+        """Rebuild the local index from MongoDB in a daemon thread, at most one per collection."""
+        with _local_backfills_lock:
+            running = _local_backfills.get(self.milvus_collection_name)
+            if running is not None:
+                thread, started = running
+                if thread.is_alive() or time.monotonic() - started < LOCAL_BACKFILL_RETRY_SECONDS:
+                    return
+            logger.info("Local vector index is empty, rebuilding from MongoDB in the background.")
+            thread = threading.Thread(
+                target=self._run_local_backfill, name=f"local-index-backfill-{self.milvus_collection_name}", daemon=True
+            )
+            _local_backfills[self.milvus_collection_name] = (thread, time.monotonic())
+            thread.start()
+
+    def _run_local_backfill(self):
+        try:
+            self.rebuild_local_index()
         except Exception as e:
-            logger.warning(f"Failed to set up Milvus collection: {e}. RAG functionality will be disabled.")
-            self.milvus_collection = None
-            milvus_available = False
+            logger.error(f"Failed to rebuild local vector index: {e}")
+
+    @property
+    def vector_store_name(self) -> Optional[str]:
+        """Name of the store embeddings currently go to ("milvus:<collection>" / "local:<collection>"), or None."""
+        store = self._vector_store()
+        if store is None:
+            return None
+        return f"{'local' if store is self.local_index else 'milvus'}:{self.milvus_collection_name}"
+
+    def iter_indexed_ids(self, batch_size: int = 1000) -> Iterator[Tuple[str, Optional[int]]]:
+        """
+        Campaign ids in the current vector store.
+
+        Yields:
+            (campaign_id, Milvus primary key or None for the local index); a
+            campaign indexed twice is yielded twice
+        """
+        store = self._vector_store()
+        if store is None:
+            return
+        if store is self.local_index:
+            for campaign_id in store.ids():
+                yield campaign_id, None
+            return
+
+        iterator = store.query_iterator(batch_size=batch_size, expr="", output_fields=["campaign_id"])
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                for row in rows:
+                    yield row["campaign_id"], row["id"]
+        finally:
+            iterator.close()
+
+    def delete_vectors(self, campaign_ids: List[str] = (), primary_keys: List[int] = ()) -> int:
+        """
+        Delete embeddings from the current vector store.
+
+        Args:
+            campaign_ids: Delete every row of these campaigns
+            primary_keys: Delete these Milvus rows (duplicates); ignored by the local index
+
+        Returns:
+            int: Number of rows deleted (as reported by the store)
+        """
+        store = self._vector_store()
+        if store is None:
+            return 0
+        if store is self.local_index:
+            return store.remove(campaign_ids) if campaign_ids else 0
+
+        deleted = 0
+        if campaign_ids:
+            deleted += store.delete(f"campaign_id in {json.dumps(list(campaign_ids))}").delete_count
+        if primary_keys:
+            deleted += store.delete(f"id in {json.dumps(list(primary_keys))}").delete_count
+        return deleted
+
+    def index_campaigns(self, campaign_ids: List[str]) -> int:
+        """
+        Embed campaigns already in MongoDB and add them to the vector store.
+
+        Embeddings go through the cached embedding service, so campaigns
+        embedded before (e.g. by a failed save) cost no API call.
+
+        Args:
+            campaign_ids: Campaign ids to index (one batch)
+
+        Returns:
+            int: Number of campaigns indexed
+        """
+        ids = [ObjectId(campaign_id) for campaign_id in campaign_ids if ObjectId.is_valid(campaign_id)]
+        campaigns = [
+            Campaign.from_dict({**doc, "liquid_template": ""})
+            for doc in self.mongo_collection.find({"_id": {"$in": ids}}, {**HYDRATION_PROJECTION, "localized_content": 1})
+        ]
+        if not campaigns:
+            return 0
+
+        texts = [self._embedding_text(campaign) for campaign in campaigns]
+        self._insert_vectors(campaigns, texts, get_embedding_service().embed_many(texts))
+        return len(campaigns)
 
     def save_campaign(self, campaign: Campaign):
         try:
             self.mongo_collection.insert_one(campaign.to_dict())
             logger.info(f"Campaign '{campaign.name}' saved to MongoDB.")
 
-            # Save to Milvus only if available
-            if self.milvus_collection is not None:
-                english_content_dict = campaign.localized_content.get('en-US', {})
-                english_content = '\n'.join(english_content_dict.values())
-
-                embedding = generate_embeddings(english_content)
+            # Save to Milvus (or the local index) only if available
+            if self._vector_store() is not None:
+                english_content = self._embedding_text(campaign)
 
-                data = [
-                    [english_content],
-                    [embedding]
-                ]
+                embedding = get_embedding_service().embed(english_content)
 
-                self.milvus_collection.insert(data)
-                logger.info(f"Campaign '{campaign.name}' saved to Milvus.")
+                self._insert_vectors([campaign], [english_content], [embedding])
+                logger.info(f"Campaign '{campaign.name}' saved to the vector store.")
             else:
                 logger.debug(f"Milvus not available. Campaign '{campaign.name}' saved to MongoDB only.")
         except mongo_errors.PyMongoError as e:
@@ -132,31 +352,252 @@ class CampaignRepository:
             logger.error(f"An unexpected error occurred while saving campaign '{campaign.name}': {e}")
             raise
 
-    def search_similar_campaigns(self, text):
-        if self.milvus_collection is None:
+    @staticmethod
+    def _embedding_text(campaign: Campaign) -> str:
+        """English content used for the campaign's embedding."""
+        english_content_dict = campaign.localized_content.get(EMBEDDING_LANGUAGE, {})
+        return '\n'.join(english_content_dict.values())
+
+    def save_campaigns(self, campaigns: List[Campaign], batch_size: int = 100) -> BulkSaveResult:
+        """
+        Save many campaigns with batched MongoDB, embedding and Milvus writes.
+
+        Campaigns are inserted with insert_many(ordered=False); campaigns that
+        were saved are embedded and inserted into Milvus (or the local vector
+        index) one batch at a time. Failures are reported per campaign.
+
+        Args:
+            campaigns: Campaigns to save
+            batch_size: Campaigns per Milvus insert (embedding requests are batched by the service)
+
+        Returns:
+            BulkSaveResult (stage "mongo", "embedding" or "milvus" per error)
+        """
+        docs = [campaign.to_dict() for campaign in campaigns]
+        result = insert_many_unordered(self.mongo_collection, docs)
+
+        if self._vector_store() is None:
+            logger.debug(f"Milvus not available. {result.saved} campaigns saved to MongoDB only.")
+            return result
+
+        saved_ids = set(result.inserted_ids)
+        saved = [(i, c) for i, c in enumerate(campaigns) if c.id in saved_ids]
+
+        for _, batch in chunks(saved, batch_size):
+            texts = [self._embedding_text(campaign) for _, campaign in batch]
+            try:
+                embeddings = get_embedding_service().embed_many(texts)
+            except Exception as e:
+                for index, campaign in batch:
+                    result.add_error(index, campaign.name, "embedding", str(e))
+                continue
+
+            try:
+                self._insert_vectors([campaign for _, campaign in batch], texts, embeddings)
+            except Exception as e:
+                for index, campaign in batch:
+                    result.add_error(index, campaign.name, "milvus", str(e))
+
+        logger.info(f"Saved {result.saved} campaigns ({result.failed} with errors).")
+        return result
+
+    def search_similar_campaigns(
+        self,
+        text: str,
+        workspace_id: str = "default",
+        platform: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        """
+        English content of the campaigns most similar to text (RAG context).
+
+        See find_similar_campaigns for the arguments.
+        """
+        return [hit["text"] for hit in self.find_similar_campaigns(text, workspace_id, platform, limit)]
+
+    def find_similar_campaigns(
+        self,
+        text: str,
+        workspace_id: str = "default",
+        platform: Optional[str] = None,
+        limit: Optional[int] = None,
+        apply_threshold: bool = True
+    ) -> List[Dict]:
+        """
+        Campaigns in a workspace similar to text that pass the similarity threshold.
+
+        The vector search is restricted to the workspace (Milvus partition
+        key / local index filter); matching campaigns are then loaded from
+        MongoDB in one $in query.
+
+        Args:
+            text: Query text
+            workspace_id: Workspace to search
+            platform: Only campaigns for this platform (None = any)
+            limit: Maximum number of results (defaults to the config top_k)
+            apply_threshold: False returns the nearest campaigns however far they are
+
+        Returns:
+            List of dicts (campaign_id, name, created_at, workspace_id, platform,
+            source_query, text, distance), most similar first; distance is the index metric's
+            score (a similarity for IP / COSINE)
+        """
+        limit = limit or self.index_config.top_k
+        filters = {"workspace_id": workspace_id, "language": EMBEDDING_LANGUAGE}
+        if platform:
+            filters["platform"] = platform
+
+        store = self._vector_store()
+        if store is None:
             logger.debug("Milvus not available. Returning empty list for similar campaigns.")
             return []
 
         try:
-            query_embedding = generate_embeddings(text)
+            query_embedding = get_embedding_service().embed(text)
 
-            search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
-            results = self.milvus_collection.search([query_embedding], "embedding", search_params, limit=5, output_fields=["text"])
-
-            similar_contents = []
-            for result in results[0]:  # Assuming 1 query, hence results[0]
-                if result.distance < self.similarity_threshold:
-                    similar_contents.append(result.entity.get("text"))
-
-            logger.info(f"Found {len(similar_contents)} similar campaigns.")
-            return similar_contents
+            if store is self.local_index:
+                matches = self._search_local_index(query_embedding, filters, limit, apply_threshold)
+            else:
+                try:
+                    matches = self._search_milvus(store, query_embedding, filters, limit, apply_threshold)
+                except milvus_errors.MilvusException as e:
+                    self.milvus.record_failure(e)
+                    self._setup_local_index()
+                    if self.local_index is None:
+                        return []
+                    matches = self._search_local_index(query_embedding, filters, limit, apply_threshold)
+
+            hits = self._hydrate(matches)
+            logger.info(f"Found {len(hits)} similar campaigns in workspace '{workspace_id}'.")
+            return hits
         except Exception as e:
             logger.warning(f"Failed to search similar campaigns: {e}. Returning empty list.")
             return []
 
+    def find_duplicate_campaign(
+        self,
+        query: str,
+        liquid_template: str,
+        workspace_id: str = "default",
+        audience_name: Optional[str] = None,
+        platform: Optional[str] = None,
+        system_prompt_hash: Optional[str] = None,
+        max_cosine_distance: Optional[float] = None,
+        candidates: int = 5
+    ) -> Optional[Tuple[Campaign, float]]:
+        """
+        A saved campaign generated from a near-identical query with the same inputs.
+
+        The nearest campaigns in the workspace (by content embedding) are
+        candidates; one is a duplicate when the query it was generated from
+        is within max_cosine_distance of query and it was generated with the
+        same template, audience, platform and system prompt (campaigns saved
+        without these never match). Query embeddings come from the cached
+        embedding service, so repeated checks cost no API call.
+
+        Args:
+            query: User query about to be generated
+            liquid_template: Template source the content must fit
+            workspace_id: Workspace to search
+            audience_name: Selected audience (None or "" = no audience)
+            platform: Selected platform (None = no platform)
+            system_prompt_hash: campaign.prompt_hash() of the system prompt
+            max_cosine_distance: Max query distance (defaults to
+                CAMPAIGN_REUSE_MAX_COSINE_DISTANCE env var or 0.05)
+            candidates: Nearest campaigns to check
+
+        Returns:
+            Tuple of (campaign, cosine distance) or None
+        """
+        if max_cosine_distance is None:
+            max_cosine_distance = float(os.getenv("CAMPAIGN_REUSE_MAX_COSINE_DISTANCE", DEFAULT_REUSE_MAX_COSINE_DISTANCE))
+
+        hits = [
+            hit for hit in self.find_similar_campaigns(query, workspace_id, limit=candidates, apply_threshold=False)
+            if hit.get("source_query")
+        ]
+        if not hits:
+            return None
+
+        vectors = normalize(get_embedding_service().embed_array([query] + [hit["source_query"] for hit in hits]))
+        distances = 1.0 - vectors[1:] @ vectors[0]
+        for i in np.argsort(distances):
+            if distances[i] > max_cosine_distance:
+                break
+            campaign = self.get_campaign(hits[i]["campaign_id"])
+            if campaign is not None and self._same_generation_inputs(campaign, liquid_template, audience_name, platform, system_prompt_hash):
+                logger.info(f"Campaign '{campaign.name}' duplicates the query (cosine distance {distances[i]:.3f}).")
+                return campaign, float(distances[i])
+        return None
+
+    @staticmethod
+    def _same_generation_inputs(campaign: Campaign, liquid_template: str, audience_name: Optional[str], platform: Optional[str], system_prompt_hash: Optional[str]) -> bool:
+        """True if the campaign was generated with the given template, audience, platform and system prompt."""
+        return (
+            campaign.liquid_template == liquid_template
+            and (campaign.audience_name or "") == (audience_name or "")
+            and (campaign.platform or None) == (platform or None)
+            and campaign.system_prompt_hash is not None
+            and campaign.system_prompt_hash == system_prompt_hash
+        )
+
+    @staticmethod
+    def _milvus_filter(filters: Dict) -> str:
+        """Milvus boolean expression for equality filters."""
+        return " and ".join(f"{field} == {json.dumps(value)}" for field, value in filters.items())
+
+    def _search_milvus(self, collection, query_embedding, filters: Dict, limit: int, apply_threshold: bool = True) -> List[Tuple[str, float]]:
+        results = collection.search(
+            [query_embedding], "embedding", self.index_config.search_params(), limit=limit,
+            expr=self._milvus_filter(filters), output_fields=["campaign_id"]
+        )
+        return [
+            (result.entity.get("campaign_id"), result.distance)
+            for result in results[0]  # Assuming 1 query, hence results[0]
+            if not apply_threshold or self.index_config.is_match(result.distance)
+        ]
+
+    def _search_local_index(self, query_embedding, filters: Dict, limit: int, apply_threshold: bool = True) -> List[Tuple[str, float]]:
+        """Search the local index; an empty one is backfilled from MongoDB in the background while Milvus is down."""
+        if len(self.local_index) == 0:
+            # Never embed every campaign on the request thread: no matches until the backfill lands
+            if self.milvus.is_down() and self.mongo_collection.estimated_document_count() > 0:
+                self._start_local_backfill()
+            return []
+
+        results = self.local_index.search(query_embedding, k=limit, nprobe=self.index_config.nprobe, filter=filters)
+        scores = [(record["id"], self.index_config.score_from_unit_l2(distance)) for record, distance in results]
+        return [(campaign_id, score) for campaign_id, score in scores if not apply_threshold or self.index_config.is_match(score)]
+
+    def _hydrate(self, matches: List[Tuple[str, float]]) -> List[Dict]:
+        """Load matched campaigns from MongoDB in one query, keeping match order."""
+        if not matches:
+            return []
+
+        ids = [ObjectId(campaign_id) for campaign_id, _ in matches if ObjectId.is_valid(campaign_id)]
+        docs = {str(doc["_id"]): doc for doc in self.mongo_collection.find({"_id": {"$in": ids}}, HYDRATION_PROJECTION)}
+
+        hits = []
+        for campaign_id, distance in matches:
+            doc = docs.get(campaign_id)
+            if doc is None:
+                continue  # deleted from MongoDB, vector not yet reconciled
+            hits.append({
+                "campaign_id": campaign_id,
+                "name": doc.get("name", ""),
+                "created_at": doc.get("created_at"),
+                "workspace_id": doc.get("workspace_id") or "default",
+                "platform": doc.get("platform"),
+                "source_query": doc.get("source_query"),
+                "text": '\n'.join(doc.get("localized_content", {}).get(EMBEDDING_LANGUAGE, {}).values()),
+                "distance": distance
+            })
+        return hits
+
     def get_campaigns(self):
         try:
-            campaigns = self.mongo_collection.find()
+            # Legacy documents may still embed per-day metrics; never load them here
+            campaigns = self.mongo_collection.find({}, {"analytics.metrics": 0})
             campaign_list = [Campaign.from_dict(campaign) for campaign in campaigns]
             logger.info(f"Retrieved {len(campaign_list)} campaigns from MongoDB.")
             return campaign_list
@@ -167,6 +608,82 @@ class CampaignRepository:
             logger.error(f"An unexpected error occurred while retrieving campaigns: {e}")
             raise
 
+    def get_campaign_page(self, limit: int = 50, after: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        List campaigns (id, name, created_at only), newest first.
+
+        Args:
+            limit: Page size
+            after: Cursor from the previous page
+
+        Returns:
+            Tuple of (summaries, next cursor or None)
+        """
+        try:
+            summaries, next_cursor = find_campaign_page(self.mongo_collection, limit, after)
+            logger.info(f"Retrieved {len(summaries)} campaign summaries from MongoDB.")
+            return summaries, next_cursor
+        except mongo_errors.PyMongoError as e:
+            logger.error(f"Failed to list campaigns: {e}")
+            raise
+
+    def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        """
+        Load one campaign with its content and template.
+
+        Args:
+            campaign_id: Campaign identifier
+
+        Returns:
+            Campaign or None if not found
+        """
+        try:
+            doc = self.mongo_collection.find_one({"_id": ObjectId(campaign_id)}, {"analytics": 0})
+            return Campaign.from_dict(doc) if doc else None
+        except mongo_errors.PyMongoError as e:
+            logger.error(f"Failed to retrieve campaign {campaign_id}: {e}")
+            raise
+
+    @staticmethod
+    def _campaign_metrics(campaign_id: str, metrics: List) -> List:
+        """Normalize metrics to CampaignMetrics owned by campaign_id."""
+        from analytics.analytics_models import CampaignMetrics
+
+        normalized = []
+        for m in metrics:
+            if not isinstance(m, CampaignMetrics):
+                m = CampaignMetrics(**{**m, "date": datetime.fromisoformat(str(m["date"])).date()})
+            normalized.append(replace(m, campaign_id=campaign_id))
+        return normalized
+
+    @staticmethod
+    def _serialize_analysis(analysis: Dict) -> Dict:
+        """Convert patterns and insights to serializable format."""
+        return {
+            "performance_summary": analysis.get("performance_summary", {}),
+            "detected_patterns": [
+                {
+                    "pattern_type": p.pattern_type,
+                    "description": p.description,
+                    "date_range": [str(p.date_range[0]), str(p.date_range[1])],
+                    "impact": p.impact
+                }
+                for p in analysis.get("detected_patterns", [])
+            ],
+            "content_insights": [
+                {
+                    "campaign_id": i.campaign_id,
+                    "insight_type": i.insight_type,
+                    "explanation": i.explanation,
+                    "confidence": i.confidence,
+                    "evidence": i.evidence
+                }
+                for i in analysis.get("content_insights", [])
+            ],
+            "recommendations": analysis.get("recommendations", []),
+            "next_month_strategy": analysis.get("next_month_strategy", "")
+        }
+
     def save_campaign_analytics(
         self,
         campaign_id: str,
@@ -176,55 +693,31 @@ class CampaignRepository:
         """
         Save analytics data for campaign.
 
+        Daily metrics replace the campaign's rows in the time-series metrics
+        collection (new rows are written before the old ones are deleted);
+        only the analysis and running aggregates are embedded in the campaign
+        document.
+
         Args:
             campaign_id: Campaign identifier
-            metrics: List of CampaignMetrics objects
+            metrics: List of CampaignMetrics objects (or dicts)
             analysis: Dict with performance_summary, patterns, insights, recommendations
         """
         try:
-            from analytics.analytics_models import CampaignMetrics
-
-            # Convert metrics to dict format
-            metrics_dicts = []
-            for m in metrics:
-                if isinstance(m, CampaignMetrics):
-                    m_dict = asdict(m)
-                    # Convert date objects to strings for MongoDB
-                    m_dict['date'] = str(m.date)
-                    metrics_dicts.append(m_dict)
-                else:
-                    metrics_dicts.append(m)
-
-            # Convert patterns and insights to serializable format
-            serialized_analysis = {
-                "performance_summary": analysis.get("performance_summary", {}),
-                "detected_patterns": [
-                    {
-                        "pattern_type": p.pattern_type,
-                        "description": p.description,
-                        "date_range": [str(p.date_range[0]), str(p.date_range[1])],
-                        "impact": p.impact
-                    }
-                    for p in analysis.get("detected_patterns", [])
-                ],
-                "content_insights": [
-                    {
-                        "campaign_id": i.campaign_id,
-                        "insight_type": i.insight_type,
-                        "explanation": i.explanation,
-                        "confidence": i.confidence,
-                        "evidence": i.evidence
-                    }
-                    for i in analysis.get("content_insights", [])
-                ],
-                "recommendations": analysis.get("recommendations", []),
-                "next_month_strategy": analysis.get("next_month_strategy", "")
-            }
+            from analytics.running_aggregates import RunningAggregates
+
+            metrics = self._campaign_metrics(campaign_id, metrics)
+            self.metrics_repository.replace_campaign_metrics(campaign_id, metrics)
+
+            aggregates = analysis.get("aggregates")
+            if aggregates is None:
+                aggregates = RunningAggregates.from_metrics(campaign_id, metrics)
 
             analytics_doc = {
                 "campaign_id": campaign_id,
-                "metrics": metrics_dicts,
-                "analysis": serialized_analysis,
+                "analysis": self._serialize_analysis(analysis),
+                "aggregates": aggregates.to_dict(),
+                "analyzed_snapshot": analysis.get("analyzed_snapshot") or aggregates.snapshot(),
                 "generated_at": datetime.now()
             }
 
@@ -240,20 +733,75 @@ class CampaignRepository:
             logger.error(f"Failed to save campaign analytics: {e}")
             raise
 
-    def get_campaign_analytics(self, campaign_id: str) -> Optional[Dict]:
+    def append_campaign_metrics(
+        self,
+        campaign_id: str,
+        new_metrics: List,
+        aggregates,
+        analysis: Optional[Dict] = None
+    ):
+        """
+        Append new daily metrics and running aggregates without rewriting analytics.
+
+        Only the new days are written to the time-series metrics collection;
+        the analysis is updated only when it was regenerated
+        (analysis["reanalyzed"] is true).
+
+        Args:
+            campaign_id: Campaign identifier
+            new_metrics: Newly arrived CampaignMetrics
+            aggregates: Updated RunningAggregates
+            analysis: Result of update_campaign_analytics (optional)
+        """
+        try:
+            self.metrics_repository.save_metrics(self._campaign_metrics(campaign_id, new_metrics))
+
+            update = {
+                "$set": {
+                    "analytics.campaign_id": campaign_id,
+                    "analytics.aggregates": aggregates.to_dict(),
+                    "analytics.updated_at": datetime.now()
+                }
+            }
+
+            if analysis and analysis.get("reanalyzed"):
+                update["$set"]["analytics.analysis"] = self._serialize_analysis(analysis)
+                update["$set"]["analytics.analyzed_snapshot"] = analysis.get("analyzed_snapshot")
+                update["$set"]["analytics.generated_at"] = datetime.now()
+            elif analysis:
+                # Totals always move; patterns/insights stay as last analyzed
+                update["$set"]["analytics.analysis.performance_summary"] = analysis.get("performance_summary", {})
+
+            self.mongo_collection.update_one(
+                {"_id": ObjectId(campaign_id)},
+                update,
+                upsert=False
+            )
+
+            logger.info(f"Appended {len(new_metrics)} day(s) of metrics for campaign {campaign_id}")
+
+        except Exception as e:
+            logger.error(f"Failed to append campaign metrics: {e}")
+            raise
+
+    def get_campaign_analytics(self, campaign_id: str, include_metrics: bool = True) -> Optional[Dict]:
         """
         Retrieve analytics for campaign.
 
         Args:
             campaign_id: Campaign identifier
+            include_metrics: Load daily metrics from the time-series collection
 
         Returns:
             Dict with analytics data or None if not found
         """
         try:
-            campaign = self.mongo_collection.find_one({"_id": ObjectId(campaign_id)})
+            campaign = self.mongo_collection.find_one({"_id": ObjectId(campaign_id)}, {"analytics": 1})
             analytics = campaign.get("analytics") if campaign else None
 
+            if analytics and include_metrics and "metrics" not in analytics:
+                analytics["metrics"] = self.metrics_repository.get_metrics(campaign_id)
+
             if analytics:
                 logger.info(f"Retrieved analytics for campaign {campaign_id}")
             else:
@@ -0,0 +1,479 @@
+# local_vector_index.py
+"""
+In-process vector index used when Milvus is unavailable.
+
+Vectors are L2-normalized and appended to a float32 file that is searched
+through a read-only memory map; the matching records (campaign id, text
+and scalar metadata such as workspace_id) live in a JSON-lines file next
+to it and can be used as equality filters. Search is brute force for
+small indexes and IVF (k-means lists, nprobe lists scanned) once the index
+is large enough. Distances are squared L2 between unit vectors, the same
+scale Milvus reports for the L2 metric, so similarity thresholds carry over.
+
+Several processes may share an index directory: writes and reloads hold an
+exclusive lock on a lock file next to the data (fcntl, where available), and
+each process picks up the others' appends before searching.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import shutil
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1536
+DEFAULT_NPROBE = 10
+DEFAULT_IVF_MIN_ROWS = 4096
+IVF_REBUILD_TAIL_RATIO = 0.25  # rebuild lists once this share of rows is unindexed
+
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+IVF_FILE = "ivf.npz"
+LOCK_FILE = ".lock"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class LocalVectorIndex:
+    """Memory-mapped float32 vector index with brute-force and IVF search."""
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int = EMBEDDING_DIM,
+        nprobe: int = DEFAULT_NPROBE,
+        ivf_min_rows: int = DEFAULT_IVF_MIN_ROWS
+    ):
+        """
+        Open (or create) an index directory.
+
+        Args:
+            directory: Directory holding vectors, records and IVF lists
+            dim: Vector dimension
+            nprobe: IVF lists scanned per query
+            ivf_min_rows: Build IVF lists once the index has this many rows
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+        self._records: List[Dict] = []
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._ivf = None
+        self._ivf_mtime = None
+        self._loaded = None  # _file_state() the in-memory view reflects
+        with self._locked():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # Loading / persistence
+
+    @contextmanager
+    def _locked(self):
+        """Hold the thread lock and, outermost only, the inter-process file lock."""
+        with self._lock:
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1 and fcntl is not None:
+                    self._lock_file = open(self.directory / LOCK_FILE, "a+b")
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    self._lock_file.close()  # releases the flock
+                    self._lock_file = None
+
+    def _file_state(self) -> Tuple:
+        """((records inode, vectors inode), records bytes, vectors bytes) of the files on disk."""
+        state = []
+        for name in (RECORDS_FILE, VECTORS_FILE):
+            try:
+                stat = os.stat(self.directory / name)
+                state.append((stat.st_ino, stat.st_size))
+            except FileNotFoundError:
+                state.append((None, 0))
+        (records_inode, records_bytes), (vectors_inode, vectors_bytes) = state
+        return (records_inode, vectors_inode), records_bytes, vectors_bytes
+
+    def _load(self):
+        """
+        Bring the in-memory view up to date with the files (caller holds _locked).
+
+        When the records file only grew since the last load, just the new
+        lines are parsed; a replaced file (rebuild / remove, possibly by
+        another process) is read in full. A torn trailing write is truncated,
+        which is safe because every writer appends under the same lock.
+        """
+        inodes, size, _ = self._file_state()
+        if self._loaded is not None and self._loaded[0] == inodes and size >= self._loaded[1]:
+            records, start = self._records, self._loaded[1]
+        else:
+            records, start = [], 0
+
+        new, offsets = [], [start]  # offsets[i]: byte length of the first len(records) + i records
+        records_path = self.directory / RECORDS_FILE
+        if size > start:
+            with open(records_path, "rb") as f:
+                f.seek(start)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        new.append(json.loads(line))
+                    except ValueError:
+                        break
+                    offsets.append(offsets[-1] + len(line))
+
+        vectors_path = self.directory / VECTORS_FILE
+        rows = vectors_path.stat().st_size // (self.dim * 4) if vectors_path.exists() else 0
+        if rows < len(records):
+            # Vectors lost rows we already parsed records for: start over from byte 0
+            self._loaded = None
+            return self._load()
+        n = min(rows, len(records) + len(new))
+        new = new[:n - len(records)]
+
+        # Cut both files back to the last complete row so the next append
+        # pairs each record with its own vector
+        if records_path.exists() and records_path.stat().st_size != offsets[len(new)]:
+            logger.warning(f"Truncating torn write in {records_path} to {n} records")
+            os.truncate(records_path, offsets[len(new)])
+        if vectors_path.exists() and vectors_path.stat().st_size != n * self.dim * 4:
+            logger.warning(f"Truncating torn write in {vectors_path} to {n} rows")
+            os.truncate(vectors_path, n * self.dim * 4)
+
+        # New list rather than extend(): searches may hold the old one
+        self._records = records + new if new else records
+        if n != len(self._vectors) or start == 0:
+            self._vectors = (
+                np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+                if n else np.zeros((0, self.dim), dtype=np.float32)
+            )
+        self._loaded = self._file_state()
+
+        ivf_path = self.directory / IVF_FILE
+        try:
+            ivf_mtime = ivf_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            ivf_mtime = None
+        if ivf_mtime != self._ivf_mtime:
+            self._ivf = None
+            if ivf_mtime is not None:
+                with np.load(ivf_path) as ivf:
+                    self._ivf = {key: ivf[key] for key in ivf.files}
+            self._ivf_mtime = ivf_mtime
+        if self._ivf is not None and int(self._ivf["n_indexed"]) > n:
+            self._ivf = None
+
+    def _sync(self):
+        """Pick up writes made by other processes (a stat call when nothing changed)."""
+        if self._file_state() != self._loaded:
+            with self._locked():
+                self._load()
+
+    def add(self, ids: List[str], texts: List[str], vectors, metadata: Optional[List[Dict]] = None) -> int:
+        """
+        Append vectors and their records.
+
+        Args:
+            ids: Record ids (e.g. MongoDB campaign ids)
+            texts: Texts returned by search
+            vectors: Embeddings, shape (len(texts), dim)
+            metadata: Optional scalar fields per record (usable as search filters)
+
+        Returns:
+            int: Index size after the append
+        """
+        vectors = normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        metadata = metadata or [{}] * len(texts)
+        if len(vectors) != len(texts) or len(ids) != len(texts) or len(metadata) != len(texts):
+            raise ValueError("ids, texts, vectors and metadata must have the same length")
+
+        with self._locked():
+            self._load()  # align with appends from other processes first
+            with open(self.directory / VECTORS_FILE, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.directory / RECORDS_FILE, "a", encoding="utf-8") as f:
+                for record_id, text, meta in zip(ids, texts, metadata):
+                    f.write(json.dumps({**meta, "id": record_id, "text": text}) + "\n")
+            self._load()
+
+            if self._needs_ivf():
+                self.build_ivf()
+            return len(self)
+
+    def rebuild(
+        self,
+        records: Iterable[Tuple],
+        embed: Callable[[List[str]], np.ndarray],
+        batch_size: int = 256
+    ) -> int:
+        """
+        Rebuild the index from scratch (e.g. from MongoDB campaigns).
+
+        Files are written to a temporary directory and swapped in, so
+        searches keep using the old index until the rebuild completes.
+        Rows added to the live index while staging (ids not present when the
+        rebuild started) are carried over into the new files.
+
+        Args:
+            records: Iterable of (id, text) or (id, text, metadata)
+            embed: Function embedding a list of texts into an array
+            batch_size: Texts embedded per call
+
+        Returns:
+            int: Number of rows indexed
+        """
+        with self._locked():
+            self._load()
+            existing = set(self.ids())
+        staging = LocalVectorIndex(
+            f"{self.directory}.rebuild-{os.getpid()}-{threading.get_ident()}",
+            self.dim, self.nprobe, ivf_min_rows=float("inf")
+        )
+        staging.clear()
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                staging._add_batch(batch, embed)
+                batch = []
+        if batch:
+            staging._add_batch(batch, embed)
+
+        with self._locked():
+            self._load()
+            staged = set(staging.ids())
+            late = [
+                i for i, record in enumerate(self._records)
+                if record["id"] not in existing and record["id"] not in staged
+            ]
+            if late:
+                staging.add(
+                    [self._records[i]["id"] for i in late],
+                    [self._records[i]["text"] for i in late],
+                    np.asarray(self._vectors[late], dtype=np.float32),
+                    [{f: v for f, v in self._records[i].items() if f not in ("id", "text")} for i in late]
+                )
+
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)  # drop the memmap before replacing
+            for name in (VECTORS_FILE, RECORDS_FILE):
+                os.replace(staging.directory / name, self.directory / name)
+            (self.directory / IVF_FILE).unlink(missing_ok=True)
+            shutil.rmtree(staging.directory, ignore_errors=True)
+            self._load()
+            if len(self) >= self.ivf_min_rows:
+                self.build_ivf()
+
+        logger.info(f"Rebuilt local vector index {self.directory} with {len(self)} rows")
+        return len(self)
+
+    def ids(self) -> List[str]:
+        """Record ids in row order (may repeat)."""
+        self._sync()
+        with self._lock:
+            return [record["id"] for record in self._records]
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """
+        Delete all rows with the given record ids (compacts the files).
+
+        Args:
+            ids: Record ids to delete
+
+        Returns:
+            int: Number of rows removed
+        """
+        ids = set(ids)
+        with self._locked():
+            self._load()
+            keep = [i for i, record in enumerate(self._records) if record["id"] not in ids]
+            removed = len(self._records) - len(keep)
+            if not removed:
+                return 0
+
+            vectors = np.asarray(self._vectors[keep], dtype=np.float32)
+            records = [self._records[i] for i in keep]
+            with open(self.directory / f"{VECTORS_FILE}.tmp", "wb") as f:
+                f.write(vectors.tobytes())
+            with open(self.directory / f"{RECORDS_FILE}.tmp", "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(record) + "\n" for record in records)
+
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)  # drop the memmap before replacing
+            for name in (VECTORS_FILE, RECORDS_FILE):
+                os.replace(self.directory / f"{name}.tmp", self.directory / name)
+            (self.directory / IVF_FILE).unlink(missing_ok=True)
+            self._load()
+            if len(self) >= self.ivf_min_rows:
+                self.build_ivf()
+
+        logger.info(f"Removed {removed} rows from local vector index {self.directory}")
+        return removed
+
+    def _add_batch(self, batch: List[Tuple], embed: Callable[[List[str]], np.ndarray]):
+        texts = [r[1] for r in batch]
+        metadata = [r[2] if len(r) > 2 else {} for r in batch]
+        self.add([r[0] for r in batch], texts, embed(texts), metadata)
+
+    def clear(self):
+        """Remove all vectors."""
+        with self._locked():
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+            for name in (VECTORS_FILE, RECORDS_FILE, IVF_FILE):
+                (self.directory / name).unlink(missing_ok=True)
+            self._load()
+
+    # IVF
+
+    def _needs_ivf(self) -> bool:
+        n = len(self)
+        if n < self.ivf_min_rows:
+            return False
+        if self._ivf is None:
+            return True
+        return n - int(self._ivf["n_indexed"]) > IVF_REBUILD_TAIL_RATIO * n
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """
+        Cluster vectors into nlist inverted lists (spherical k-means).
+
+        Args:
+            nlist: Number of lists (defaults to sqrt(rows))
+            iterations: k-means iterations (on a sample of up to 64 rows per list)
+            seed: Random seed
+        """
+        with self._locked():
+            vectors = self._vectors
+            n = len(vectors)
+            if n == 0:
+                return
+            nlist = min(nlist or max(1, int(np.sqrt(n))), n)
+            rng = np.random.default_rng(seed)
+
+            sample = vectors[np.sort(rng.choice(n, size=min(n, nlist * 64), replace=False))]
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = np.bincount(assignment, minlength=nlist) == 0
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+                centroids = normalize(sums)
+
+            # Assign all rows in chunks to bound memory
+            assignment = np.concatenate([
+                np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1)
+                for start in range(0, n, 8192)
+            ])
+            order = np.argsort(assignment, kind="stable")
+            offsets = np.searchsorted(assignment[order], np.arange(nlist + 1))
+
+            np.savez(self.directory / IVF_FILE, centroids=centroids, order=order, offsets=offsets, n_indexed=n)
+            self._ivf = {"centroids": centroids, "order": order, "offsets": offsets, "n_indexed": np.array(n)}
+            self._ivf_mtime = (self.directory / IVF_FILE).stat().st_mtime_ns
+            logger.info(f"Built IVF index with {nlist} lists over {n} rows")
+
+    # Search
+
+    def search(
+        self,
+        query,
+        k: int = 5,
+        nprobe: Optional[int] = None,
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Dict, float]]:
+        """
+        Nearest records to a query vector.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            nprobe: IVF lists to scan (defaults to the index nprobe)
+            filter: Only records whose fields equal these values (e.g. {"workspace_id": "w1"})
+
+        Returns:
+            List of (record, distance) sorted by distance, distance = squared L2
+            between normalized vectors (0 = identical, 4 = opposite)
+        """
+        q = normalize(np.asarray(query, dtype=np.float32).reshape(self.dim))
+        self._sync()
+        with self._lock:
+            vectors, records, ivf = self._vectors, self._records, self._ivf
+
+        n = len(records)
+        if n == 0:
+            return []
+
+        rows = None
+        if filter:
+            # Filtered searches scan only matching rows, so cost follows the filtered subset
+            rows = np.array(
+                [i for i, record in enumerate(records) if all(record.get(f) == v for f, v in filter.items())],
+                dtype=np.int64
+            )
+            if len(rows) == 0:
+                return []
+
+        if ivf is None or (rows is not None and len(rows) <= k * 64):
+            scores = vectors @ q if rows is None else vectors[rows] @ q
+        else:
+            probe = min(nprobe or self.nprobe, len(ivf["centroids"]))
+            lists = np.argpartition(-(ivf["centroids"] @ q), probe - 1)[:probe]
+            offsets, order = ivf["offsets"], ivf["order"]
+            probed = np.concatenate(
+                [order[offsets[i]:offsets[i + 1]] for i in lists]
+                + [np.arange(int(ivf["n_indexed"]), n)]  # rows added after the build
+            )
+            probed.sort()
+            rows = probed if rows is None else np.intersect1d(probed, rows, assume_unique=True)
+            scores = vectors[rows] @ q
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        indices = top if rows is None else rows[top]
+
+        return [(records[i], float(2.0 - 2.0 * scores[t])) for i, t in zip(indices, top)]
+
+
+_indexes: Dict[str, LocalVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_vector_index(name: str) -> LocalVectorIndex:
+    """
+    Get the process-wide local index for a collection name.
+
+    The directory is LOCAL_VECTOR_INDEX_DIR (default .cache/vector_index) / name.
+    """
+    directory = os.path.join(os.getenv("LOCAL_VECTOR_INDEX_DIR", ".cache/vector_index"), name)
+    with _indexes_lock:
+        if directory not in _indexes:
+            _indexes[directory] = LocalVectorIndex(directory)
+        return _indexes[directory]
@@ -0,0 +1,380 @@
+# metrics_repository.py
+"""
+Metrics Repository for campaign engagement metrics in MongoDB.
+
+Daily CampaignMetrics live in a dedicated time-series collection (metaField:
+campaign_id/platform, timeField: date) instead of being embedded in campaign
+documents. Daily, weekly and monthly rollups are maintained on write in a
+separate collection, so ranges and totals can be queried without loading
+raw rows.
+"""
+from pymongo import ASCENDING, UpdateOne, errors
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Union
+import logging
+import os
+import uuid
+
+import numpy as np
+
+from analytics.analytics_models import CampaignMetrics
+from analytics.metrics_frame import MetricsFrame, COUNTER_FIELDS
+from utils.mongodb_utils import get_mongo_client
+from repositories.migrations import COLLECTION_OPTIONS, INDEXES, ensure_collection, ensure_indexes, run_startup_migrations
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ["daily", "weekly", "monthly"]
+
+
+def _to_datetime(d: date) -> datetime:
+    """MongoDB stores dates as datetimes."""
+    return datetime(d.year, d.month, d.day)
+
+
+def period_start(d: date, granularity: str) -> date:
+    """
+    First day of the rollup period containing d.
+
+    Args:
+        d: Day
+        granularity: daily, weekly (weeks start Monday) or monthly
+
+    Returns:
+        Period start date
+    """
+    if granularity == "daily":
+        return d
+    if granularity == "weekly":
+        return d - timedelta(days=d.weekday())
+    if granularity == "monthly":
+        return d.replace(day=1)
+    raise ValueError(f"Unknown granularity '{granularity}' (expected one of {GRANULARITIES})")
+
+
+class MetricsRepository:
+    """Repository for time-series campaign metrics and their rollups."""
+
+    def __init__(
+        self,
+        connection_string: str = None,
+        collection_name: str = "campaign_metrics",
+        rollup_collection_name: str = "campaign_metrics_rollups"
+    ):
+        """
+        Initialize metrics repository.
+
+        Args:
+            connection_string: MongoDB connection string (defaults to env var)
+            collection_name: Time-series collection for daily metrics
+            rollup_collection_name: Collection for daily/weekly/monthly rollups
+        """
+        if connection_string is None:
+            connection_string = os.getenv("CONNECTION_STRING_MONGO")
+
+        self.client = get_mongo_client(connection_string)
+        self.db = self.client.get_database()
+        run_startup_migrations(self.db)
+        self._ensure_collections(collection_name, rollup_collection_name)
+        self.metrics = self.db[collection_name]
+        self.rollups = self.db[rollup_collection_name]
+        logger.info("MetricsRepository initialized")
+
+    def _ensure_collections(self, collection_name: str, rollup_collection_name: str):
+        """Create the time-series collection and registered indexes (for non-default names too)."""
+        ensure_collection(self.db, collection_name, COLLECTION_OPTIONS["campaign_metrics"])
+        ensure_indexes(self.db[collection_name], INDEXES["campaign_metrics"])
+        ensure_indexes(self.db[rollup_collection_name], INDEXES["campaign_metrics_rollups"])
+
+    def save_metrics(self, metrics: Union[List[CampaignMetrics], MetricsFrame]) -> int:
+        """
+        Insert daily metrics and update rollups.
+
+        Each (campaign, platform, day) should be written once; rollups are
+        incremented, so re-inserting a day counts it twice. If some rows are
+        rejected, rollups are still applied for the rows that were inserted
+        before the error is raised, so only the rejected rows need a retry.
+
+        Args:
+            metrics: Daily CampaignMetrics (any campaigns) or a MetricsFrame
+
+        Returns:
+            int: Number of rows inserted
+
+        Raises:
+            BulkWriteError: If some rows were not inserted (see its writeErrors)
+        """
+        frames = self._frames(metrics)
+        if not frames:
+            return 0
+
+        try:
+            docs = [(i, doc) for i, frame in enumerate(frames) for doc in frame.to_documents()]
+            insert_error = None
+            try:
+                self.metrics.insert_many([doc for _, doc in docs], ordered=False)
+            except errors.BulkWriteError as e:
+                # Unordered insert: every row except the reported ones was written
+                failed = {write_error["index"] for write_error in e.details.get("writeErrors", [])}
+                inserted = defaultdict(list)
+                for position, (i, doc) in enumerate(docs):
+                    if position not in failed:
+                        inserted[i].append(doc)
+                frames = [MetricsFrame.from_documents(rows) for rows in inserted.values()]
+                insert_error = e
+
+            operations = [op for frame in frames for op in self._rollup_operations(frame)]
+            if operations:
+                self.rollups.bulk_write(operations, ordered=False)
+
+            saved = sum(len(frame) for frame in frames)
+            if insert_error is not None:
+                logger.error(f"Saved {saved} of {len(docs)} metric rows; rollups include only the saved rows")
+                raise insert_error
+
+            logger.info(f"Saved {saved} metric rows")
+            return saved
+
+        except Exception as e:
+            logger.error(f"Failed to save metrics: {e}")
+            raise
+
+    def replace_campaign_metrics(self, campaign_id: str, metrics: Union[List[CampaignMetrics], MetricsFrame]) -> int:
+        """
+        Replace all daily metrics and rollups of a campaign.
+
+        The new rows and rollups are written first, tagged with a write id,
+        and only then are the campaign's older rows and rollups deleted, so a
+        failure never leaves the campaign without metrics. If the insert is
+        only partly applied, the new rows are removed again and the old ones
+        kept.
+
+        Args:
+            campaign_id: Campaign identifier (all metrics must belong to it)
+            metrics: The campaign's daily CampaignMetrics or a MetricsFrame
+
+        Returns:
+            int: Number of rows written
+        """
+        frames = self._frames(metrics)
+        write_id = uuid.uuid4().hex
+
+        try:
+            docs = [doc for frame in frames for doc in frame.to_documents()]
+            for doc in docs:
+                doc["meta"]["write_id"] = write_id
+            if docs:
+                try:
+                    self.metrics.insert_many(docs, ordered=False)
+                except errors.BulkWriteError:
+                    self.metrics.delete_many({"meta.campaign_id": campaign_id, "meta.write_id": write_id})
+                    raise
+
+            operations = [op for frame in frames for op in self._rollup_operations(frame, write_id)]
+            if operations:
+                self.rollups.bulk_write(operations, ordered=False)
+
+            # Deletes filter on the metaField only, as time-series collections require
+            self.metrics.delete_many({"meta.campaign_id": campaign_id, "meta.write_id": {"$ne": write_id}})
+            self.rollups.delete_many({"campaign_id": campaign_id, "write_id": {"$ne": write_id}})
+
+            logger.info(f"Replaced metrics for campaign {campaign_id} with {len(docs)} rows")
+            return len(docs)
+
+        except Exception as e:
+            logger.error(f"Failed to replace metrics for campaign {campaign_id}: {e}")
+            raise
+
+    @staticmethod
+    def _frames(metrics: Union[List[CampaignMetrics], MetricsFrame]) -> List[MetricsFrame]:
+        """Non-empty frames, one per (campaign, platform)."""
+        if isinstance(metrics, MetricsFrame):
+            frames = [metrics]
+        else:
+            grouped = defaultdict(list)
+            for m in metrics:
+                grouped[(m.campaign_id, m.platform)].append(m)
+            frames = [MetricsFrame.from_metrics(group) for group in grouped.values()]
+        return [f for f in frames if len(f)]
+
+    def _rollup_operations(self, frame: MetricsFrame, write_id: Optional[str] = None) -> List[UpdateOne]:
+        """
+        Build upserts for daily/weekly/monthly rollups of one frame.
+
+        Args:
+            frame: Metrics of one campaign and platform
+            write_id: Set the rollups to the frame's sums, tagged with this id
+                (replace_campaign_metrics), instead of incrementing them
+
+        Returns:
+            List of UpdateOne operations
+        """
+        days = frame.dates
+        period_starts = {
+            "daily": days,
+            "weekly": days - frame.weekdays.astype('timedelta64[D]'),
+            "monthly": days.astype('datetime64[M]').astype('datetime64[D]')
+        }
+        counters = {f: getattr(frame, f) for f in COUNTER_FIELDS}
+        now = datetime.now()
+
+        operations = []
+        for granularity, starts in period_starts.items():
+            # Days are sorted, so each period is a contiguous run
+            unique_starts, offsets, counts = np.unique(starts, return_index=True, return_counts=True)
+            sums = {f: np.add.reduceat(values, offsets) for f, values in counters.items()}
+
+            for i, start in enumerate(unique_starts.astype(date)):
+                delta = {"days": int(counts[i]), **{f: int(sums[f][i]) for f in COUNTER_FIELDS}}
+                if write_id is None:
+                    update = {"$inc": delta, "$set": {"updated_at": now}}
+                else:
+                    update = {"$set": {**delta, "updated_at": now, "write_id": write_id}}
+                operations.append(UpdateOne(
+                    {
+                        "campaign_id": frame.campaign_id,
+                        "platform": frame.platform,
+                        "granularity": granularity,
+                        "period_start": _to_datetime(start)
+                    },
+                    update,
+                    upsert=True
+                ))
+        return operations
+
+    def get_metrics_frame(
+        self,
+        campaign_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> MetricsFrame:
+        """
+        Get daily metrics for a campaign in a date range as a MetricsFrame.
+
+        Args:
+            campaign_id: Campaign identifier
+            start: First day (inclusive, optional)
+            end: Last day (inclusive, optional)
+
+        Returns:
+            MetricsFrame sorted by date
+        """
+        try:
+            query = {"meta.campaign_id": campaign_id}
+            date_filter = {}
+            if start:
+                date_filter["$gte"] = _to_datetime(start)
+            if end:
+                date_filter["$lte"] = _to_datetime(end)
+            if date_filter:
+                query["date"] = date_filter
+
+            rows = list(self.metrics.find(query, {"_id": 0}).sort("date", ASCENDING))
+            frame = MetricsFrame.from_documents(rows)
+            frame.campaign_id = campaign_id
+            return frame
+
+        except Exception as e:
+            logger.error(f"Failed to get metrics for campaign {campaign_id}: {e}")
+            raise
+
+    def get_metrics(
+        self,
+        campaign_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> List[CampaignMetrics]:
+        """
+        Get daily metrics for a campaign in a date range.
+
+        Args:
+            campaign_id: Campaign identifier
+            start: First day (inclusive, optional)
+            end: Last day (inclusive, optional)
+
+        Returns:
+            List of CampaignMetrics sorted by date
+        """
+        return self.get_metrics_frame(campaign_id, start, end).to_metrics()
+
+    def get_rollups(
+        self,
+        campaign_id: str,
+        granularity: str = "daily",
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Get pre-aggregated rollups for a campaign.
+
+        Args:
+            campaign_id: Campaign identifier
+            granularity: daily, weekly or monthly
+            start: Earliest period start (inclusive, optional)
+            end: Latest period start (inclusive, optional)
+
+        Returns:
+            List of rollup dicts (period_start, platform, days, counters) sorted by period
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}' (expected one of {GRANULARITIES})")
+
+        query = {"campaign_id": campaign_id, "granularity": granularity}
+        period_filter = {}
+        if start:
+            period_filter["$gte"] = _to_datetime(period_start(start, granularity))
+        if end:
+            period_filter["$lte"] = _to_datetime(end)
+        if period_filter:
+            query["period_start"] = period_filter
+
+        rollups = list(self.rollups.find(query, {"_id": 0}).sort("period_start", ASCENDING))
+        for r in rollups:
+            r["period_start"] = r["period_start"].date()
+        return rollups
+
+    def get_totals(
+        self,
+        campaign_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict:
+        """
+        Aggregate totals for a campaign over a date range from daily rollups.
+
+        Args:
+            campaign_id: Campaign identifier
+            start: First day (inclusive, optional)
+            end: Last day (inclusive, optional)
+
+        Returns:
+            Dict with days, counter totals, total_engagement and engagement_rate
+        """
+        match = {"campaign_id": campaign_id, "granularity": "daily"}
+        period_filter = {}
+        if start:
+            period_filter["$gte"] = _to_datetime(start)
+        if end:
+            period_filter["$lte"] = _to_datetime(end)
+        if period_filter:
+            match["period_start"] = period_filter
+
+        group = {"_id": None, "days": {"$sum": "$days"}}
+        group.update({f: {"$sum": f"${f}"} for f in COUNTER_FIELDS})
+
+        result = list(self.rollups.aggregate([{"$match": match}, {"$group": group}]))
+        totals = result[0] if result else {"days": 0, **{f: 0 for f in COUNTER_FIELDS}}
+        totals.pop("_id", None)
+
+        totals["total_engagement"] = totals["likes"] + totals["comments"] + totals["shares"]
+        totals["engagement_rate"] = (
+            totals["total_engagement"] / totals["views"] if totals["views"] > 0 else 0
+        )
+        return totals
+
+    def delete_campaign_metrics(self, campaign_id: str):
+        """Delete all metrics and rollups for a campaign."""
+        self.metrics.delete_many({"meta.campaign_id": campaign_id})
+        self.rollups.delete_many({"campaign_id": campaign_id})
+        logger.info(f"Deleted metrics for campaign {campaign_id}")
@@ -0,0 +1,216 @@
+# migrations.py
+"""
+Index registry and startup migrations for MongoDB collections.
+
+INDEXES lists the indexes every collection needs for its hot queries
+(HOT_QUERIES); run_startup_migrations() creates missing collections and
+indexes and applies pending one-time data migrations, recording them in
+the schema_migrations collection. Everything here is idempotent, so it is
+safe to run from every process on startup.
+"""
+from pymongo import ASCENDING, DESCENDING, errors
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+# Collections that need creation options (created before their indexes)
+COLLECTION_OPTIONS: Dict[str, Dict] = {
+    "campaign_metrics": {
+        "timeseries": {"timeField": "date", "metaField": "meta", "granularity": "hours"}
+    }
+}
+
+# collection -> index specs ({"keys": [...], **create_index options})
+INDEXES: Dict[str, List[Dict]] = {
+    "content_templates": [
+        # get/update/delete/increment by name within a workspace; names are unique per workspace
+        {"keys": [("workspace_id", ASCENDING), ("name", ASCENDING)], "unique": True},
+        # get_all_templates: newest first
+        {"keys": [("workspace_id", ASCENDING), ("created_at", DESCENDING)]},
+        # get_template_stats: most used first
+        {"keys": [("workspace_id", ASCENDING), ("usage_count", DESCENDING)]},
+        # MongoDBClient.get_template_by_name (no workspace filter)
+        {"keys": [("name", ASCENDING)]}
+    ],
+    "audiences": [
+        {"keys": [("name", ASCENDING)]}
+    ],
+    "campaign_metrics": [
+        {"keys": [("meta.campaign_id", ASCENDING), ("date", ASCENDING)]}
+    ],
+    "campaign_metrics_rollups": [
+        {
+            "keys": [("campaign_id", ASCENDING), ("granularity", ASCENDING), ("period_start", ASCENDING), ("platform", ASCENDING)],
+            "unique": True
+        }
+    ]
+}
+
+# Queries that must be served by an index (checked with explain() in tests)
+HOT_QUERIES: List[Dict] = [
+    {"collection": "content_templates", "filter": {"name": "t", "workspace_id": "default"}},
+    {"collection": "content_templates", "filter": {"workspace_id": "default"}, "sort": [("created_at", DESCENDING)]},
+    {"collection": "content_templates", "filter": {"workspace_id": "default"}, "sort": [("usage_count", DESCENDING)]},
+    {"collection": "content_templates", "filter": {"name": "t"}},
+    {
+        "collection": "campaign_metrics_rollups",
+        "filter": {"campaign_id": "c", "granularity": "daily"},
+        "sort": [("period_start", ASCENDING)]
+    }
+]
+
+
+def _set_default_usage_count(db):
+    """Seeded templates have no usage_count; stats and sorting expect one."""
+    result = db.content_templates.update_many(
+        {"usage_count": {"$exists": False}},
+        {"$set": {"usage_count": 0}}
+    )
+    logger.info(f"Set usage_count=0 on {result.modified_count} templates")
+
+
+# One-time data migrations, applied in order and recorded by id
+MIGRATIONS: List[Tuple[str, Callable]] = [
+    ("0001_template_usage_count_default", _set_default_usage_count)
+]
+
+_migrated_databases = set()
+_migrations_lock = threading.Lock()
+
+
+def ensure_collection(db, name: str, options: Optional[Dict] = None):
+    """
+    Create a collection with options if it does not exist.
+
+    Args:
+        db: pymongo Database
+        name: Collection name
+        options: create_collection options (e.g. timeseries)
+    """
+    if not options or name in db.list_collection_names():
+        return
+
+    try:
+        db.create_collection(name, **options)
+        logger.info(f"Created collection: {name}")
+    except errors.CollectionInvalid:
+        pass  # created concurrently
+    except errors.PyMongoError as e:
+        # Time-series needs MongoDB 5.0+; a regular collection still works
+        logger.warning(f"Collection options unavailable for {name} ({e}), using regular collection")
+
+
+def ensure_indexes(collection, specs: List[Dict]) -> List[str]:
+    """
+    Create indexes (no-op for existing ones).
+
+    A unique index that cannot be built because of existing duplicates is
+    logged and skipped instead of failing startup.
+
+    Args:
+        collection: pymongo Collection
+        specs: Index specs from INDEXES
+
+    Returns:
+        List of index names ensured
+    """
+    names = []
+    for spec in specs:
+        options = {k: v for k, v in spec.items() if k != "keys"}
+        try:
+            names.append(collection.create_index(spec["keys"], **options))
+        except errors.OperationFailure as e:
+            logger.error(f"Could not create index {spec['keys']} on {collection.name}: {e}")
+    return names
+
+
+def run_migrations(db) -> List[str]:
+    """
+    Create registered collections and indexes, then apply pending data migrations.
+
+    Args:
+        db: pymongo Database
+
+    Returns:
+        List of data migration ids applied in this run
+    """
+    for name, options in COLLECTION_OPTIONS.items():
+        ensure_collection(db, name, options)
+
+    for name, specs in INDEXES.items():
+        ensure_indexes(db[name], specs)
+
+    applied_before = {m["_id"] for m in db[MIGRATIONS_COLLECTION].find({}, {"_id": 1})}
+    applied = []
+    for migration_id, migrate in MIGRATIONS:
+        if migration_id in applied_before:
+            continue
+        migrate(db)
+        db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": migration_id},
+            {"$set": {"applied_at": datetime.now()}},
+            upsert=True
+        )
+        applied.append(migration_id)
+        logger.info(f"Applied migration {migration_id}")
+
+    return applied
+
+
+def run_startup_migrations(db):
+    """
+    Run migrations once per process per database; errors are logged, not raised.
+
+    Args:
+        db: pymongo Database
+    """
+    if db.name in _migrated_databases:
+        return
+
+    with _migrations_lock:
+        if db.name in _migrated_databases:
+            return
+        try:
+            run_migrations(db)
+            logger.info(f"Database '{db.name}' indexes and migrations up to date")
+        except Exception as e:
+            logger.error(f"Startup migrations failed for database '{db.name}': {e}")
+        # Don't retry on every repository construction; the next process will
+        _migrated_databases.add(db.name)
+
+
+def _plan_stages(plan) -> List[str]:
+    """All stage names in an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def explain_stages(collection, query_filter: Dict, sort: Optional[List] = None) -> List[str]:
+    """
+    Stages of the winning plan for a find (e.g. ["FETCH", "IXSCAN"]).
+
+    Args:
+        collection: pymongo Collection
+        query_filter: find() filter
+        sort: Optional sort spec
+
+    Returns:
+        List of stage names
+    """
+    cursor = collection.find(query_filter)
+    if sort:
+        cursor = cursor.sort(sort)
+    return _plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
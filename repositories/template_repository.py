@@ -4,32 +4,59 @@ Template Repository for managing content templates in MongoDB.
 
 Handles CRUD operations for both user-created and AI-generated templates.
 """
-from pymongo import MongoClient
+from pymongo import ReplaceOne, errors
+from utils.mongodb_utils import get_mongo_client
+from repositories.bulk import BulkSaveResult, chunks, insert_many_unordered
+from repositories.migrations import run_startup_migrations
+from repositories.usage_buffer import get_usage_buffer
+from utils.template_cache import invalidate_template_cache
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 logger = logging.getLogger(__name__)
 
+EMPTY_TEMPLATE_STATS = {
+    "total_templates": 0,
+    "ai_generated": 0,
+    "user_modified": 0,
+    "manual_created": 0,
+    "most_used_template": None,
+    "most_used_count": 0
+}
+
+# (database, workspace_id) -> (expires_at, stats); shared by all repository instances
+_stats_cache: Dict[tuple, tuple] = {}
+_stats_cache_lock = threading.Lock()
+
 
 class TemplateRepository:
     """Repository for managing content templates in MongoDB."""
 
-    def __init__(self, connection_string: str = None):
+    def __init__(self, connection_string: str = None, stats_cache_ttl: float = None):
         """
         Initialize template repository.
 
         Args:
             connection_string: MongoDB connection string (defaults to env var)
+            stats_cache_ttl: Seconds to cache template stats (defaults to
+                TEMPLATE_STATS_CACHE_TTL_SECONDS env var, 0 = no caching)
         """
+        if stats_cache_ttl is None:
+            stats_cache_ttl = float(os.getenv("TEMPLATE_STATS_CACHE_TTL_SECONDS", "0"))
+        self.stats_cache_ttl = stats_cache_ttl
+
         if connection_string is None:
             connection_string = os.getenv("CONNECTION_STRING_MONGO")
 
-        self.client = MongoClient(connection_string)
+        self.client = get_mongo_client(connection_string)
         self.db = self.client.get_database()
+        run_startup_migrations(self.db)
         self.templates = self.db.content_templates
         logger.info("TemplateRepository initialized")
 
@@ -90,6 +117,8 @@ class TemplateRepository:
             # Insert document
             result = self.templates.insert_one(template_doc)
             template_id = str(result.inserted_id)
+            self._invalidate_stats(workspace_id)
+            invalidate_template_cache()
 
             logger.info(f"✅ Saved AI template: '{template_name}' (id: {template_id})")
             return template_id
@@ -101,6 +130,66 @@ class TemplateRepository:
             logger.error(f"Error saving AI template: {e}")
             raise
 
+    def save_templates(self, templates: List[Dict]) -> BulkSaveResult:
+        """
+        Insert many template documents with insert_many(ordered=False).
+
+        Args:
+            templates: Template documents (name, liquid_template, items, ...)
+
+        Returns:
+            BulkSaveResult; duplicate names in a workspace become per-item errors
+        """
+        now = datetime.now()
+        docs = [{"created_at": now, "updated_at": now, "usage_count": 0, **template} for template in templates]
+        result = insert_many_unordered(self.templates, docs)
+        for template, doc in zip(templates, docs):
+            template.setdefault("_id", doc.get("_id"))
+
+        self._invalidate_all_stats()
+        invalidate_template_cache()
+        return result
+
+    def upsert_templates(self, templates: List[Dict], batch_size: int = 500) -> BulkSaveResult:
+        """
+        Insert or replace template documents by _id in unordered bulk writes.
+
+        Args:
+            templates: Template documents, each with an _id
+            batch_size: Documents per bulk_write
+
+        Returns:
+            BulkSaveResult with per-template errors
+        """
+        result = BulkSaveResult()
+        now = datetime.now()
+        failed = set()
+
+        for offset, batch in chunks(templates, batch_size):
+            operations = [
+                ReplaceOne({"_id": t["_id"]}, {"usage_count": 0, "created_at": now, **t, "updated_at": now}, upsert=True)
+                for t in batch
+            ]
+            try:
+                self.templates.bulk_write(operations, ordered=False)
+            except errors.BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    index = offset + write_error["index"]
+                    failed.add(index)
+                    result.add_error(index, templates[index].get("name", ""), "mongo", write_error.get("errmsg", ""))
+            except errors.PyMongoError as e:
+                for index in range(offset, offset + len(batch)):
+                    failed.add(index)
+                    result.add_error(index, templates[index].get("name", ""), "mongo", str(e))
+
+        result.inserted_ids = [t["_id"] for i, t in enumerate(templates) if i not in failed]
+        result.saved = len(result.inserted_ids)
+        logger.info(f"Upserted {result.saved} templates ({result.failed} failed)")
+
+        self._invalidate_all_stats()
+        invalidate_template_cache()
+        return result
+
     def update_template(
         self,
         template_name: str,
@@ -139,6 +228,8 @@ class TemplateRepository:
             )
 
             if result.matched_count > 0:
+                self._invalidate_stats(workspace_id)
+                invalidate_template_cache()
                 logger.info(f"✅ Updated template: '{template_name}'")
                 return True
             else:
@@ -207,6 +298,8 @@ class TemplateRepository:
             result = self.templates.delete_one({"name": template_name, "workspace_id": workspace_id})
 
             if result.deleted_count > 0:
+                self._invalidate_stats(workspace_id)
+                invalidate_template_cache()
                 logger.info(f"✅ Deleted template: '{template_name}'")
                 return True
             else:
@@ -217,74 +310,153 @@ class TemplateRepository:
             logger.error(f"Error deleting template: {e}")
             return False
 
-    def increment_usage_count(self, template_name: str, workspace_id: str = "default") -> bool:
+    def increment_usage_count(self, template_name: str, workspace_id: Optional[str] = "default") -> bool:
         """
         Increment usage counter when template is used in a campaign.
 
+        The increment is buffered and written in bulk by the write-behind
+        usage buffer (see flush_usage_counts). The template is not looked
+        up: an increment for a name that does not exist is queued too and
+        matches nothing when flushed.
+
         Args:
             template_name: Name of template
-            workspace_id: Workspace identifier
+            workspace_id: Workspace identifier (None for templates without one)
 
         Returns:
-            bool: True if updated successfully
+            bool: True if the increment was queued (not whether the template
+            exists; flush_usage_counts reports the templates actually matched)
         """
         try:
-            result = self.templates.update_one(
-                {"name": template_name, "workspace_id": workspace_id},
-                {"$inc": {"usage_count": 1}}
-            )
-
-            return result.matched_count > 0
+            get_usage_buffer(self.templates).add(template_name, workspace_id)
+            return True
 
         except Exception as e:
             logger.error(f"Error incrementing usage count: {e}")
             return False
 
-    def get_template_stats(self, workspace_id: str = "default") -> Dict:
+    def flush_usage_counts(self) -> int:
+        """
+        Write buffered usage count increments now.
+
+        Returns:
+            int: Number of templates matched by an increment (unknown names are not counted)
+        """
+        return get_usage_buffer(self.templates).flush()
+
+    def get_template_stats(self, workspace_id: str = "default", use_cache: bool = True) -> Dict:
         """
         Get statistics about templates in workspace.
 
         Args:
             workspace_id: Workspace identifier
+            use_cache: Serve from the short-TTL stats cache when enabled
 
         Returns:
             Dict with template statistics
         """
+        return self.get_workspaces_template_stats([workspace_id], use_cache)[workspace_id]
+
+    def get_workspaces_template_stats(self, workspace_ids: List[str], use_cache: bool = True) -> Dict[str, Dict]:
+        """
+        Get template statistics for several workspaces in one aggregation.
+
+        Counts and the most used template per workspace come from a single
+        $facet pipeline (one round trip regardless of workspace count).
+        Results are cached for TEMPLATE_STATS_CACHE_TTL_SECONDS (0 disables).
+
+        Args:
+            workspace_ids: Workspace identifiers
+            use_cache: Serve from the stats cache when enabled
+
+        Returns:
+            Dict mapping workspace_id to template statistics
+        """
+        stats = {}
+        missing = []
+        for workspace_id in workspace_ids:
+            cached = self._cached_stats(workspace_id) if use_cache else None
+            if cached is not None:
+                stats[workspace_id] = cached
+            else:
+                missing.append(workspace_id)
+
+        if not missing:
+            return stats
+
         try:
-            total = self.templates.count_documents({"workspace_id": workspace_id})
-            ai_generated = self.templates.count_documents({
-                "workspace_id": workspace_id,
-                "metadata.is_ai_generated": True
-            })
-            user_modified = self.templates.count_documents({
-                "workspace_id": workspace_id,
-                "metadata.user_modified": True
-            })
-
-            # Get most used template
-            most_used = list(self.templates.find(
-                {"workspace_id": workspace_id}
-            ).sort("usage_count", -1).limit(1))
-
-            stats = {
-                "total_templates": total,
-                "ai_generated": ai_generated,
-                "user_modified": user_modified,
-                "manual_created": total - ai_generated,
-                "most_used_template": most_used[0]["name"] if most_used else None,
-                "most_used_count": most_used[0]["usage_count"] if most_used else 0
-            }
+            # Include increments still waiting in the write-behind buffer
+            self.flush_usage_counts()
+
+            pipeline = [
+                {"$match": {"workspace_id": {"$in": missing}}},
+                # Served by the (workspace_id, usage_count) index, so $first is the most used
+                {"$sort": {"workspace_id": 1, "usage_count": -1}},
+                {"$facet": {
+                    "counts": [
+                        {"$group": {
+                            "_id": "$workspace_id",
+                            "total_templates": {"$sum": 1},
+                            "ai_generated": {"$sum": {"$cond": [{"$eq": ["$metadata.is_ai_generated", True]}, 1, 0]}},
+                            "user_modified": {"$sum": {"$cond": [{"$eq": ["$metadata.user_modified", True]}, 1, 0]}}
+                        }}
+                    ],
+                    "most_used": [
+                        {"$group": {
+                            "_id": "$workspace_id",
+                            "name": {"$first": "$name"},
+                            "usage_count": {"$first": "$usage_count"}
+                        }}
+                    ]
+                }}
+            ]
+            result = next(self.templates.aggregate(pipeline), {"counts": [], "most_used": []})
+            counts = {c["_id"]: c for c in result["counts"]}
+            most_used = {m["_id"]: m for m in result["most_used"]}
+
+            for workspace_id in missing:
+                c = counts.get(workspace_id, {})
+                top = most_used.get(workspace_id)
+                total = c.get("total_templates", 0)
+                ai_generated = c.get("ai_generated", 0)
+                stats[workspace_id] = {
+                    "total_templates": total,
+                    "ai_generated": ai_generated,
+                    "user_modified": c.get("user_modified", 0),
+                    "manual_created": total - ai_generated,
+                    "most_used_template": top["name"] if top else None,
+                    "most_used_count": (top.get("usage_count") or 0) if top else 0
+                }
+                self._cache_stats(workspace_id, stats[workspace_id])
+                logger.info(f"Template stats for workspace '{workspace_id}': {stats[workspace_id]}")
 
-            logger.info(f"Template stats for workspace '{workspace_id}': {stats}")
             return stats
 
         except Exception as e:
             logger.error(f"Error getting template stats: {e}")
-            return {
-                "total_templates": 0,
-                "ai_generated": 0,
-                "user_modified": 0,
-                "manual_created": 0,
-                "most_used_template": None,
-                "most_used_count": 0
-            }
+            for workspace_id in missing:
+                stats[workspace_id] = dict(EMPTY_TEMPLATE_STATS)
+            return stats
+
+    def _cached_stats(self, workspace_id: str) -> Optional[Dict]:
+        """Unexpired cached stats for a workspace, or None."""
+        with _stats_cache_lock:
+            entry = _stats_cache.get((self.db.name, workspace_id))
+        if entry and entry[0] > time.monotonic():
+            return dict(entry[1])
+        return None
+
+    def _cache_stats(self, workspace_id: str, stats: Dict):
+        if self.stats_cache_ttl <= 0:
+            return
+        with _stats_cache_lock:
+            _stats_cache[(self.db.name, workspace_id)] = (time.monotonic() + self.stats_cache_ttl, dict(stats))
+
+    def _invalidate_stats(self, workspace_id: str):
+        with _stats_cache_lock:
+            _stats_cache.pop((self.db.name, workspace_id), None)
+
+    def _invalidate_all_stats(self):
+        with _stats_cache_lock:
+            for key in [k for k in _stats_cache if k[0] == self.db.name]:
+                del _stats_cache[key]
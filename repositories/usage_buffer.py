@@ -0,0 +1,168 @@
+# usage_buffer.py
+"""
+Write-behind buffer for template usage counters.
+
+Increments are accumulated in memory per (workspace_id, template name) and
+written as one unordered bulk_write of $inc updates every flush interval
+or once enough increments are pending, instead of one update per use.
+Pending deltas are flushed on interpreter exit; a hard crash loses at most
+one flush interval of counts.
+"""
+from pymongo import UpdateOne, errors
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+import atexit
+import logging
+import os
+import threading
+
+from utils.monitoring import track_metric
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL_MS = 1000
+DEFAULT_FLUSH_MAX_OPS = 100
+
+_buffers: Dict[Tuple[str, str], "UsageCountBuffer"] = {}
+_buffers_lock = threading.Lock()
+
+
+class UsageCountBuffer:
+    """Accumulates usage_count increments and flushes them in bulk."""
+
+    def __init__(self, collection, flush_interval_ms: Optional[int] = None, max_pending_ops: Optional[int] = None):
+        """
+        Initialize usage buffer and start its flusher thread.
+
+        Args:
+            collection: content_templates collection
+            flush_interval_ms: Max time increments stay buffered (defaults to
+                TEMPLATE_USAGE_FLUSH_MS env var or 1000)
+            max_pending_ops: Flush early once this many increments are pending
+                (defaults to TEMPLATE_USAGE_FLUSH_OPS env var or 100)
+        """
+        if flush_interval_ms is None:
+            flush_interval_ms = int(os.getenv("TEMPLATE_USAGE_FLUSH_MS", DEFAULT_FLUSH_INTERVAL_MS))
+        if max_pending_ops is None:
+            max_pending_ops = int(os.getenv("TEMPLATE_USAGE_FLUSH_OPS", DEFAULT_FLUSH_MAX_OPS))
+
+        self.collection = collection
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending_ops = max_pending_ops
+
+        self._pending: Dict[Tuple[Optional[str], str], int] = defaultdict(int)
+        self._pending_ops = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.flushes = 0
+        self.flushed_ops = 0
+
+        self._thread = threading.Thread(target=self._run, name="template-usage-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, template_name: str, workspace_id: Optional[str] = "default", delta: int = 1):
+        """
+        Buffer an increment (no database round trip).
+
+        Args:
+            template_name: Template name
+            workspace_id: Workspace identifier (None matches templates without one)
+            delta: Increment
+        """
+        with self._lock:
+            self._pending[(workspace_id, template_name)] += delta
+            self._pending_ops += 1
+            should_flush = self._pending_ops >= self.max_pending_ops
+
+        if self._closed:
+            self.flush()
+        elif should_flush:
+            self._wakeup.set()
+
+    def pending_deltas(self) -> int:
+        """Total increments not yet written."""
+        with self._lock:
+            return sum(self._pending.values())
+
+    def flush(self) -> int:
+        """
+        Write pending increments as one bulk_write.
+
+        Failed increments are merged back into the buffer and retried on the
+        next flush. On a partial failure only the failed increments are
+        re-queued: the others were already applied by the unordered write.
+
+        Returns:
+            int: Number of templates updated (matched by an increment)
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+                self._pending.clear()
+                self._pending_ops = 0
+
+            if not batch:
+                return 0
+
+            items = list(batch.items())
+            operations = [
+                UpdateOne({"name": name, "workspace_id": workspace_id}, {"$inc": {"usage_count": delta}})
+                for (workspace_id, name), delta in items
+            ]
+            try:
+                result = self.collection.bulk_write(operations, ordered=False)
+                matched, failed = result.matched_count, []
+            except errors.BulkWriteError as e:
+                logger.error(f"Failed to flush some template usage counts: {e}")
+                matched = e.details.get("nMatched", 0)
+                failed = sorted({write_error["index"] for write_error in e.details.get("writeErrors", [])})
+            except Exception as e:
+                logger.error(f"Failed to flush template usage counts: {e}")
+                matched, failed = 0, list(range(len(items)))
+
+            if failed:
+                with self._lock:
+                    for index in failed:
+                        key, delta = items[index]
+                        self._pending[key] += delta
+                    self._pending_ops += len(failed)
+            if len(failed) < len(items):
+                self.flushes += 1
+                self.flushed_ops += len(items) - len(failed)
+                logger.debug(f"Flushed usage counts for {matched} templates")
+
+            track_metric("template_usage_pending_deltas", self.pending_deltas())
+            return matched
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the flusher and write everything pending."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        remaining = self.pending_deltas()
+        if remaining:
+            logger.error(f"{remaining} template usage increments could not be written on shutdown")
+
+
+def get_usage_buffer(collection) -> UsageCountBuffer:
+    """Get the process-wide usage buffer for a templates collection."""
+    key = (collection.database.name, collection.name)
+    buffer = _buffers.get(key)
+    if buffer is None:
+        with _buffers_lock:
+            buffer = _buffers.get(key)
+            if buffer is None:
+                buffer = _buffers[key] = UsageCountBuffer(collection)
+    return buffer
@@ -0,0 +1,260 @@
+# vector_benchmark.py
+"""
+Recall / latency benchmark for campaign vector search.
+
+Builds a synthetic clustered corpus of unit vectors, computes exact top-k
+neighbours with NumPy, then measures recall@k and per-query p50 / p99
+latency of the local vector index and (when CONNECTION_STRING_MILVUS is
+reachable) Milvus indexes built from VectorIndexConfig grids. Milvus runs
+use a temporary collection that is dropped afterwards.
+
+Usage:
+    python -m repositories.vector_benchmark --rows 20000 --dim 256 --queries 200 -k 5
+"""
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+import argparse
+import logging
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from repositories.local_vector_index import LocalVectorIndex, normalize
+from repositories.vector_index_config import VectorIndexConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BenchmarkResult:
+    """One backend / configuration measurement."""
+    backend: str
+    config: str
+    recall: float
+    p50_ms: float
+    p99_ms: float
+    qps: float
+    build_seconds: float = 0.0
+
+
+def synthetic_corpus(rows: int, dim: int, clusters: int = 64, spread: float = 0.35, seed: int = 0) -> np.ndarray:
+    """
+    Unit vectors drawn around random cluster centres (like topic-clustered embeddings).
+
+    Args:
+        rows: Number of vectors
+        dim: Vector dimension
+        clusters: Number of cluster centres
+        spread: Noise scale relative to the centre norm
+        seed: Random seed
+
+    Returns:
+        float32 array of shape (rows, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.normal(size=(clusters, dim)))
+    noise = rng.normal(size=(rows, dim)) * spread / np.sqrt(dim)
+    return normalize(centres[rng.integers(clusters, size=rows)] + noise)
+
+
+def synthetic_queries(corpus: np.ndarray, count: int, noise: float = 0.2, seed: int = 1) -> np.ndarray:
+    """Queries near (but not equal to) random corpus vectors."""
+    rng = np.random.default_rng(seed)
+    picks = corpus[rng.integers(len(corpus), size=count)]
+    return normalize(picks + rng.normal(size=picks.shape) * noise / np.sqrt(corpus.shape[1]))
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """
+    Ground-truth neighbour rows (exact search on unit vectors; L2, IP and cosine agree).
+
+    Returns:
+        int array of shape (len(queries), k)
+    """
+    truth = []
+    for start in range(0, len(queries), 256):
+        scores = queries[start:start + 256] @ corpus.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        truth.append(np.take_along_axis(top, order, axis=1))
+    return np.concatenate(truth)
+
+
+def recall_at_k(found: Sequence[Sequence[int]], truth: np.ndarray) -> float:
+    """Mean share of the exact top-k found by the approximate search."""
+    k = truth.shape[1]
+    hits = sum(len(set(row[:k]) & set(expected.tolist())) for row, expected in zip(found, truth))
+    return hits / truth.size
+
+
+def measure(label: str, config: str, search: Callable[[np.ndarray], List[int]], queries: np.ndarray, truth: np.ndarray, build_seconds: float = 0.0) -> BenchmarkResult:
+    """Run every query one at a time and summarize recall and latency."""
+    found, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        found.append(search(query))
+        latencies.append(time.perf_counter() - started)
+
+    latencies_ms = np.array(latencies) * 1000
+    return BenchmarkResult(
+        backend=label,
+        config=config,
+        recall=recall_at_k(found, truth),
+        p50_ms=float(np.percentile(latencies_ms, 50)),
+        p99_ms=float(np.percentile(latencies_ms, 99)),
+        qps=len(queries) / sum(latencies),
+        build_seconds=build_seconds
+    )
+
+
+def benchmark_local(corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray, nprobes: Iterable[int] = (1, 4, 10, 32)) -> List[BenchmarkResult]:
+    """Brute-force and IVF (per nprobe) search of the local vector index."""
+    k = truth.shape[1]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        index = LocalVectorIndex(directory, dim=corpus.shape[1], ivf_min_rows=float("inf"))
+        index.add([str(i) for i in range(len(corpus))], [""] * len(corpus), corpus)
+
+        def search(query, nprobe=None):
+            return [int(record["id"]) for record, _ in index.search(query, k=k, nprobe=nprobe)]
+
+        results.append(measure("local", "brute force", search, queries, truth))
+
+        started = time.perf_counter()
+        index.build_ivf()
+        build_seconds = time.perf_counter() - started
+        nlist = len(index._ivf["centroids"])
+        for nprobe in nprobes:
+            results.append(measure(
+                "local", f"IVF nlist={nlist} nprobe={nprobe}",
+                lambda query: search(query, nprobe), queries, truth, build_seconds
+            ))
+    return results
+
+
+def default_milvus_configs(rows: int, k: int) -> List[VectorIndexConfig]:
+    """FLAT baseline plus IVF_FLAT and HNSW grids."""
+    nlist = max(16, int(4 * np.sqrt(rows)))
+    base = VectorIndexConfig(top_k=k)
+    return (
+        [replace(base, index_type="FLAT")]
+        + [replace(base, index_type="IVF_FLAT", nlist=nlist, nprobe=nprobe) for nprobe in (8, 16, 32, 64)]
+        + [replace(base, index_type="HNSW", m=16, ef_construction=200, ef=ef) for ef in (16, 32, 64, 128)]
+    )
+
+
+def _describe(config: VectorIndexConfig) -> str:
+    params = {**config.index_params()["params"], **config.search_params()["params"]}
+    return f"{config.index_type} {config.metric} " + " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def benchmark_milvus(corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray, configs: List[VectorIndexConfig], batch_size: int = 5000) -> List[BenchmarkResult]:
+    """Search a temporary Milvus collection with each config (index rebuilt when build params change)."""
+    from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, utility
+
+    k = truth.shape[1]
+    name = f"campaign_benchmark_{uuid.uuid4().hex[:8]}"
+    schema = CollectionSchema([
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=corpus.shape[1])
+    ], "Vector benchmark (temporary)")
+    collection = Collection(name=name, schema=schema)
+
+    results = []
+    try:
+        for start in range(0, len(corpus), batch_size):
+            collection.insert([list(range(start, start + len(corpus[start:start + batch_size]))), corpus[start:start + batch_size]])
+        collection.flush()
+
+        built, build_seconds = None, 0.0
+        for config in sorted(configs, key=lambda c: str(c.index_params())):
+            if config.index_params() != built:
+                collection.release()
+                if collection.has_index():
+                    collection.drop_index()
+                started = time.perf_counter()
+                collection.create_index(field_name="embedding", index_params=config.index_params())
+                utility.wait_for_index_building_complete(name)
+                collection.load()
+                build_seconds = time.perf_counter() - started
+                built = config.index_params()
+
+            def search(query, config=config):
+                hits = collection.search([query.tolist()], "embedding", config.search_params(), limit=k)
+                return [hit.id for hit in hits[0]]
+
+            results.append(measure("milvus", _describe(config), search, queries, truth, build_seconds))
+    finally:
+        utility.drop_collection(name)
+    return results
+
+
+def run_benchmark(
+    rows: int = 20000,
+    dim: int = 256,
+    query_count: int = 200,
+    k: int = 5,
+    milvus: bool = True,
+    milvus_configs: Optional[List[VectorIndexConfig]] = None,
+    seed: int = 0
+) -> List[BenchmarkResult]:
+    """
+    Benchmark the local index and, if reachable, Milvus on one synthetic corpus.
+
+    Args:
+        rows: Corpus size
+        dim: Vector dimension (production embeddings are 1536)
+        query_count: Number of queries
+        k: Neighbours per query (recall@k)
+        milvus: Include Milvus when a connection can be made
+        milvus_configs: Milvus configs to try (defaults to default_milvus_configs)
+        seed: Random seed
+
+    Returns:
+        List of BenchmarkResult
+    """
+    corpus = synthetic_corpus(rows, dim, seed=seed)
+    queries = synthetic_queries(corpus, query_count, seed=seed + 1)
+    truth = exact_top_k(corpus, queries, k)
+
+    results = benchmark_local(corpus, queries, truth)
+
+    if milvus:
+        from utils.milvus_utils import get_milvus_connection
+
+        if get_milvus_connection().wait():
+            results += benchmark_milvus(corpus, queries, truth, milvus_configs or default_milvus_configs(rows, k))
+        else:
+            logger.warning("Milvus not available, benchmarking the local index only.")
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Results as a fixed-width table."""
+    lines = [f"{'backend':<8} {'config':<44} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8} {'qps':>9} {'build s':>8}"]
+    for r in results:
+        lines.append(
+            f"{r.backend:<8} {r.config:<44} {r.recall:>7.3f} {r.p50_ms:>8.2f} {r.p99_ms:>8.2f} {r.qps:>9.0f} {r.build_seconds:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--no-milvus", action="store_true", help="Benchmark the local index only")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.rows, args.dim, args.queries, args.k, milvus=not args.no_milvus)
+    print(format_results(results))
+    return [asdict(result) for result in results]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,137 @@
+# vector_index_config.py
+"""
+Vector index and search settings for campaign RAG.
+
+One VectorIndexConfig describes the Milvus index (type, metric and build
+parameters), the search parameters and the match threshold. The defaults
+reproduce the original IVF_FLAT / nlist=128 / nprobe=10 / top 5 / L2 < 0.5
+setup; VectorIndexConfig.from_env() reads overrides so the index can be
+retuned from benchmark results (repositories/vector_benchmark.py) without
+code changes.
+"""
+from dataclasses import dataclass, replace
+from typing import Dict
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("FLAT", "IVF_FLAT", "IVF_SQ8", "IVF_PQ", "HNSW")
+METRICS = ("L2", "IP", "COSINE")
+
+
+@dataclass(frozen=True)
+class VectorIndexConfig:
+    """
+    Index build, search and match settings.
+
+    Attributes:
+        index_type: Milvus index type (FLAT, IVF_FLAT, IVF_SQ8, IVF_PQ, HNSW)
+        metric: L2 (smaller is closer) or IP / COSINE (larger is closer)
+        nlist: IVF clusters
+        nprobe: IVF clusters scanned per query
+        m: HNSW graph degree (M)
+        ef_construction: HNSW build candidate list size (efConstruction)
+        ef: HNSW search candidate list size (must be >= top_k)
+        pq_m: IVF_PQ sub-quantizers
+        top_k: Results per search
+        similarity_threshold: Max L2 distance, or min IP / cosine similarity, for a match
+    """
+    index_type: str = "IVF_FLAT"
+    metric: str = "L2"
+    nlist: int = 128
+    nprobe: int = 10
+    m: int = 16
+    ef_construction: int = 200
+    ef: int = 64
+    pq_m: int = 16
+    top_k: int = 5
+    similarity_threshold: float = 0.5
+
+    def __post_init__(self):
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type {self.index_type!r}, expected one of {INDEX_TYPES}")
+        if self.metric not in METRICS:
+            raise ValueError(f"Unsupported metric {self.metric!r}, expected one of {METRICS}")
+
+    @classmethod
+    def from_env(cls, **overrides) -> "VectorIndexConfig":
+        """
+        Config from env vars, then keyword overrides.
+
+        Env vars: VECTOR_INDEX_TYPE, VECTOR_INDEX_METRIC, VECTOR_INDEX_NLIST,
+        VECTOR_INDEX_NPROBE, VECTOR_INDEX_HNSW_M, VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+        VECTOR_INDEX_HNSW_EF, VECTOR_INDEX_PQ_M, RAG_TOP_K, RAG_SIMILARITY_THRESHOLD.
+        """
+        env = {
+            "index_type": ("VECTOR_INDEX_TYPE", str.upper),
+            "metric": ("VECTOR_INDEX_METRIC", str.upper),
+            "nlist": ("VECTOR_INDEX_NLIST", int),
+            "nprobe": ("VECTOR_INDEX_NPROBE", int),
+            "m": ("VECTOR_INDEX_HNSW_M", int),
+            "ef_construction": ("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", int),
+            "ef": ("VECTOR_INDEX_HNSW_EF", int),
+            "pq_m": ("VECTOR_INDEX_PQ_M", int),
+            "top_k": ("RAG_TOP_K", int),
+            "similarity_threshold": ("RAG_SIMILARITY_THRESHOLD", float)
+        }
+        values = {}
+        for field_name, (var, parse) in env.items():
+            raw = os.getenv(var)
+            if not raw:
+                continue
+            try:
+                values[field_name] = parse(raw)
+            except ValueError:
+                logger.warning(f"Invalid {var}={raw!r}, using default")
+        return replace(cls(**values), **overrides)
+
+    def index_params(self) -> Dict:
+        """create_index() parameters."""
+        if self.index_type == "HNSW":
+            params = {"M": self.m, "efConstruction": self.ef_construction}
+        elif self.index_type == "IVF_PQ":
+            params = {"nlist": self.nlist, "m": self.pq_m}
+        elif self.index_type.startswith("IVF"):
+            params = {"nlist": self.nlist}
+        else:
+            params = {}
+        return {"index_type": self.index_type, "params": params, "metric_type": self.metric}
+
+    def search_params(self) -> Dict:
+        """search() parameters."""
+        if self.index_type == "HNSW":
+            params = {"ef": max(self.ef, self.top_k)}
+        elif self.index_type.startswith("IVF"):
+            params = {"nprobe": self.nprobe}
+        else:
+            params = {}
+        return {"metric_type": self.metric, "params": params}
+
+    def is_match(self, score: float) -> bool:
+        """Whether a Milvus distance / similarity passes the threshold."""
+        if self.metric == "L2":
+            return score < self.similarity_threshold
+        return score > self.similarity_threshold
+
+    def score_from_unit_l2(self, distance: float) -> float:
+        """
+        Convert a squared L2 distance between unit vectors to this metric.
+
+        The local index always reports squared L2 on normalized vectors;
+        for those, IP and cosine similarity are both 1 - distance / 2.
+        """
+        return distance if self.metric == "L2" else 1.0 - distance / 2.0
+
+    def matches_index(self, index_params: Dict) -> bool:
+        """Whether an existing Milvus index was built with these settings."""
+        expected = self.index_params()
+        params = index_params.get("params", {})
+        if isinstance(params, str):  # some pymilvus versions return params as JSON
+            params = json.loads(params)
+        return (
+            index_params.get("index_type") == expected["index_type"]
+            and index_params.get("metric_type") == expected["metric_type"]
+            and {k: int(v) for k, v in params.items() if k in expected["params"]} == expected["params"]
+        )
@@ -0,0 +1,282 @@
+# vector_reconciliation.py
+"""
+Keeps the campaign vector store in sync with MongoDB.
+
+A reconciliation run lists the campaign ids in the vector store (Milvus or
+the local index) and in MongoDB and diffs them:
+
+- campaigns missing from the store (saved while it was down, or whose
+  embedding failed) are embedded in batches through the cached embedding
+  service and inserted;
+- vectors of campaigns deleted from MongoDB (orphans) and duplicate Milvus
+  rows are deleted in bulk.
+
+Progress is checkpointed after every batch in the vector_reconciliation
+collection, which also holds a lease so only one process reconciles a
+store at a time. An interrupted run needs no special resume logic: the
+next run's diff no longer contains the campaigns already indexed.
+Campaigns younger than the grace period are skipped so saves in flight
+are not indexed twice.
+"""
+from pymongo import errors as mongo_errors
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from repositories.bulk import chunks
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = "vector_reconciliation"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_GRACE_SECONDS = 300
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_INTERVAL_SECONDS = 3600
+
+
+class VectorReconciler:
+    """Diffs MongoDB campaigns against the vector store and repairs the difference."""
+
+    def __init__(
+        self,
+        repository,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        grace_seconds: int = DEFAULT_GRACE_SECONDS,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS
+    ):
+        """
+        Initialize reconciler.
+
+        Args:
+            repository: CampaignRepository whose vector store is reconciled
+            batch_size: Campaigns embedded / vectors deleted per batch
+            grace_seconds: Skip campaigns created less than this long ago
+            lease_seconds: How long a run may go without a checkpoint before
+                another process may take over
+        """
+        self.repository = repository
+        self.checkpoints = repository.mongo_db[CHECKPOINT_COLLECTION]
+        self.batch_size = batch_size
+        self.grace = timedelta(seconds=grace_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Lease / checkpoints
+
+    def _acquire(self, store: str, now: datetime) -> bool:
+        """Take the store's lease; False if another process holds it."""
+        try:
+            self.checkpoints.find_one_and_update(
+                {"_id": store, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+                {"$set": {
+                    "owner": self.owner,
+                    "lease_until": now + self.lease,
+                    "status": "running",
+                    "started_at": now,
+                    "updated_at": now,
+                    "finished_at": None,
+                    "progress": {}
+                }},
+                upsert=True
+            )
+            return True
+        except mongo_errors.DuplicateKeyError:
+            return False
+
+    def _checkpoint(self, store: str, progress: Dict, status: str = "running"):
+        """Record progress and renew the lease (released when the run ends)."""
+        now = datetime.now(timezone.utc)
+        update = {"progress": progress, "status": status, "updated_at": now}
+        if status == "running":
+            update["lease_until"] = now + self.lease
+        else:
+            update["lease_until"] = None
+            update["finished_at"] = now
+        self.checkpoints.update_one({"_id": store, "owner": self.owner}, {"$set": update})
+
+    def get_checkpoint(self, store: Optional[str] = None) -> Optional[Dict]:
+        """Last checkpoint for a store (defaults to the repository's current store)."""
+        store = store or self.repository.vector_store_name
+        return self.checkpoints.find_one({"_id": store}) if store else None
+
+    # Reconciliation
+
+    def diff(self, cutoff: datetime) -> Dict[str, List]:
+        """
+        Campaign ids to index and vectors to delete.
+
+        Args:
+            cutoff: Ignore campaigns created after this time
+
+        Returns:
+            Dict with "missing" (campaign ids), "orphans" (campaign ids) and
+            "duplicates" (Milvus primary keys)
+        """
+        indexed = set()
+        duplicates = []
+        # List vectors before MongoDB: a campaign saved in between then shows up
+        # as a MongoDB campaign (skipped by the cutoff), never as an orphan
+        for campaign_id, primary_key in self.repository.iter_indexed_ids():
+            if campaign_id in indexed and primary_key is not None:
+                duplicates.append(primary_key)
+            indexed.add(campaign_id)
+
+        in_mongo, missing = set(), []
+        cutoff_id = ObjectId.from_datetime(cutoff)
+        for doc in self.repository.mongo_collection.find({}, {"_id": 1}).sort("_id", 1):
+            campaign_id = str(doc["_id"])
+            in_mongo.add(campaign_id)
+            if campaign_id not in indexed and (not isinstance(doc["_id"], ObjectId) or doc["_id"] < cutoff_id):
+                missing.append(campaign_id)
+
+        return {"missing": missing, "orphans": sorted(indexed - in_mongo), "duplicates": duplicates}
+
+    def run(self) -> Optional[Dict]:
+        """
+        Run one reconciliation pass.
+
+        Returns:
+            Dict of progress counters, or None if there is no vector store,
+            Milvus is still connecting or another process is reconciling it
+        """
+        if self.repository.milvus.connecting:
+            # The store would resolve to the local fallback until the connect finishes
+            logger.info("Milvus is still connecting, skipping reconciliation.")
+            return None
+
+        store = self.repository.vector_store_name
+        if store is None:
+            logger.info("No vector store available, skipping reconciliation.")
+            return None
+
+        now = datetime.now(timezone.utc)
+        if not self._acquire(store, now):
+            logger.info(f"Reconciliation of {store} is running elsewhere, skipping.")
+            return None
+
+        progress = {"store": store, "phase": "diff", "embedded": 0, "deleted": 0, "errors": 0}
+        try:
+            diff = self.diff(now - self.grace)
+            progress.update({
+                "missing": len(diff["missing"]),
+                "orphans": len(diff["orphans"]),
+                "duplicates": len(diff["duplicates"]),
+                "phase": "embed"
+            })
+            self._checkpoint(store, progress)
+
+            for _, batch in chunks(diff["missing"], self.batch_size):
+                if not self._same_store(store, progress):
+                    return progress
+                try:
+                    progress["embedded"] += self.repository.index_campaigns(batch)
+                except Exception as e:
+                    logger.warning(f"Failed to index {len(batch)} campaigns: {e}")
+                    progress["errors"] += len(batch)
+                progress["last_id"] = batch[-1]
+                self._checkpoint(store, progress)
+
+            progress["phase"] = "delete"
+            for _, batch in chunks(diff["orphans"], self.batch_size):
+                if not self._same_store(store, progress):
+                    return progress
+                progress["deleted"] += self.repository.delete_vectors(campaign_ids=batch)
+                self._checkpoint(store, progress)
+            for _, batch in chunks(diff["duplicates"], self.batch_size):
+                progress["deleted"] += self.repository.delete_vectors(primary_keys=batch)
+                self._checkpoint(store, progress)
+
+            progress["phase"] = "done"
+            self._checkpoint(store, progress, status="completed")
+            logger.info(
+                f"Reconciled {store}: {progress['embedded']}/{progress['missing']} missing campaigns indexed, "
+                f"{progress['deleted']} orphaned/duplicate vectors deleted, {progress['errors']} errors."
+            )
+            return progress
+        except Exception as e:
+            logger.error(f"Reconciliation of {store} failed: {e}")
+            progress["error"] = str(e)
+            self._checkpoint(store, progress, status="failed")
+            raise
+
+    def _same_store(self, store: str, progress: Dict) -> bool:
+        """Stop the run if the repository switched stores (Milvus went down or came back)."""
+        if self.repository.vector_store_name == store:
+            return True
+        logger.info(f"Vector store changed during reconciliation of {store}, stopping.")
+        self._checkpoint(store, progress, status="interrupted")
+        return False
+
+    # Background job
+
+    def start(self, interval_seconds: float = DEFAULT_INTERVAL_SECONDS):
+        """Reconcile now and then every interval_seconds on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval_seconds,), name="vector-reconciliation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, interval_seconds: float):
+        # Let the first Milvus connect finish so the first run targets the right store
+        self.repository.milvus.wait()
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception:
+                pass  # logged and checkpointed by run()
+            self._stop.wait(interval_seconds)
+
+
+# Global background job
+_reconciler = None
+_reconciler_lock = threading.Lock()
+
+
+def start_background_reconciliation(
+    mongo_collection_name: str = "campaigns",
+    milvus_collection_name: str = "campaign_embedding_collection"
+) -> Optional[VectorReconciler]:
+    """
+    Start the process-wide reconciliation job (once).
+
+    The interval is VECTOR_RECONCILE_INTERVAL_SECONDS (default 3600; 0 disables).
+    """
+    global _reconciler
+    interval = float(os.getenv("VECTOR_RECONCILE_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS))
+    if interval <= 0:
+        return None
+
+    with _reconciler_lock:
+        if _reconciler is None:
+            from repositories.campaign_repository import CampaignRepository
+
+            try:
+                _reconciler = VectorReconciler(CampaignRepository(mongo_collection_name, milvus_collection_name))
+            except Exception as e:
+                logger.warning(f"Vector reconciliation disabled: {e}")
+                return None
+            _reconciler.start(interval)
+        return _reconciler
+
+
+if __name__ == "__main__":
+    from repositories.campaign_repository import CampaignRepository
+    from utils.milvus_utils import get_milvus_connection
+
+    logging.basicConfig(level=logging.INFO)
+    get_milvus_connection().wait()
+    print(VectorReconciler(CampaignRepository("campaigns", "campaign_embedding_collection")).run())
@@ -1,23 +1,22 @@
 # insert_audiences.py - B2B Audiences
-from pymongo import MongoClient
-import os
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
 from dotenv import load_dotenv
-from urllib.parse import urlparse
 
 # Load environment variables from .env file
 load_dotenv(override=True)
 
-connection_string = os.getenv("CONNECTION_STRING_MONGO")
-
-# Parse database name correctly (handle query parameters)
-parsed_url = urlparse(connection_string)
-db_name = parsed_url.path.lstrip('/')  # Remove leading slash
-if '?' in db_name:
-    db_name = db_name.split('?')[0]  # Remove query parameters
+from audience import Audience
+from repositories.audience_repository import AudienceRepository
 
-client = MongoClient(connection_string)
-db = client[db_name]
-collection = db["audiences"]
+repository = AudienceRepository("audiences")
+db_name = repository.mongo_db.name
+collection = repository.mongo_collection
 
 audiences = [
     {
@@ -36,9 +35,11 @@ audiences = [
 
 # Clear existing audiences and insert new ones
 collection.delete_many({})
-collection.insert_many(audiences)
+result = repository.save_audiences([Audience(id=None, **audience) for audience in audiences])
 
-print(f"Successfully inserted {len(audiences)} B2B audiences into {db_name}.audiences")
+print(f"Successfully inserted {result.saved} B2B audiences into {db_name}.audiences")
+for error in result.errors:
+    print(f"  ✗ {error['name']}: {error['error']}")
 print("Audience names:")
 for audience in audiences:
     print(f"  - {audience['name']}: {audience['description'][:60]}...")
@@ -1,23 +1,21 @@
 # insert_improved_templates.py - Specialized B2B Templates
 # Better templates based on B2B_TARGET_PERSONAS.md and EXAMPLE_BUSINESSES.md
-from pymongo import MongoClient
-import os
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
-from urllib.parse import urlparse
 
 # Load environment variables
 load_dotenv(override=True)
 
-connection_string = os.getenv("CONNECTION_STRING_MONGO")
-parsed_url = urlparse(connection_string)
-db_name = parsed_url.path.lstrip('/')
-if '?' in db_name:
-    db_name = db_name.split('?')[0]
+from repositories.template_repository import TemplateRepository
 
-client = MongoClient(connection_string)
-db = client[db_name]
-collection = db["content_templates"]
+repository = TemplateRepository()
 
 improved_templates = [
     # ===================
@@ -336,17 +334,12 @@ improved_templates = [
 # Add improved templates (don't delete existing ones)
 print(f"Inserting {len(improved_templates)} improved specialized B2B templates...")
 
-for template in improved_templates:
-    # Check if template with this ID already exists
-    existing = collection.find_one({"_id": template["_id"]})
-    if existing:
-        collection.replace_one({"_id": template["_id"]}, template)
-        print(f"  ✓ Updated: {template['name']}")
-    else:
-        collection.insert_one(template)
-        print(f"  ✓ Inserted: {template['name']}")
+# Insert new templates or replace existing ones (matched by _id) in one bulk write
+result = repository.upsert_templates(improved_templates)
+for error in result.errors:
+    print(f"  ✗ {error['name']}: {error['error']}")
 
-print(f"\n✅ Successfully added/updated {len(improved_templates)} improved templates!")
+print(f"\n✅ Successfully added/updated {result.saved} improved templates!")
 print("\nImproved template names:")
 for template in improved_templates:
     print(f"  - {template['name']}")
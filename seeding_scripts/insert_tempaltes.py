@@ -1,24 +1,22 @@
 # insert_templates.py - B2B Generic Templates
-from pymongo import MongoClient
-import os
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
-from urllib.parse import urlparse
 
 # Load environment variables from .env file
 load_dotenv(override=True)
 
-connection_string = os.getenv("CONNECTION_STRING_MONGO")
-
-# Parse database name correctly (handle query parameters)
-parsed_url = urlparse(connection_string)
-db_name = parsed_url.path.lstrip('/')  # Remove leading slash
-if '?' in db_name:
-    db_name = db_name.split('?')[0]  # Remove query parameters
+from repositories.template_repository import TemplateRepository
 
-client = MongoClient(connection_string)
-db = client[db_name]
-collection = db["content_templates"]
+repository = TemplateRepository()
+db_name = repository.db.name
+collection = repository.templates
 
 templates = [
     {
@@ -503,9 +501,11 @@ templates = [
 
 # Clear existing templates and insert new ones
 collection.delete_many({})
-collection.insert_many(templates)
+result = repository.save_templates(templates)
 
-print(f"Successfully inserted {len(templates)} B2B templates into {db_name}.content_templates")
+print(f"Successfully inserted {result.saved} B2B templates into {db_name}.content_templates")
+for error in result.errors:
+    print(f"  ✗ {error['name']}: {error['error']}")
 print("Template names:")
 for template in templates:
     print(f"  - {template['name']}")
@@ -12,7 +12,7 @@ from dotenv import load_dotenv
 # Load environment variables for OpenAI API key
 load_dotenv()
 
-from agents.analytics_agent import analyze_campaign
+from agents.analytics_agent import analyze_campaign, analyze_campaigns_batch, analyze_performance
 from analytics.mock_analytics_generator import MockAnalyticsGenerator
 
 
@@ -149,6 +149,34 @@ class TestAnalyticsAgent:
         print(f"  Total engagement: {summary['total_engagement']} (expected: {expected_engagement})")
         print(f"  Avg engagement rate: {summary['avg_engagement_rate']:.3f}")
 
+    def test_batch_performance_matches_single(self):
+        """Vectorized batch aggregates match per-campaign analyze_performance (no LLM)."""
+        generator = MockAnalyticsGenerator("fitness", "instagram_reels")
+        benchmark = generator.generate_benchmark_data()
+
+        start = date.today() - timedelta(days=30)
+        campaigns = {
+            f"camp_{i}": generator.generate_campaign_metrics(f"camp_{i}", start, days=10 + i, virality_factor=0.5 + i * 0.5)
+            for i in range(5)
+        }
+        campaigns["camp_empty"] = []
+
+        batch = analyze_campaigns_batch(campaigns, benchmark, max_concurrency=2, generate_insights=False)
+
+        assert list(batch['campaigns']) == list(campaigns)
+        assert batch['campaigns']['camp_empty']['error'] == "No metrics"
+        assert batch['cost']['cost'] == 0
+
+        for campaign_id, metrics in campaigns.items():
+            if not metrics:
+                continue
+            single = analyze_performance({"metrics": metrics, "benchmark": benchmark})
+            result = batch['campaigns'][campaign_id]
+            assert result['performance_summary'] == single['performance_summary']
+            assert 'detect_patterns' in result['timing']
+
+        print(f"\nBatch timing: {batch['timing']}")
+
 
 if __name__ == "__main__":
     print("=== Test: Excellent Campaign Analysis ===")
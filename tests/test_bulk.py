@@ -0,0 +1,44 @@
+"""
+Tests for bulk save helpers.
+"""
+
+from bson import ObjectId
+from pymongo import errors
+
+from repositories.bulk import chunks, insert_many_unordered
+
+
+class BatchCollection:
+    """Records insert_many batches; rejects documents named "bad"."""
+
+    name = "items"
+
+    def __init__(self):
+        self.batches = []
+
+    def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        self.batches.append(docs)
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        bad = [{"index": i, "errmsg": "E11000 duplicate key"} for i, d in enumerate(docs) if d["name"] == "bad"]
+        if bad:
+            raise errors.BulkWriteError({"writeErrors": bad})
+
+
+def test_chunks():
+    assert list(chunks([1, 2, 3, 4, 5], 2)) == [(0, [1, 2]), (2, [3, 4]), (4, [5])]
+
+
+def test_insert_many_reports_per_item_errors():
+    collection = BatchCollection()
+    docs = [{"name": n} for n in ["a", "bad", "c", "d", "bad"]]
+
+    result = insert_many_unordered(collection, docs, batch_size=2)
+
+    assert len(collection.batches) == 3
+    assert result.saved == 3
+    assert result.inserted_ids == [docs[0]["_id"], docs[2]["_id"], docs[3]["_id"]]
+    assert [e["index"] for e in result.errors] == [1, 4]
+    assert result.failed == 2
+    assert result.errors[0]["stage"] == "mongo"
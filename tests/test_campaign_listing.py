@@ -0,0 +1,68 @@
+"""
+Tests for paginated campaign listings.
+
+The pagination test needs a MongoDB server (CONNECTION_STRING_MONGO) and
+is skipped when none is reachable.
+"""
+
+import os
+import uuid
+
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient, errors
+
+from campaign import Campaign, campaign_summary, find_campaign_page
+
+
+def test_summary_falls_back_to_objectid_time():
+    _id = ObjectId()
+    summary = campaign_summary({"_id": _id, "name": "Launch"})
+
+    assert summary["id"] == str(_id)
+    assert summary["name"] == "Launch"
+    assert summary["created_at"] == _id.generation_time.replace(tzinfo=None)
+
+
+def test_legacy_campaign_gets_created_at():
+    _id = ObjectId()
+    campaign = Campaign.from_dict({
+        "_id": _id,
+        "name": "Legacy",
+        "localized_content": {"en-US": {}},
+        "liquid_template": ""
+    })
+    assert campaign.created_at == _id.generation_time.replace(tzinfo=None)
+    assert campaign.workspace_id == "default"
+    assert campaign.platform is None
+    assert {"created_at", "workspace_id", "platform"} <= set(campaign.to_dict())
+
+
+@pytest.fixture
+def campaigns_collection():
+    connection_string = os.getenv("CONNECTION_STRING_MONGO", "mongodb://localhost:27017")
+    client = MongoClient(connection_string, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except errors.PyMongoError:
+        pytest.skip("MongoDB server not available")
+
+    db = client[f"campaign_test_{uuid.uuid4().hex[:8]}"]
+    yield db.campaigns
+    client.drop_database(db.name)
+    client.close()
+
+
+def test_pages_cover_all_campaigns_newest_first(campaigns_collection):
+    campaigns = [Campaign(f"Campaign {i}", {"en-US": {"Body": "x" * 1000}}, "<p/>") for i in range(7)]
+    campaigns_collection.insert_many([c.to_dict() for c in campaigns])
+
+    listed, cursor = [], None
+    while True:
+        page, cursor = find_campaign_page(campaigns_collection, limit=3, after=cursor)
+        listed.extend(page)
+        if cursor is None:
+            break
+
+    assert [s["name"] for s in listed] == [f"Campaign {i}" for i in reversed(range(7))]
+    assert set(listed[0]) == {"id", "name", "created_at"}
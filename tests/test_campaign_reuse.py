@@ -0,0 +1,139 @@
+"""
+Tests for near-duplicate campaign reuse in ContentGenerationAgent.
+
+The campaign repository and the LLM are replaced by in-test doubles.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+pytest.importorskip("pymilvus")
+
+from agents import content_generation_agent
+from agents.content_generation_agent import ContentGenerationAgent, get_reuse_stats
+from campaign import Campaign, prompt_hash
+from repositories import campaign_repository
+from repositories.campaign_repository import CampaignRepository
+
+TEMPLATE = {"name": "Promo", "liquid_template": "<h1>{{ Title }}</h1>", "workspace_id": "w1"}
+
+
+class FakeRepository:
+    def __init__(self, duplicate=None):
+        self.duplicate = duplicate
+        self.checks = []
+
+    def find_duplicate_campaign(self, query, liquid_template, workspace_id="default", **inputs):
+        self.checks.append((query, liquid_template, workspace_id, inputs))
+        return self.duplicate
+
+    def search_similar_campaigns(self, text, workspace_id="default"):
+        return []
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content='{"Title": "Fresh"}')
+
+
+@pytest.fixture(autouse=True)
+def reset_stats(monkeypatch):
+    monkeypatch.setattr(content_generation_agent, "_reuse_stats", {"checked": 0, "reused": 0})
+    monkeypatch.setattr(content_generation_agent, "track_openai_request", lambda **kwargs: None)
+
+
+def _state():
+    return {
+        "messages": [HumanMessage(content="Summer sale\nTemplate: ...")],
+        "content_template": TEMPLATE,
+        "user_query": "Summer sale",
+        "selected_audience_name": "Students",
+        "selected_platform": "instagram",
+    }
+
+
+def test_duplicate_skips_generation():
+    saved = Campaign("Summer", {"en-US": {"Title": "Sale"}, "de-DE": {"Title": "Angebot"}}, TEMPLATE["liquid_template"])
+    repository, model = FakeRepository((saved, 0.01)), FakeModel()
+    agent = ContentGenerationAgent(model, repository, add_context=False)
+
+    result = agent.generate_campaign_content(_state())
+
+    assert model.calls == 0
+    assert repository.checks == [("Summer sale", TEMPLATE["liquid_template"], "w1", {
+        "audience_name": "Students", "platform": "instagram", "system_prompt_hash": prompt_hash("")
+    })]
+    assert json.loads(result["initial_english_content"]) == {"Title": "Sale"}
+    assert result["translations"] == {"de-DE": {"Title": "Angebot"}}
+    assert result["reused_campaign"]["id"] == str(saved.id)
+    assert get_reuse_stats() == {"checked": 1, "reused": 1, "reuse_rate": 1.0}
+
+
+def test_no_duplicate_generates_and_counts():
+    model = FakeModel()
+    agent = ContentGenerationAgent(model, FakeRepository(), add_context=False)
+
+    result = agent.generate_campaign_content(_state())
+
+    assert model.calls == 1
+    assert result["reused_campaign"] is None
+    assert get_reuse_stats()["reuse_rate"] == 0.0
+
+
+def test_reuse_disabled():
+    repository, model = FakeRepository(), FakeModel()
+    ContentGenerationAgent(model, repository, add_context=False, reuse_campaigns=False).generate_campaign_content(_state())
+    assert repository.checks == [] and model.calls == 1
+
+
+class FakeEmbeddingService:
+    def embed_array(self, texts):
+        return np.ones((len(texts), 4), dtype=np.float32)  # every query identical
+
+
+def _repository_with(saved):
+    """CampaignRepository whose search returns saved (no MongoDB / Milvus)."""
+    repository = CampaignRepository.__new__(CampaignRepository)
+    repository.find_similar_campaigns = lambda *args, **kwargs: [
+        {"campaign_id": str(saved.id), "source_query": saved.source_query}
+    ]
+    repository.get_campaign = lambda campaign_id: saved
+    return repository
+
+
+@pytest.mark.parametrize("audience, expect_reuse", [("Students", True), ("Retirees", False)])
+def test_reuse_requires_same_audience(monkeypatch, audience, expect_reuse):
+    monkeypatch.setattr(campaign_repository, "get_embedding_service", lambda: FakeEmbeddingService())
+    saved = Campaign(
+        "Summer", {"en-US": {"Title": "Sale"}}, TEMPLATE["liquid_template"], workspace_id="w1",
+        platform="instagram", source_query="Summer sale", audience_name=audience,
+        system_prompt_hash=prompt_hash("Be concise")
+    )
+    model = FakeModel()
+    agent = ContentGenerationAgent(model, _repository_with(saved), system="Be concise", add_context=False)
+
+    result = agent.generate_campaign_content(_state())
+
+    assert (result["reused_campaign"] is not None) == expect_reuse
+    assert model.calls == (0 if expect_reuse else 1)
+
+
+def test_reuse_requires_same_platform_and_system_prompt():
+    saved = Campaign(
+        "Summer", {}, TEMPLATE["liquid_template"], platform="instagram",
+        audience_name="Students", system_prompt_hash=prompt_hash("Be concise")
+    )
+    same = (TEMPLATE["liquid_template"], "Students", "instagram", prompt_hash("Be concise"))
+    assert CampaignRepository._same_generation_inputs(saved, *same)
+    assert not CampaignRepository._same_generation_inputs(saved, TEMPLATE["liquid_template"], "Students", "linkedin", same[3])
+    assert not CampaignRepository._same_generation_inputs(saved, TEMPLATE["liquid_template"], "Students", "instagram", prompt_hash("Be verbose"))
+
+    legacy = Campaign("Old", {}, TEMPLATE["liquid_template"], platform="instagram", audience_name="Students")
+    assert not CampaignRepository._same_generation_inputs(legacy, *same)
@@ -0,0 +1,64 @@
+"""
+Tests for the batched, cached embedding service.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from utils.embedding_service import DiskVectorStore, EmbeddingService
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings; records request batches."""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, input, model):
+        self.requests.append(list(input))
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), float(i), 0.5])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def _service(store=None, batch_size=2):
+    embeddings = FakeEmbeddings()
+    client = SimpleNamespace(embeddings=embeddings)
+    return EmbeddingService(model=(client, "test-model"), store=store, batch_size=batch_size), embeddings
+
+
+def test_batches_and_deduplicates():
+    service, api = _service()
+
+    vectors = service.embed_array(["a", "bb", "a", "ccc", "dddd"])
+
+    assert api.requests == [["a", "bb"], ["ccc", "dddd"]]
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (5, 3)
+    assert vectors[0].tolist() == vectors[2].tolist() == [1.0, 0.0, 0.5]
+    assert vectors[3][0] == 3.0
+
+
+def test_memory_cache_hits():
+    service, api = _service()
+    service.embed("hello")
+    assert service.embed("hello") == [5.0, 0.0, 0.5]
+
+    stats = service.get_stats()
+    assert len(api.requests) == 1
+    assert stats["memory_hits"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_store_survives_restart(tmp_path):
+    store = DiskVectorStore(str(tmp_path))
+    first, _ = _service(store=store)
+    first.embed_many(["x", "yy"])
+
+    second, api = _service(store=DiskVectorStore(str(tmp_path)))
+    assert second.embed_many(["yy", "x"]) == [[2.0, 1.0, 0.5], [1.0, 0.0, 0.5]]
+    assert api.requests == []
+    assert second.get_stats()["store_hits"] == 2
@@ -0,0 +1,93 @@
+"""
+Tests for the content-addressed export artifact cache.
+"""
+
+import os
+
+import pytest
+
+from utils.artifact_cache import ArtifactCache, html_hash, renderer_version
+from utils.export_pipeline import ExportPipeline
+
+
+def upper_renderer(html):
+    return html.upper().encode("utf-8")
+
+
+def lower_renderer(html):
+    return html.lower().encode("utf-8")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(str(tmp_path / "exports"), max_bytes=1024)
+
+
+def test_round_trip(cache):
+    digest = html_hash("<p>hi</p>")
+    assert cache.get(digest, "pdf", "v1") is None
+    cache.put(digest, "pdf", "v1", b"PDF")
+    assert cache.get(digest, "pdf", "v1") == b"PDF"
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+
+
+def test_key_includes_format_and_version(cache):
+    digest = html_hash("<p>hi</p>")
+    cache.put(digest, "pdf", "v1", b"PDF")
+    assert cache.get(digest, "docx", "v1") is None
+    assert cache.get(digest, "pdf", "v2") is None
+
+
+def test_evicts_least_recently_used(cache):
+    for i in range(3):
+        cache.put(html_hash(str(i)), "pdf", "v1", b"x" * 300)
+        # Distinct mtimes regardless of filesystem timestamp resolution
+        path = cache._path(html_hash(str(i)), "pdf", "v1")
+        os.utime(path, (1000 + i, 1000 + i))
+    os.utime(cache._path(html_hash("0"), "pdf", "v1"), (2000, 2000))  # recently used
+
+    cache.put(html_hash("3"), "pdf", "v1", b"x" * 300)
+
+    assert cache.get(html_hash("1"), "pdf", "v1") is None
+    for kept in ("0", "2", "3"):
+        assert cache.get(html_hash(kept), "pdf", "v1") is not None
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["bytes"] <= cache.max_bytes
+
+
+def test_size_survives_restart(cache):
+    cache.put(html_hash("a"), "pdf", "v1", b"x" * 100)
+    assert ArtifactCache(str(cache.directory), max_bytes=1024).get_stats()["bytes"] == 100
+
+
+def test_renderer_version_tracks_packages():
+    assert renderer_version("pdf").startswith("v")
+    assert "weasyprint" in renderer_version("pdf")
+    assert "pdf2docx" in renderer_version("docx")
+
+
+def test_pipeline_serves_repeat_exports_from_cache(cache):
+    pipeline = ExportPipeline(max_workers=1, renderers={"pdf": upper_renderer}, cache=cache)
+    try:
+        assert pipeline.cached("<p>hi</p>", "pdf") is None
+        assert pipeline.export("<p>hi</p>", "pdf") == b"<P>HI</P>"
+        assert pipeline.cached("<p>hi</p>", "pdf") == b"<P>HI</P>"
+        assert pipeline.export("<p>hi</p>", "pdf") == b"<P>HI</P>"
+        stats = pipeline.get_stats()
+        assert stats["jobs"] == 1 and stats["cache_hits"] == 1
+        # Only the two export requests count, not the display lookups
+        assert (cache.get_stats()["hits"], cache.get_stats()["misses"]) == (1, 1)
+    finally:
+        pipeline.shutdown()
+
+
+def test_pipeline_cache_is_per_renderer(cache):
+    upper = ExportPipeline(max_workers=1, renderers={"pdf": upper_renderer}, cache=cache)
+    lower = ExportPipeline(max_workers=1, renderers={"pdf": lower_renderer}, cache=cache)
+    try:
+        upper.export("<P>Hi</P>", "pdf")
+        assert lower.cached("<P>Hi</P>", "pdf") is None
+        assert lower.export("<P>Hi</P>", "pdf") == b"<p>hi</p>"
+    finally:
+        upper.shutdown()
+        lower.shutdown()
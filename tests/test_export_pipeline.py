@@ -0,0 +1,67 @@
+"""
+Tests for the process-pool export pipeline.
+
+Renderers are small picklable functions so the tests do not need WeasyPrint.
+"""
+
+import time
+
+import pytest
+
+from utils.export_pipeline import ExportPipeline
+
+
+def upper_renderer(html):
+    return html.upper().encode("utf-8")
+
+
+def slow_renderer(html):
+    time.sleep(float(html))
+    return html.encode("utf-8")
+
+
+def failing_renderer(html):
+    raise RuntimeError("render failed")
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = ExportPipeline(max_workers=2, renderers={"pdf": upper_renderer, "slow": slow_renderer, "bad": failing_renderer})
+    yield pipeline
+    pipeline.shutdown()
+
+
+def test_export_runs_in_pool(pipeline):
+    assert pipeline.export("<p>hi</p>", "pdf") == b"<P>HI</P>"
+    assert pipeline.get_stats()["jobs"] == 1
+
+
+def test_export_many_streams_in_completion_order(pipeline):
+    results = list(pipeline.export_many([("slow", "0.6"), ("fast", "0.05")], "slow"))
+    assert [key for key, _, _ in results] == ["fast", "slow"]
+    assert dict((key, data) for key, data, _ in results) == {"fast": b"0.05", "slow": b"0.6"}
+
+
+def test_export_many_yields_every_key_of_a_shared_job(pipeline):
+    results = list(pipeline.export_many([("en-US", "0.1"), ("de-DE", "0.1"), ("fr-FR", "0.05")], "slow"))
+    assert sorted(key for key, _, _ in results) == ["de-DE", "en-US", "fr-FR"]
+    assert {key: data for key, data, _ in results} == {"en-US": b"0.1", "de-DE": b"0.1", "fr-FR": b"0.05"}
+    assert pipeline.get_stats()["jobs"] == 2
+
+
+def test_identical_in_flight_jobs_are_shared(pipeline):
+    first = pipeline.submit("0.3", "slow")
+    second = pipeline.submit("0.3", "slow")
+    assert first is second
+    assert pipeline.get_stats()["deduplicated"] == 1
+    first.result()
+
+
+def test_failures_are_yielded_per_document(pipeline):
+    [(key, data, error)] = pipeline.export_many([("en-US", "<p/>")], "bad")
+    assert key == "en-US" and data is None and isinstance(error, RuntimeError)
+
+
+def test_unknown_format(pipeline):
+    with pytest.raises(ValueError):
+        pipeline.submit("<p/>", "odt")
@@ -0,0 +1,107 @@
+"""
+Tests for the shared intent extraction cache.
+
+Uses a stub chat model so no API calls are made.
+"""
+
+import json
+from utils import intent_extraction
+from utils.intent_extraction import IntentExtractor, INTENT_SCHEMA, content_hash
+
+
+class StubResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class StubModel:
+    """Counts invocations and returns a fixed intent."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return StubResponse(json.dumps({"content_type": "event", "industry": "fitness"}))
+
+
+def test_same_text_extracted_once():
+    """Same text (modulo whitespace/case) hits the cache across agents."""
+    extractor = IntentExtractor(ttl_seconds=60)
+    model = StubModel()
+
+    first = extractor.extract("HIIT class Saturday 10 AM", model=model, agent="video_script")
+    second = extractor.extract("  hiit class   saturday 10 am ", model=model, agent="template_generator")
+
+    assert model.calls == 1
+    assert first == second
+    assert extractor.get_stats()["hits"] == 1
+
+
+def test_schema_defaults_filled():
+    """Missing fields are filled from the common schema."""
+    extractor = IntentExtractor(ttl_seconds=60)
+    intent = extractor.extract("Yoga retreat", model=StubModel())
+
+    assert set(INTENT_SCHEMA) <= set(intent)
+    assert intent["industry"] == "fitness"
+    assert intent["key_elements"] == []
+
+
+def test_cached_copy_is_isolated():
+    """Mutating a returned intent does not corrupt the cache."""
+    extractor = IntentExtractor(ttl_seconds=60)
+    model = StubModel()
+
+    intent = extractor.extract("Flash sale", model=model)
+    intent["target_audience"] = "shoppers"
+
+    assert "target_audience" not in extractor.extract("Flash sale", model=model)
+
+
+def test_ttl_expiry():
+    """Expired entries are re-extracted."""
+    extractor = IntentExtractor(ttl_seconds=0)
+    model = StubModel()
+
+    extractor.extract("Webinar", model=model)
+    extractor.extract("Webinar", model=model)
+
+    assert model.calls == 2
+
+
+def test_lru_eviction():
+    """Least recently used intents are dropped beyond maxsize."""
+    extractor = IntentExtractor(ttl_seconds=60, maxsize=2)
+    model = StubModel()
+
+    extractor.extract("Webinar", model=model)
+    extractor.extract("Flash sale", model=model)
+    extractor.extract("Webinar", model=model)  # now most recently used
+    extractor.extract("Yoga retreat", model=model)
+
+    assert extractor.get_stats()["entries"] == 2
+    extractor.extract("Webinar", model=model)
+    assert model.calls == 3
+    extractor.extract("Flash sale", model=model)
+    assert model.calls == 4
+
+
+def test_expired_entries_purged_on_insert(monkeypatch):
+    """Storing an intent drops expired ones even if they are never looked up again."""
+    clock = [0.0]
+    monkeypatch.setattr(intent_extraction.time, "monotonic", lambda: clock[0])
+    extractor = IntentExtractor(ttl_seconds=60, maxsize=10)
+    model = StubModel()
+
+    extractor.extract("Webinar", model=model)
+    extractor.extract("Flash sale", model=model)
+    clock[0] = 61.0
+    extractor.extract("Yoga retreat", model=model)
+
+    assert extractor.get_stats()["entries"] == 1
+
+
+def test_content_hash_normalization():
+    assert content_hash("A  b\nC") == content_hash("a b c")
+    assert content_hash("a b c") != content_hash("a b d")
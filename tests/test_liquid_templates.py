@@ -0,0 +1,49 @@
+"""
+Tests for the shared Liquid environment and parsed template cache.
+"""
+
+import pytest
+
+from utils.liquid_templates import LiquidTemplateCache
+
+SOURCE = "<h1>{{ Title }}</h1>"
+
+
+def test_parses_once_and_renders_all_languages():
+    cache = LiquidTemplateCache(maxsize=4)
+
+    rendered = cache.render_languages(SOURCE, {"en-US": {"Title": "Hi"}, "de-DE": {"Title": "Hallo"}})
+    assert rendered == {"en-US": "<h1>Hi</h1>", "de-DE": "<h1>Hallo</h1>"}
+    assert cache.parse(SOURCE) is cache.parse(SOURCE)
+
+    stats = cache.get_stats()
+    assert stats["misses"] == 1 and stats["hits"] == 2
+    assert stats["renders"] == 2 and stats["avg_parse_ms"] > 0
+
+
+def test_accepts_parsed_template():
+    cache = LiquidTemplateCache()
+    template = cache.parse(SOURCE)
+    assert cache.render(template, Title="X") == "<h1>X</h1>"
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LiquidTemplateCache(maxsize=2)
+    first = cache.parse("a{{ x }}")
+    cache.parse("b{{ x }}")
+    cache.parse("a{{ x }}")  # refresh "a"
+    cache.parse("c{{ x }}")  # evicts "b"
+
+    assert cache.get_stats()["size"] == 2
+    assert cache.parse("a{{ x }}") is first
+    misses = cache.get_stats()["misses"]
+    cache.parse("b{{ x }}")
+    assert cache.get_stats()["misses"] == misses + 1
+
+
+def test_syntax_errors_are_raised_and_not_cached():
+    cache = LiquidTemplateCache()
+    with pytest.raises(Exception):
+        cache.parse("{% if %}")
+    assert cache.get_stats()["size"] == 0
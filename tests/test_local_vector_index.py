@@ -0,0 +1,184 @@
+"""
+Tests for the local NumPy vector index.
+"""
+
+import json
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from repositories import local_vector_index
+from repositories.local_vector_index import LocalVectorIndex, normalize
+
+DIM = 16
+
+
+def _clustered(n, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM))
+    return centers[rng.integers(clusters, size=n)] + 0.1 * rng.normal(size=(n, DIM))
+
+
+def test_exact_search_and_distances(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    vectors = np.eye(DIM)[:3] * 5  # scaled: search normalizes
+    index.add(["a", "b", "c"], ["text a", "text b", "text c"], vectors)
+
+    results = index.search(np.eye(DIM)[1], k=2)
+
+    assert results[0][0] == {"id": "b", "text": "text b"}
+    assert results[0][1] == pytest.approx(0.0, abs=1e-6)
+    assert results[1][1] == pytest.approx(2.0)  # orthogonal unit vectors
+
+
+def test_persists_and_ignores_torn_write(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    index.add(["a", "b"], ["x", "y"], _clustered(2))
+    with open(tmp_path / "records.jsonl", "a") as f:
+        f.write('{"id": "partial"')  # crash mid-append
+
+    reopened = LocalVectorIndex(str(tmp_path), dim=DIM)
+    assert len(reopened) == 2
+    assert reopened.search(index._vectors[1], k=1)[0][0]["id"] == "b"
+
+
+def test_append_after_torn_vector_write_stays_aligned(tmp_path):
+    vectors = np.eye(DIM)[:3]
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    index.add(["a"], ["x"], vectors[:1])
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(vectors[1].astype(np.float32).tobytes())  # vector row without its record
+
+    reopened = LocalVectorIndex(str(tmp_path), dim=DIM)
+    reopened.add(["c"], ["z"], vectors[2:3])
+
+    assert reopened.search(vectors[2], k=1)[0][0]["id"] == "c"
+    assert (tmp_path / "vectors.f32").stat().st_size == 2 * DIM * 4
+
+
+def test_append_after_torn_record_write_is_kept(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    index.add(["a"], ["x"], np.eye(DIM)[:1])
+    with open(tmp_path / "records.jsonl", "a") as f:
+        f.write('{"id": "partial"')
+
+    LocalVectorIndex(str(tmp_path), dim=DIM).add(["c"], ["z"], np.eye(DIM)[2:3])
+
+    reopened = LocalVectorIndex(str(tmp_path), dim=DIM)
+    assert reopened.ids() == ["a", "c"]
+    assert reopened.search(np.eye(DIM)[2], k=1)[0][0]["id"] == "c"
+
+
+def test_add_parses_only_new_records(tmp_path, monkeypatch):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    index.add(["a"], ["x"], np.eye(DIM)[:1])
+
+    parsed = []
+    loads = json.loads
+    monkeypatch.setattr(local_vector_index.json, "loads", lambda line: parsed.append(line) or loads(line))
+    for i in range(1, 6):
+        index.add([str(i)], [""], np.eye(DIM)[i:i + 1])
+
+    assert len(parsed) == 5
+    assert index.ids() == ["a", "1", "2", "3", "4", "5"]
+    assert index.search(np.eye(DIM)[4], k=1)[0][0]["id"] == "4"
+
+
+def test_instances_sharing_a_directory_see_each_others_appends(tmp_path):
+    first = LocalVectorIndex(str(tmp_path), dim=DIM)
+    second = LocalVectorIndex(str(tmp_path), dim=DIM)
+    first.add(["a"], ["x"], np.eye(DIM)[:1])
+    second.add(["b"], ["y"], np.eye(DIM)[1:2])
+    first.add(["c"], ["z"], np.eye(DIM)[2:3])
+
+    assert first.ids() == second.ids() == ["a", "b", "c"]
+    assert first.search(np.eye(DIM)[1], k=1)[0][0]["id"] == "b"
+    assert second.search(np.eye(DIM)[2], k=1)[0][0]["id"] == "c"
+
+
+def _add_rows(directory, prefix, count):
+    index = LocalVectorIndex(directory, dim=DIM)
+    for i in range(count):
+        index.add([f"{prefix}{i}"], [""], np.eye(DIM)[i % DIM:i % DIM + 1])
+
+
+@pytest.mark.skipif(local_vector_index.fcntl is None, reason="needs fcntl file locks")
+def test_concurrent_processes_keep_rows_aligned(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_add_rows, args=(str(tmp_path), prefix, 40)) for prefix in "pq"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    assert sorted(index.ids()) == sorted(f"{p}{i}" for p in "pq" for i in range(40))
+    for record, vector in zip(index._records, index._vectors):
+        assert np.argmax(vector) == int(record["id"][1:]) % DIM
+
+
+def test_ivf_matches_brute_force(tmp_path):
+    vectors = _clustered(3000)
+    index = LocalVectorIndex(str(tmp_path), dim=DIM, nprobe=8, ivf_min_rows=1000)
+    index.add([str(i) for i in range(3000)], [""] * 3000, vectors)
+    assert index._ivf is not None
+
+    queries = _clustered(50, seed=1)
+    unit = normalize(vectors)
+    hits = 0
+    for q in queries:
+        expected = set(np.argsort(-(unit @ normalize(q)))[:5].astype(str))
+        hits += len(expected & {r["id"] for r, _ in index.search(q, k=5)})
+    assert hits / (5 * len(queries)) >= 0.9
+
+
+def test_filtered_search_stays_in_workspace(tmp_path):
+    vectors = _clustered(3000)
+    index = LocalVectorIndex(str(tmp_path), dim=DIM, ivf_min_rows=1000)
+    metadata = [{"workspace_id": f"w{i % 3}"} for i in range(3000)]
+    index.add([str(i) for i in range(3000)], [""] * 3000, vectors, metadata)
+
+    results = index.search(vectors[1], k=5, filter={"workspace_id": "w1"})
+    assert results[0][0]["id"] == "1"
+    assert {record["workspace_id"] for record, _ in results} == {"w1"}
+    assert index.search(vectors[1], filter={"workspace_id": "missing"}) == []
+
+
+def test_rebuild_replaces_contents(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    index.add(["old"], ["old"], _clustered(1))
+
+    embed = lambda texts: np.stack([np.eye(DIM)[len(t) % DIM] for t in texts])
+    assert index.rebuild([("1", "a"), ("2", "bb"), ("3", "ccc")], embed, batch_size=2) == 3
+
+    assert [r["id"] for r, _ in index.search(np.eye(DIM)[2], k=1)] == ["2"]
+    assert len(LocalVectorIndex(str(tmp_path), dim=DIM)) == 3
+
+
+def test_rebuild_keeps_rows_added_while_staging(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    index.add(["old"], ["old"], np.eye(DIM)[:1])
+    writer = LocalVectorIndex(str(tmp_path), dim=DIM)
+
+    def embed(texts):
+        writer.add(["late"], ["late"], np.eye(DIM)[5:6], [{"workspace_id": "w1"}])
+        return np.stack([np.eye(DIM)[len(t) % DIM] for t in texts])
+
+    assert index.rebuild([("1", "a"), ("2", "bb")], embed) == 3
+
+    assert sorted(index.ids()) == ["1", "2", "late"]
+    assert index.search(np.eye(DIM)[5], k=1)[0][0] == {"workspace_id": "w1", "id": "late", "text": "late"}
+    assert sorted(writer.ids()) == ["1", "2", "late"]
+
+
+def test_remove_compacts_and_persists(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), dim=DIM)
+    vectors = _clustered(4)
+    index.add(["a", "b", "a", "c"], ["1", "2", "3", "4"], vectors)
+
+    assert index.remove(["a", "missing"]) == 2
+    assert index.ids() == ["b", "c"]
+    assert index.search(vectors[3], k=1)[0][0]["id"] == "c"
+    assert LocalVectorIndex(str(tmp_path), dim=DIM).ids() == ["b", "c"]
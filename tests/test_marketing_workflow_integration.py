@@ -169,6 +169,37 @@ class TestMarketingWorkflowIntegration:
         for platform, data in results.items():
             print(f"   - {platform}: {data['score']}/100, {data['sections']} sections, tone: {data['tone']}")
 
+    def test_batch_multi_platform_generation(self, video_script_agent):
+        """
+        Test batch generation: campaign analyzed once, scripts generated per platform.
+        """
+        campaign = "Special offer: 30% off all products this weekend only!"
+        platforms = ['instagram_reels', 'tiktok', 'youtube_shorts']
+
+        results = video_script_agent.generate_video_scripts_for_platforms(
+            campaign_content=campaign,
+            platforms=platforms,
+            target_audience="general consumers",
+            content_goal="Drive sales"
+        )
+
+        # Result is keyed by platform in requested order
+        assert list(results.keys()) == platforms
+
+        # Every platform shares the same campaign analysis
+        analyses = [r['campaign_analysis'] for r in results.values()]
+        assert all(a == analyses[0] for a in analyses)
+
+        for platform, result in results.items():
+            assert not result['error']
+            assert platform in result['selected_pattern']['platform']
+            assert len(result['script_sections']) > 0
+            assert 'platform_optimization' in result
+
+        print(f"✅ Batch generation:")
+        for platform, result in results.items():
+            print(f"   - {platform}: {result['virality_prediction'].get('virality_score', 0)}/100")
+
     def test_template_validation_quality(self, template_agent):
         """
         Test that generated templates pass validation across different industries.
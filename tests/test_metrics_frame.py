@@ -0,0 +1,73 @@
+"""
+Tests for MetricsFrame.
+
+Verifies conversions, zero-copy slicing and vectorized rates.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from agents.analytics_agent import analyze_performance
+from analytics.metrics_frame import MetricsFrame
+from analytics.mock_analytics_generator import MockAnalyticsGenerator
+
+
+def _metrics(days=30, seed=11):
+    generator = MockAnalyticsGenerator("fitness", "instagram_reels", seed=seed)
+    return generator.generate_campaign_metrics("camp_frame", date(2025, 12, 1), days=days)
+
+
+def test_roundtrip_dataclasses():
+    """Dataclass list -> frame -> dataclass list is lossless."""
+    metrics = _metrics()
+    frame = MetricsFrame.from_metrics(metrics)
+
+    assert len(frame) == 30
+    assert frame.dates.dtype == np.dtype('datetime64[D]')
+    assert frame.to_metrics() == metrics
+
+
+def test_roundtrip_documents():
+    """Frame -> Mongo time-series docs -> frame keeps all columns."""
+    frame = MetricsFrame.from_metrics(_metrics())
+    docs = frame.to_documents()
+
+    assert docs[0]["meta"] == {"campaign_id": "camp_frame", "platform": "instagram_reels"}
+    restored = MetricsFrame.from_documents(docs)
+    assert restored.to_metrics() == frame.to_metrics()
+
+
+def test_zero_copy_slicing():
+    """Slices share memory with the parent frame."""
+    frame = MetricsFrame.from_metrics(_metrics())
+
+    week = frame.between(date(2025, 12, 8), date(2025, 12, 14))
+    assert len(week) == 7
+    assert week.day(0) == date(2025, 12, 8)
+    assert np.shares_memory(week.views, frame.views)
+
+    head = frame[:5]
+    assert np.shares_memory(head.likes, frame.likes)
+
+
+def test_vectorized_rates():
+    """Derived rates match per-day arithmetic."""
+    frame = MetricsFrame.from_counts(
+        "c", "tiktok", ["2025-12-01", "2025-12-02"],
+        views=[1000, 0], likes=[70, 0], comments=[15, 0], shares=[10, 0], saves=[5, 0], clicks=[12, 0]
+    )
+
+    assert np.allclose(frame.engagement_rate, [0.095, 0.0])
+    assert np.allclose(frame.virality_score, [1.0, 0.0])
+    assert np.allclose(frame.click_through_rate, [0.012, 0.0])
+
+
+def test_analyze_performance_accepts_frame():
+    """Hot path gives the same summary for frames and lists."""
+    metrics = _metrics()
+    benchmark = MockAnalyticsGenerator("fitness", "instagram_reels").generate_benchmark_data()
+
+    from_list = analyze_performance({"metrics": metrics, "benchmark": benchmark})['performance_summary']
+    from_frame = analyze_performance({"metrics": MetricsFrame.from_metrics(metrics), "benchmark": benchmark})['performance_summary']
+    assert from_list == from_frame
@@ -0,0 +1,206 @@
+"""
+Tests for MetricsRepository (time-series metrics and $inc rollups).
+
+The rollup operation tests run offline; the others need a MongoDB server
+(CONNECTION_STRING_MONGO, default localhost) and are skipped when none is
+reachable.
+"""
+
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from pymongo import MongoClient, errors
+
+from analytics.metrics_frame import MetricsFrame
+from repositories.metrics_repository import MetricsRepository, period_start
+
+START = date(2025, 12, 30)  # Tuesday; the 8 days span two weeks and two months
+
+
+def _frame(start=START, days=8, campaign_id="camp_1", platform="instagram"):
+    views = [100 * (i + 1) for i in range(days)]
+    return MetricsFrame.from_counts(
+        campaign_id, platform, [start + timedelta(days=i) for i in range(days)],
+        views=views, likes=[10] * days, comments=[2] * days, shares=[1] * days, saves=[0] * days, clicks=[5] * days
+    )
+
+
+def _by_period(operations, granularity):
+    return {
+        op._filter["period_start"].date(): op._doc["$inc"]
+        for op in operations if op._filter["granularity"] == granularity
+    }
+
+
+def test_period_start():
+    assert period_start(START, "daily") == START
+    assert period_start(START, "weekly") == date(2025, 12, 29)
+    assert period_start(START, "monthly") == date(2025, 12, 1)
+    with pytest.raises(ValueError):
+        period_start(START, "yearly")
+
+
+def test_rollup_operations_sum_each_period():
+    repository = MetricsRepository.__new__(MetricsRepository)
+    operations = repository._rollup_operations(_frame())
+
+    assert all(op._upsert for op in operations)
+    assert len(_by_period(operations, "daily")) == 8
+
+    weekly = _by_period(operations, "weekly")
+    assert weekly[date(2025, 12, 29)]["days"] == 6 and weekly[date(2026, 1, 5)]["days"] == 2
+    assert weekly[date(2025, 12, 29)]["views"] == sum(range(100, 700, 100))
+    assert weekly[date(2026, 1, 5)]["views"] == 700 + 800
+
+    monthly = _by_period(operations, "monthly")
+    assert monthly[date(2025, 12, 1)] == {"days": 2, "views": 300, "likes": 20, "comments": 4, "shares": 2, "saves": 0, "clicks": 10}
+    assert monthly[date(2026, 1, 1)]["views"] == sum(range(300, 900, 100))
+
+
+class RejectingCollection:
+    """Collection double; insert_many rejects some positions like an unordered insert."""
+
+    def __init__(self, reject=(), calls=None):
+        self.reject = set(reject)
+        self.calls = [] if calls is None else calls
+        self.docs = []
+        self.operations = []
+
+    def insert_many(self, docs, ordered=True):
+        self.calls.append(("insert_many", len(docs)))
+        self.docs.extend(doc for i, doc in enumerate(docs) if i not in self.reject)
+        if self.reject:
+            raise errors.BulkWriteError({"writeErrors": [{"index": i, "errmsg": "rejected"} for i in sorted(self.reject)]})
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append(("bulk_write", len(operations)))
+        self.operations.extend(operations)
+
+    def delete_many(self, query):
+        self.calls.append(("delete_many", query))
+
+
+def test_partial_insert_rolls_up_only_inserted_rows():
+    repository = MetricsRepository.__new__(MetricsRepository)
+    repository.metrics = RejectingCollection(reject={1, 9})  # day 2 of camp_1, day 2 of camp_2
+    repository.rollups = RejectingCollection()
+
+    with pytest.raises(errors.BulkWriteError):
+        repository.save_metrics([*_frame().to_metrics(), *_frame(campaign_id="camp_2").to_metrics()])
+
+    assert len(repository.metrics.docs) == 14
+    daily = _by_period([op for op in repository.rollups.operations if op._filter["campaign_id"] == "camp_1"], "daily")
+    assert START + timedelta(days=1) not in daily and len(daily) == 7
+    for campaign_id in ("camp_1", "camp_2"):
+        monthly = _by_period([op for op in repository.rollups.operations if op._filter["campaign_id"] == campaign_id], "monthly")
+        assert monthly[date(2025, 12, 1)] == {"days": 1, "views": 100, "likes": 10, "comments": 2, "shares": 1, "saves": 0, "clicks": 5}
+        assert monthly[date(2026, 1, 1)]["days"] == 6
+
+
+def test_replace_writes_new_rows_before_deleting_old():
+    calls = []
+    repository = MetricsRepository.__new__(MetricsRepository)
+    repository.metrics = RejectingCollection(calls=calls)
+    repository.rollups = RejectingCollection(calls=calls)
+
+    assert repository.replace_campaign_metrics("camp_1", _frame()) == 8
+
+    write_id = repository.metrics.docs[0]["meta"]["write_id"]
+    assert [name for name, _ in calls] == ["insert_many", "bulk_write", "delete_many", "delete_many"]
+    assert calls[2][1] == {"meta.campaign_id": "camp_1", "meta.write_id": {"$ne": write_id}}
+    assert calls[3][1] == {"campaign_id": "camp_1", "write_id": {"$ne": write_id}}
+    # Rollups are set to the new sums, not incremented on top of the old ones
+    assert all(set(op._doc) == {"$set"} and op._doc["$set"]["write_id"] == write_id for op in repository.rollups.operations)
+
+
+def test_replace_keeps_old_rows_when_insert_partly_fails():
+    calls = []
+    repository = MetricsRepository.__new__(MetricsRepository)
+    repository.metrics = RejectingCollection(reject={3}, calls=calls)
+    repository.rollups = RejectingCollection(calls=calls)
+
+    with pytest.raises(errors.BulkWriteError):
+        repository.replace_campaign_metrics("camp_1", _frame())
+
+    write_id = repository.metrics.docs[0]["meta"]["write_id"]
+    assert calls == [("insert_many", 8), ("delete_many", {"meta.campaign_id": "camp_1", "meta.write_id": write_id})]
+
+
+@pytest.fixture
+def repo():
+    connection_string = os.getenv("CONNECTION_STRING_MONGO", "mongodb://localhost:27017/app")
+    client = MongoClient(connection_string, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except errors.PyMongoError:
+        pytest.skip("MongoDB server not available")
+
+    suffix = uuid.uuid4().hex[:8]
+    repository = MetricsRepository(
+        connection_string,
+        collection_name=f"metrics_test_{suffix}",
+        rollup_collection_name=f"metrics_rollups_test_{suffix}"
+    )
+    yield repository
+    repository.metrics.drop()
+    repository.rollups.drop()
+    client.close()
+
+
+def test_metrics_collection_is_time_series(repo):
+    [info] = repo.db.list_collections(filter={"name": repo.metrics.name})
+    assert info["type"] == "timeseries"
+    assert info["options"]["timeseries"]["timeField"] == "date"
+    assert info["options"]["timeseries"]["metaField"] == "meta"
+
+
+def test_save_and_read_back(repo):
+    assert repo.save_metrics(_frame()) == 8
+
+    frame = repo.get_metrics_frame("camp_1", start=date(2026, 1, 1), end=date(2026, 1, 3))
+    assert list(frame.views) == [300, 400, 500]
+    assert len(repo.get_metrics("camp_1")) == 8
+
+
+def test_rollups_accumulate_across_writes(repo):
+    # Two writes landing in the same week and month are $inc-ed into one rollup
+    repo.save_metrics(_frame(days=3))
+    repo.save_metrics(_frame(start=START + timedelta(days=3), days=5))
+
+    weekly = repo.get_rollups("camp_1", "weekly")
+    assert [(r["period_start"], r["days"]) for r in weekly] == [(date(2025, 12, 29), 6), (date(2026, 1, 5), 2)]
+    assert weekly[0]["views"] == sum(range(100, 700, 100))
+    assert isinstance(weekly[0]["updated_at"], datetime)
+
+    monthly = repo.get_rollups("camp_1", "monthly", start=date(2026, 1, 15))
+    assert [(r["period_start"], r["days"]) for r in monthly] == [(date(2026, 1, 1), 6)]
+
+    with pytest.raises(ValueError):
+        repo.get_rollups("camp_1", "yearly")
+
+
+def test_totals_and_delete(repo):
+    repo.save_metrics(_frame())
+
+    totals = repo.get_totals("camp_1", start=date(2026, 1, 1))
+    assert totals["days"] == 6
+    assert totals["views"] == sum(range(300, 900, 100))
+    assert totals["total_engagement"] == 6 * 13
+    assert totals["engagement_rate"] == pytest.approx(78 / 3300)
+
+    repo.delete_campaign_metrics("camp_1")
+    assert repo.get_totals("camp_1")["days"] == 0
+    assert repo.get_rollups("camp_1") == []
+
+
+def test_replace_campaign_metrics(repo):
+    repo.save_metrics(_frame())
+    repo.save_metrics(_frame(campaign_id="camp_2"))
+
+    assert repo.replace_campaign_metrics("camp_1", _frame(start=date(2026, 1, 1), days=3)) == 3
+
+    assert list(repo.get_metrics_frame("camp_1").views) == [100, 200, 300]
+    assert [(r["period_start"], r["days"], r["views"]) for r in repo.get_rollups("camp_1", "monthly")] == [(date(2026, 1, 1), 3, 600)]
+    assert len(repo.get_metrics("camp_2")) == 8
@@ -5,6 +5,9 @@ Verifies that mock data generation produces realistic engagement patterns.
 """
 
 from datetime import date, timedelta
+
+import numpy as np
+
 from analytics.mock_analytics_generator import MockAnalyticsGenerator
 
 
@@ -132,6 +135,43 @@ def test_multiple_industries():
     assert fitness_avg > saas_avg, "Fitness should outperform SaaS on Instagram Reels"
 
 
+def test_seeded_generation_is_reproducible():
+    """Same seed produces identical metrics."""
+    start = date(2025, 12, 1)
+    first = MockAnalyticsGenerator("fitness", "tiktok", seed=42).generate_campaign_metrics("c1", start, days=14)
+    second = MockAnalyticsGenerator("fitness", "tiktok", seed=42).generate_campaign_metrics("c1", start, days=14)
+
+    assert first == second
+
+
+def test_generate_batch():
+    """Vectorized batch: N x D arrays, spikes, on-demand materialization."""
+    generator = MockAnalyticsGenerator("fitness", "instagram_reels", seed=1)
+    batch = generator.generate_batch(
+        n_campaigns=100,
+        start_date=date(2025, 12, 1),
+        days=60,
+        virality_factors=[1.0] * 50 + [2.5] * 50,
+        spike_days=[10] + [-1] * 99,
+        spike_magnitude=4.0
+    )
+
+    assert batch.views.shape == (100, 60)
+    assert batch.rows == 6000
+    assert batch.dates[0] == np.datetime64("2025-12-01")
+
+    # Viral half outperforms, spike day dominates its neighbours
+    assert batch.views[50:].mean() > batch.views[:50].mean() * 2
+    assert batch.views[0, 10] > batch.views[0, 9] * 3
+
+    # Dataclasses only when asked
+    metrics = batch.to_metrics(0)
+    assert len(metrics) == 60
+    assert metrics[10].views == batch.views[0, 10]
+    assert metrics[0].date == date(2025, 12, 1)
+    assert metrics[10].virality_score == batch.virality_score[0, 10]
+
+
 if __name__ == "__main__":
     print("=== Test: Generate Campaign Metrics ===")
     test_generate_campaign_metrics()
@@ -143,4 +183,8 @@ if __name__ == "__main__":
     test_benchmark_data()
     print("\n=== Test: Multiple Industries ===")
     test_multiple_industries()
+    print("\n=== Test: Seeded Reproducibility ===")
+    test_seeded_generation_is_reproducible()
+    print("\n=== Test: Vectorized Batch ===")
+    test_generate_batch()
     print("\n✅ All tests passed!")
@@ -0,0 +1,82 @@
+"""
+Tests for the index registry and startup migrations.
+
+The explain-plan checks need a MongoDB server (CONNECTION_STRING_MONGO);
+they run against a throwaway database and are skipped when no server is
+reachable.
+"""
+
+import os
+import uuid
+
+import pytest
+from pymongo import MongoClient, errors
+
+from repositories.migrations import (
+    HOT_QUERIES,
+    INDEXES,
+    MIGRATIONS,
+    MIGRATIONS_COLLECTION,
+    _plan_stages,
+    explain_stages,
+    run_migrations
+)
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {
+        "stage": "SORT",
+        "inputStage": {
+            "stage": "OR",
+            "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]
+        }
+    }
+    assert _plan_stages(plan) == ["SORT", "OR", "IXSCAN", "COLLSCAN"]
+
+
+def test_every_hot_query_collection_has_indexes():
+    for query in HOT_QUERIES:
+        assert INDEXES.get(query["collection"]), query
+
+
+@pytest.fixture
+def scratch_db():
+    connection_string = os.getenv("CONNECTION_STRING_MONGO", "mongodb://localhost:27017")
+    client = MongoClient(connection_string, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except errors.PyMongoError:
+        pytest.skip("MongoDB server not available")
+
+    db = client[f"index_test_{uuid.uuid4().hex[:8]}"]
+    yield db
+    client.drop_database(db.name)
+    client.close()
+
+
+def test_migrations_are_idempotent(scratch_db):
+    scratch_db.content_templates.insert_one({"name": "Seeded", "items": []})
+
+    assert run_migrations(scratch_db) == [m[0] for m in MIGRATIONS]
+    assert run_migrations(scratch_db) == []
+    assert scratch_db[MIGRATIONS_COLLECTION].count_documents({}) == len(MIGRATIONS)
+    assert scratch_db.content_templates.find_one({"name": "Seeded"})["usage_count"] == 0
+
+    with pytest.raises(errors.DuplicateKeyError):
+        scratch_db.content_templates.insert_one({"name": "Seeded"})
+
+
+@pytest.mark.parametrize("query", HOT_QUERIES, ids=lambda q: f"{q['collection']}:{sorted(q['filter'])}")
+def test_hot_queries_use_indexes(scratch_db, query):
+    run_migrations(scratch_db)
+    collection = scratch_db[query["collection"]]
+    collection.insert_many([
+        {"name": f"t{i}", "workspace_id": "default", "usage_count": i,
+         "campaign_id": "c", "granularity": "daily", "period_start": i}
+        for i in range(20)
+    ])
+
+    stages = explain_stages(collection, query["filter"], query.get("sort"))
+
+    assert "COLLSCAN" not in stages, stages
+    assert "SORT" not in stages, stages
@@ -0,0 +1,92 @@
+"""
+Tests for the shared MongoClient provider.
+
+MongoClient connects lazily, so these run without a MongoDB server.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils.mongodb_utils import (
+    PoolMetricsListener,
+    close_mongo_clients,
+    get_mongo_client,
+    get_pool_config,
+    get_pool_stats,
+    report_pool_metrics
+)
+
+URI = "mongodb://localhost:27017/pool_test"
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    close_mongo_clients()
+    yield
+    close_mongo_clients()
+
+
+def test_client_is_shared_per_connection_string():
+    client = get_mongo_client(URI)
+
+    assert get_mongo_client(URI) is client
+    assert get_mongo_client("mongodb://localhost:27017/other") is not client
+
+
+def test_default_connection_string_from_env(monkeypatch):
+    monkeypatch.setenv("CONNECTION_STRING_MONGO", URI)
+    assert get_mongo_client() is get_mongo_client(URI)
+
+    monkeypatch.delenv("CONNECTION_STRING_MONGO")
+    with pytest.raises(ValueError):
+        get_mongo_client()
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "7")
+    monkeypatch.setenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "1500")
+    monkeypatch.setenv("MONGO_READ_PREFERENCE", "secondaryPreferred")
+    monkeypatch.setenv("MONGO_MIN_POOL_SIZE", "not-a-number")
+
+    config = get_pool_config()
+    assert config["minPoolSize"] == 0
+
+    client = get_mongo_client(URI)
+    assert client.options.pool_options.max_pool_size == 7
+    assert client.options.server_selection_timeout == 1.5
+    assert client.read_preference.mongos_mode == "secondaryPreferred"
+
+
+def test_socket_timeout_only_when_configured(monkeypatch):
+    monkeypatch.delenv("MONGO_SOCKET_TIMEOUT_MS", raising=False)
+    assert "socketTimeoutMS" not in get_pool_config()
+    assert get_mongo_client(URI).options.pool_options.socket_timeout is None
+
+    monkeypatch.setenv("MONGO_SOCKET_TIMEOUT_MS", "45000")
+    assert get_pool_config()["socketTimeoutMS"] == 45000
+
+
+def test_report_pool_metrics_returns_reported_stats():
+    get_mongo_client(URI)
+    assert report_pool_metrics() == get_pool_stats()
+
+
+def test_pool_stats_track_checkouts():
+    get_mongo_client(URI)
+    assert get_pool_stats()["pool_test"]["checked_out"] == 0
+
+    listener = PoolMetricsListener(max_pool_size=4)
+    event = SimpleNamespace(address=("localhost", 27017), duration=0.002)
+    listener.connection_created(event)
+    listener.connection_created(event)
+    listener.connection_checked_out(event)
+    listener.connection_checked_out(event)
+    listener.connection_checked_in(event)
+
+    stats = listener.stats()
+    assert stats["open_connections"] == 2
+    assert stats["checked_out"] == 1
+    assert stats["max_checked_out"] == 2
+    assert stats["utilization"] == 0.25
+    assert stats["avg_checkout_wait_ms"] == pytest.approx(2.0)
@@ -0,0 +1,89 @@
+"""
+Tests for EngagementPatternDetector.
+
+Verifies deterministic detection of spikes, weekend drops, trends and declines.
+"""
+
+from datetime import date, timedelta
+
+from analytics.analytics_models import CampaignMetrics
+from analytics.mock_analytics_generator import MockAnalyticsGenerator
+from analytics.pattern_detector import EngagementPatternDetector
+
+
+def _metrics_from_views(views, start=date(2025, 12, 1)):
+    """Build minimal CampaignMetrics from a list of daily views."""
+    return [
+        CampaignMetrics(
+            campaign_id="camp_test",
+            date=start + timedelta(days=i),
+            views=v, likes=0, comments=0, shares=0, saves=0, clicks=0,
+            engagement_rate=0.0, save_rate=0.0, click_through_rate=0.0,
+            virality_score=0.0, platform="instagram_reels"
+        )
+        for i, v in enumerate(views)
+    ]
+
+
+def test_detects_injected_spike():
+    """Viral spike injected mid-campaign is reported on its day."""
+    generator = MockAnalyticsGenerator("fitness", "instagram_reels", seed=7)
+    start = date(2025, 12, 1)
+    metrics = generator.generate_campaign_metrics("camp_spike", start, days=30)
+    metrics = generator.inject_viral_spike(metrics, spike_day=15, spike_magnitude=4.0)
+
+    patterns = EngagementPatternDetector().detect(metrics)
+    spikes = [p for p in patterns if p.pattern_type == "spike"]
+
+    print(f"Patterns: {[p.description for p in patterns]}")
+    assert any(p.date_range[0] == start + timedelta(days=15) for p in spikes)
+
+
+def test_detects_weekend_drop():
+    """Flat campaign with 40% lower Sat/Sun views."""
+    start = date(2025, 12, 1)  # Monday
+    views = [600 if (start + timedelta(days=i)).weekday() >= 5 else 1000 for i in range(28)]
+
+    patterns = EngagementPatternDetector().detect(_metrics_from_views(views, start))
+
+    assert [p.pattern_type for p in patterns] == ["weekend_drop"]
+    assert "weekend" in patterns[0].description.lower()
+
+
+def test_detects_trend_and_steep_decline():
+    """Steady growth is trending; a sharp drop is a decline, not a trend."""
+    growth = [int(1000 * 1.03 ** i) for i in range(30)]
+    patterns = EngagementPatternDetector().detect(_metrics_from_views(growth))
+    assert [p.pattern_type for p in patterns] == ["trending"]
+
+    surge = [5000, 4800, 4900] + [300] * 27
+    patterns = EngagementPatternDetector().detect(_metrics_from_views(surge))
+    assert [p.pattern_type for p in patterns] == ["decline"]
+    assert patterns[0].impact == "high"
+    assert patterns[0].date_range == (date(2025, 12, 3), date(2025, 12, 4))
+
+
+def test_consistent_and_deterministic():
+    """Stable data yields one consistent pattern, identically on every run."""
+    views = [1000 + (i % 3) * 20 for i in range(30)]
+    metrics = _metrics_from_views(views)
+
+    first = EngagementPatternDetector().detect(metrics)
+    second = EngagementPatternDetector().detect(list(reversed(metrics)))
+
+    assert [p.pattern_type for p in first] == ["consistent"]
+    assert first == second
+
+
+def test_short_series():
+    """Too little data yields no patterns instead of errors."""
+    assert EngagementPatternDetector().detect(_metrics_from_views([100, 200])) == []
+
+
+def test_frame_input_matches_list_input():
+    """MetricsFrame and dataclass list give identical patterns."""
+    generator = MockAnalyticsGenerator("fitness", "instagram_reels", seed=3)
+    batch = generator.generate_batch(1, date(2025, 12, 1), days=45, spike_days=[20], spike_magnitude=4.0)
+
+    detector = EngagementPatternDetector()
+    assert detector.detect(batch.to_frame(0)) == detector.detect(batch.to_metrics(0))
@@ -0,0 +1,79 @@
+"""
+Tests for RunningAggregates and incremental analytics updates.
+
+Verifies O(1) updates match full recomputation and that analysis is reused
+when aggregates barely move.
+"""
+
+from datetime import date, timedelta
+
+from agents.analytics_agent import analyze_performance, update_campaign_analytics
+from analytics.mock_analytics_generator import MockAnalyticsGenerator
+from analytics.running_aggregates import RunningAggregates
+
+
+def test_incremental_matches_full_recompute():
+    """Folding days one at a time gives the same summary as analyze_performance."""
+    generator = MockAnalyticsGenerator("fitness", "instagram_reels")
+    benchmark = generator.generate_benchmark_data()
+    metrics = generator.generate_campaign_metrics("camp_inc", date(2025, 12, 1), days=30, virality_factor=1.5)
+
+    aggregates = RunningAggregates(campaign_id="camp_inc")
+    for m in metrics:
+        assert aggregates.update(m)
+
+    expected = analyze_performance({"metrics": metrics, "benchmark": benchmark})['performance_summary']
+    assert aggregates.performance_summary(benchmark) == expected
+    assert aggregates.days == 30
+    assert sum(aggregates.weekday_days) == 30
+
+
+def test_old_days_are_skipped():
+    """Days not after last_date are ignored instead of double counted."""
+    generator = MockAnalyticsGenerator("saas", "linkedin")
+    metrics = generator.generate_campaign_metrics("camp_dup", date(2025, 12, 1), days=3)
+
+    aggregates = RunningAggregates.from_metrics("camp_dup", metrics)
+    assert not aggregates.update(metrics[1])
+    assert aggregates.total_views == sum(m.views for m in metrics)
+
+
+def test_roundtrip_dict():
+    """Aggregates survive MongoDB serialization."""
+    generator = MockAnalyticsGenerator("saas", "linkedin")
+    metrics = generator.generate_campaign_metrics("camp_rt", date(2025, 12, 1), days=10)
+
+    aggregates = RunningAggregates.from_metrics("camp_rt", metrics)
+    assert RunningAggregates.from_dict(aggregates.to_dict()) == aggregates
+
+
+def test_small_drift_reuses_analysis():
+    """A new day that barely moves aggregates keeps previous insights (no LLM call)."""
+    generator = MockAnalyticsGenerator("fitness", "instagram_reels")
+    benchmark = generator.generate_benchmark_data()
+    start = date(2025, 12, 1)
+    metrics = generator.generate_campaign_metrics("camp_reuse", start, days=30)
+
+    aggregates = RunningAggregates.from_metrics("camp_reuse", metrics)
+    previous = {
+        "performance_summary": aggregates.performance_summary(benchmark),
+        "detected_patterns": [],
+        "content_insights": [],
+        "recommendations": ["Post mid-week"],
+        "next_month_strategy": "Keep going",
+        "error": "",
+        "analyzed_snapshot": aggregates.snapshot()
+    }
+
+    new_day = generator.generate_campaign_metrics(
+        "camp_reuse", start + timedelta(days=30), days=1, day_offset=30
+    )
+    result = update_campaign_analytics(
+        "camp_reuse", new_day, benchmark,
+        aggregates=aggregates, previous_analysis=previous, threshold=0.5
+    )
+
+    assert result['reanalyzed'] is False
+    assert result['recommendations'] == ["Post mid-week"]
+    assert result['performance_summary']['total_views'] == sum(m.views for m in metrics + new_day)
+    assert result['aggregates'].days == 31
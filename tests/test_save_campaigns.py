@@ -0,0 +1,89 @@
+"""
+Tests for CampaignRepository.save_campaigns (bulk save with per-stage errors).
+
+MongoDB, the embedding service and the vector store are replaced by
+in-test doubles.
+"""
+
+import pytest
+from bson import ObjectId
+from pymongo import errors
+
+pytest.importorskip("pymilvus")
+
+from campaign import Campaign
+from repositories import campaign_repository
+from repositories.campaign_repository import CampaignRepository
+
+
+class CampaignsCollection:
+    """insert_many that rejects campaigns named "duplicate"."""
+
+    name = "campaigns"
+
+    def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        bad = [{"index": i, "errmsg": "E11000 duplicate key"} for i, d in enumerate(docs) if d["name"] == "duplicate"]
+        if bad:
+            raise errors.BulkWriteError({"writeErrors": bad})
+
+
+class FakeEmbeddingService:
+    def embed_many(self, texts):
+        if any("unembeddable" in text for text in texts):
+            raise RuntimeError("embedding API error")
+        return [[1.0, 0.0] for _ in texts]
+
+
+def _campaign(name, text="Sale"):
+    return Campaign(name, {"en-US": {"Title": text}}, "<h1>{{ Title }}</h1>", _id=ObjectId())
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    monkeypatch.setattr(campaign_repository, "get_embedding_service", lambda: FakeEmbeddingService())
+    repository = CampaignRepository.__new__(CampaignRepository)
+    repository.mongo_collection = CampaignsCollection()
+    repository.inserted = []
+
+    def insert_vectors(campaigns, texts, embeddings):
+        if any(campaign.name == "vector store down" for campaign in campaigns):
+            raise RuntimeError("milvus insert failed")
+        repository.inserted += [campaign.name for campaign in campaigns]
+
+    repository._insert_vectors = insert_vectors
+    repository._vector_store = lambda: object()
+    return repository
+
+
+def test_errors_are_reported_per_stage(repository):
+    campaigns = [
+        _campaign("a"),
+        _campaign("duplicate"),
+        _campaign("b", "unembeddable"),
+        _campaign("c"),
+        _campaign("vector store down")
+    ]
+
+    result = repository.save_campaigns(campaigns, batch_size=1)
+
+    assert result.saved == 4
+    assert [(e["index"], e["stage"]) for e in result.errors] == [(1, "mongo"), (2, "embedding"), (4, "milvus")]
+    assert result.failed == 3
+    assert repository.inserted == ["a", "c"]
+
+
+def test_embedding_failure_fails_whole_batch(repository):
+    result = repository.save_campaigns([_campaign("a"), _campaign("b", "unembeddable")], batch_size=2)
+
+    assert [(e["index"], e["stage"]) for e in result.errors] == [(0, "embedding"), (1, "embedding")]
+    assert repository.inserted == []
+
+
+def test_without_vector_store_saves_to_mongo_only(repository):
+    repository._vector_store = lambda: None
+
+    result = repository.save_campaigns([_campaign("a"), _campaign("b")])
+
+    assert result.saved == 2 and result.errors == []
+    assert repository.inserted == []
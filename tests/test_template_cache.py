@@ -0,0 +1,123 @@
+"""
+Tests for the read-through template cache.
+
+The watcher test needs a MongoDB server (CONNECTION_STRING_MONGO, default
+localhost) and is skipped when none is reachable.
+"""
+
+import os
+import time
+import uuid
+
+import pytest
+from pymongo import MongoClient, errors
+
+from utils.template_cache import TemplateCache, is_relevant_change
+
+TEMPLATE = {"name": "Promo", "liquid_template": "<h1>{{ Title }}</h1>", "items": []}
+
+
+class CountingCollection:
+    """Minimal in-memory stand-in that counts reads."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+
+    def find_one(self, query):
+        self.reads += 1
+        return next((dict(d) for d in self.docs if d["name"] == query["name"]), None)
+
+    def find(self):
+        self.reads += 1
+        return [dict(d) for d in self.docs]
+
+    def aggregate(self, pipeline):
+        return [{"_id": None, "updated_at": None, "count": len(self.docs)}]
+
+
+def test_usage_count_updates_are_ignored():
+    assert not is_relevant_change({
+        "operationType": "update",
+        "updateDescription": {"updatedFields": {"usage_count": 4}, "removedFields": []}
+    })
+    assert is_relevant_change({
+        "operationType": "update",
+        "updateDescription": {"updatedFields": {"liquid_template": "x", "usage_count": 4}}
+    })
+    assert is_relevant_change({"operationType": "delete"})
+
+
+def test_reads_are_served_from_memory_until_invalidated():
+    collection = CountingCollection([dict(TEMPLATE)])
+    cache = TemplateCache(collection, watch=False)
+
+    first = cache.get("Promo")
+    first["name"] = "mutated"
+    assert cache.get("Promo")["name"] == "Promo"
+    assert cache.get_parsed("Promo").render(Title="Hi") == "<h1>Hi</h1>"
+    assert cache.get("Missing") is None
+    assert cache.get("Missing") is None
+    assert collection.reads == 2
+
+    collection.docs[0]["liquid_template"] = "<h2>{{ Title }}</h2>"
+    cache.invalidate()
+    assert cache.get_parsed("Promo").render(Title="Hi") == "<h2>Hi</h2>"
+    assert collection.reads == 3
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_polling_refreshes_edits_the_watermark_misses():
+    collection = CountingCollection([dict(TEMPLATE)])
+    cache = TemplateCache(collection, watch=False, refresh_interval=0.05)
+    watermark = cache._poll(None)
+    assert cache.get("Promo")["liquid_template"] == TEMPLATE["liquid_template"]
+
+    # In-place edit without updated_at: the watermark is unchanged
+    collection.docs[0]["liquid_template"] = "<h2>{{ Title }}</h2>"
+    assert cache._poll(watermark) == watermark
+    assert cache.get("Promo")["liquid_template"] == TEMPLATE["liquid_template"]
+
+    time.sleep(0.06)
+    cache._poll(watermark)
+    assert cache.get("Promo")["liquid_template"] == "<h2>{{ Title }}</h2>"
+
+
+@pytest.fixture
+def templates_collection():
+    connection_string = os.getenv("CONNECTION_STRING_MONGO", "mongodb://localhost:27017")
+    client = MongoClient(connection_string, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except errors.PyMongoError:
+        pytest.skip("MongoDB server not available")
+
+    db = client[f"template_cache_test_{uuid.uuid4().hex[:8]}"]
+    db.content_templates.insert_one(dict(TEMPLATE))
+    yield db.content_templates
+    client.drop_database(db.name)
+    client.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_watcher_invalidates_on_external_writes(templates_collection):
+    cache = TemplateCache(templates_collection, poll_interval=0.1)
+    cache.get("Promo")
+    assert _wait_for(lambda: cache.mode is not None and cache._ready.is_set())
+
+    cache.get("Promo")
+    assert cache.get_stats()["hits"] >= 1
+
+    templates_collection.update_one(
+        {"name": "Promo"},
+        {"$set": {"liquid_template": "<h2>{{ Title }}</h2>", "updated_at": time.time()}}
+    )
+    assert _wait_for(lambda: cache.get("Promo")["liquid_template"] == "<h2>{{ Title }}</h2>")
@@ -0,0 +1,87 @@
+"""
+Tests for TemplateRepository against a scratch MongoDB database.
+
+Needs a MongoDB server (CONNECTION_STRING_MONGO, default localhost);
+skipped when none is reachable.
+"""
+
+import os
+import uuid
+
+import pytest
+from pymongo import MongoClient, errors
+
+from repositories.migrations import run_migrations
+from repositories.template_repository import TemplateRepository
+
+
+@pytest.fixture
+def repo():
+    connection_string = os.getenv("CONNECTION_STRING_MONGO", "mongodb://localhost:27017/app")
+    client = MongoClient(connection_string, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except errors.PyMongoError:
+        pytest.skip("MongoDB server not available")
+
+    repository = TemplateRepository(connection_string, stats_cache_ttl=60)
+    # Point the repository at a throwaway database
+    repository.db = repository.client[f"template_test_{uuid.uuid4().hex[:8]}"]
+    repository.templates = repository.db.content_templates
+    run_migrations(repository.db)
+
+    yield repository
+    client.drop_database(repository.db.name)
+    client.close()
+
+
+def _save(repo, name, workspace_id="default"):
+    repo.save_ai_generated_template(name, "desc", "<p>{{ Body }}</p>", [], {"industry": "saas"}, workspace_id)
+
+
+def test_stats_for_several_workspaces(repo):
+    _save(repo, "A")
+    _save(repo, "B")
+    _save(repo, "C", workspace_id="acme")
+    repo.templates.insert_one({"name": "Manual", "workspace_id": "acme", "usage_count": 0})
+    for _ in range(3):
+        repo.increment_usage_count("B")
+
+    stats = repo.get_workspaces_template_stats(["default", "acme", "empty"])
+
+    assert stats["default"]["total_templates"] == 2
+    assert stats["default"]["ai_generated"] == 2
+    assert stats["default"]["most_used_template"] == "B"
+    assert stats["default"]["most_used_count"] == 3
+    assert stats["acme"]["total_templates"] == 2
+    assert stats["acme"]["manual_created"] == 1
+    assert stats["empty"]["total_templates"] == 0
+    assert stats["empty"]["most_used_template"] is None
+
+
+def test_stats_cache_and_invalidation(repo):
+    _save(repo, "A")
+    assert repo.get_template_stats()["total_templates"] == 1
+
+    # Writes that bypass the repository are only seen after the TTL
+    repo.templates.insert_one({"name": "Direct", "workspace_id": "default"})
+    assert repo.get_template_stats()["total_templates"] == 1
+    assert repo.get_template_stats(use_cache=False)["total_templates"] == 2
+
+    _save(repo, "B")
+    assert repo.get_template_stats()["total_templates"] == 3
+
+
+def test_bulk_save_reports_duplicates(repo):
+    _save(repo, "Existing")
+    result = repo.save_templates([
+        {"name": "New", "workspace_id": "default", "liquid_template": ""},
+        {"name": "Existing", "workspace_id": "default", "liquid_template": ""}
+    ])
+
+    assert result.saved == 1
+    assert [e["name"] for e in result.errors] == ["Existing"]
+
+    upserted = repo.upsert_templates([{"_id": result.inserted_ids[0], "name": "New", "workspace_id": "default", "liquid_template": "v2"}])
+    assert upserted.saved == 1
+    assert repo.get_template_by_name("New")["liquid_template"] == "v2"
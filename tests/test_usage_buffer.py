@@ -0,0 +1,108 @@
+"""
+Tests for the write-behind template usage buffer.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from pymongo import errors
+
+from repositories.usage_buffer import UsageCountBuffer
+
+
+class RecordingCollection:
+    """Records applied increments; fails while fail is set, rejects names in reject."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.reject = set()
+        self.missing = set()
+        self.database = SimpleNamespace(name="test")
+        self.name = "content_templates"
+
+    def bulk_write(self, operations, ordered=True):
+        if self.fail:
+            raise RuntimeError("write failed")
+        applied = [op for op in operations if op._filter["name"] not in self.reject]
+        self.batches.append(applied)
+        matched = sum(op._filter["name"] not in self.missing for op in applied)
+        write_errors = [
+            {"index": i, "errmsg": "rejected"} for i, op in enumerate(operations) if op._filter["name"] in self.reject
+        ]
+        if write_errors:
+            raise errors.BulkWriteError({"writeErrors": write_errors, "nMatched": matched})
+        return SimpleNamespace(matched_count=matched)
+
+
+def _increments(batch):
+    return {(op._filter["workspace_id"], op._filter["name"]): op._doc["$inc"]["usage_count"] for op in batch}
+
+
+@pytest.fixture
+def collection():
+    return RecordingCollection()
+
+
+def test_increments_are_coalesced_into_one_bulk_write(collection):
+    buffer = UsageCountBuffer(collection, flush_interval_ms=60000, max_pending_ops=1000)
+    for _ in range(5):
+        buffer.add("Promo")
+    buffer.add("Launch", workspace_id=None, delta=2)
+
+    assert collection.batches == []
+    assert buffer.pending_deltas() == 7
+
+    assert buffer.flush() == 2
+    assert _increments(collection.batches[0]) == {("default", "Promo"): 5, (None, "Launch"): 2}
+    assert buffer.pending_deltas() == 0
+    buffer.close()
+
+
+def test_failed_flush_keeps_deltas(collection):
+    buffer = UsageCountBuffer(collection, flush_interval_ms=60000, max_pending_ops=1000)
+    buffer.add("Promo")
+    collection.fail = True
+    assert buffer.flush() == 0
+    buffer.add("Promo")
+
+    collection.fail = False
+    buffer.close()
+    assert _increments(collection.batches[-1]) == {("default", "Promo"): 2}
+
+
+def test_flushes_on_op_threshold(collection):
+    buffer = UsageCountBuffer(collection, flush_interval_ms=60000, max_pending_ops=3)
+    for _ in range(3):
+        buffer.add("Promo")
+
+    buffer._thread.join(timeout=0.5)  # flusher wakes up immediately
+    assert sum(_increments(b)[("default", "Promo")] for b in collection.batches) == 3
+    buffer.close()
+
+
+def test_partial_failure_requeues_only_failed_increments(collection):
+    buffer = UsageCountBuffer(collection, flush_interval_ms=60000, max_pending_ops=1000)
+    buffer.add("Promo")
+    buffer.add("Launch", delta=3)
+    collection.reject = {"Launch"}
+
+    assert buffer.flush() == 1
+    assert buffer.pending_deltas() == 3  # Promo was applied and is not retried
+
+    collection.reject = set()
+    buffer.flush()
+    applied = [_increments(batch) for batch in collection.batches]
+    assert applied == [{("default", "Promo"): 1}, {("default", "Launch"): 3}]
+    buffer.close()
+
+
+def test_flush_returns_matched_templates(collection):
+    buffer = UsageCountBuffer(collection, flush_interval_ms=60000, max_pending_ops=1000)
+    buffer.add("Promo")
+    buffer.add("Deleted")
+    collection.missing = {"Deleted"}
+
+    assert buffer.flush() == 1
+    buffer.close()
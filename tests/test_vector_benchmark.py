@@ -0,0 +1,58 @@
+"""
+Tests for vector index configuration and the recall / latency benchmark.
+"""
+
+import numpy as np
+import pytest
+
+from repositories.vector_benchmark import exact_top_k, recall_at_k, run_benchmark, synthetic_corpus
+from repositories.vector_index_config import VectorIndexConfig
+
+
+def test_defaults_match_original_index():
+    config = VectorIndexConfig()
+    assert config.index_params() == {"index_type": "IVF_FLAT", "params": {"nlist": 128}, "metric_type": "L2"}
+    assert config.search_params() == {"metric_type": "L2", "params": {"nprobe": 10}}
+    assert config.is_match(0.4) and not config.is_match(0.6)
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("VECTOR_INDEX_TYPE", "hnsw")
+    monkeypatch.setenv("VECTOR_INDEX_METRIC", "cosine")
+    monkeypatch.setenv("VECTOR_INDEX_HNSW_M", "32")
+    monkeypatch.setenv("RAG_SIMILARITY_THRESHOLD", "0.8")
+    config = VectorIndexConfig.from_env(ef=8)
+
+    assert config.index_params() == {"index_type": "HNSW", "params": {"M": 32, "efConstruction": 200}, "metric_type": "COSINE"}
+    assert config.search_params()["params"] == {"ef": 8}
+    assert config.is_match(0.9) and not config.is_match(0.7)
+    assert config.score_from_unit_l2(0.2) == pytest.approx(0.9)
+
+
+def test_rejects_unknown_index_type():
+    with pytest.raises(ValueError):
+        VectorIndexConfig(index_type="DISKANN_TYPO")
+
+
+def test_matches_existing_index():
+    config = VectorIndexConfig(index_type="HNSW")
+    assert config.matches_index({"index_type": "HNSW", "metric_type": "L2", "params": {"M": "16", "efConstruction": "200"}})
+    assert not config.matches_index({"index_type": "IVF_FLAT", "metric_type": "L2", "params": {"nlist": 128}})
+
+
+def test_exact_top_k_and_recall():
+    corpus = synthetic_corpus(500, 32)
+    truth = exact_top_k(corpus, corpus[:10], k=3)
+    assert (truth[:, 0] == np.arange(10)).all()  # each vector is its own nearest neighbour
+    assert recall_at_k(truth.tolist(), truth) == 1.0
+    assert recall_at_k([[-1, -1, -1]] * 10, truth) == 0.0
+
+
+def test_local_benchmark_reports_recall_and_latency():
+    results = run_benchmark(rows=3000, dim=32, query_count=20, k=5, milvus=False)
+
+    brute = results[0]
+    assert brute.config == "brute force" and brute.recall == 1.0
+    ivf = [r for r in results if r.config.startswith("IVF")]
+    assert ivf[-1].recall >= ivf[0].recall  # more lists probed, better recall
+    assert all(0 < r.p50_ms <= r.p99_ms for r in results)
@@ -0,0 +1,136 @@
+"""
+Tests for the vector store reconciliation job.
+
+MongoDB and the vector store are replaced by small in-memory doubles of the
+repository interface the reconciler uses.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from pymongo import errors
+
+from repositories.vector_reconciliation import VectorReconciler
+from utils.milvus_utils import CONNECTING, MilvusConnection
+
+
+class Cursor(list):
+    def sort(self, key, direction):
+        return Cursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+
+class CampaignsCollection:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def find(self, query, projection):
+        return Cursor({"_id": _id} for _id in self.ids)
+
+
+class CheckpointCollection:
+    """Just enough of find_one_and_update / update_one for the lease."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one_and_update(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and doc.get("lease_until") and doc["lease_until"] >= update["$set"]["started_at"]:
+            raise errors.DuplicateKeyError("lease held")
+        self.docs[query["_id"]] = {"_id": query["_id"], **(doc or {}), **update["$set"]}
+
+    def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc and doc["owner"] == query["owner"]:
+            doc.update(update["$set"])
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+
+class FakeRepository:
+    """Vector store keyed by campaign id; Milvus-style primary keys."""
+
+    vector_store_name = "milvus:campaigns_v2"
+
+    def __init__(self, mongo_ids, vectors):
+        self.mongo_collection = CampaignsCollection(mongo_ids)
+        self.mongo_db = {"vector_reconciliation": CheckpointCollection()}
+        self.vectors = list(vectors)  # [(campaign_id, primary_key)]
+        self.indexed_batches = []
+        self.fail_index = False
+        self.milvus = MilvusConnection(connection_string="")
+
+    def iter_indexed_ids(self):
+        return iter(list(self.vectors))
+
+    def index_campaigns(self, campaign_ids):
+        if self.fail_index:
+            raise RuntimeError("embedding API down")
+        self.indexed_batches.append(campaign_ids)
+        self.vectors += [(campaign_id, 1000 + len(self.vectors)) for campaign_id in campaign_ids]
+        return len(campaign_ids)
+
+    def delete_vectors(self, campaign_ids=(), primary_keys=()):
+        before = len(self.vectors)
+        self.vectors = [(c, pk) for c, pk in self.vectors if c not in campaign_ids and pk not in primary_keys]
+        return before - len(self.vectors)
+
+
+def _old_ids(count):
+    created = datetime.now(timezone.utc) - timedelta(days=1)
+    return [ObjectId.from_datetime(created + timedelta(seconds=i)) for i in range(count)]
+
+
+@pytest.fixture
+def repository():
+    ids = _old_ids(5)
+    fresh = ObjectId()  # saved moments ago, possibly still being embedded
+    vectors = [(str(ids[0]), 1), (str(ids[0]), 2), (str(ids[1]), 3), ("deadbeefdeadbeefdeadbeef", 4)]
+    return FakeRepository(ids + [fresh], vectors)
+
+
+def test_run_indexes_missing_and_deletes_orphans(repository):
+    reconciler = VectorReconciler(repository, batch_size=2)
+    progress = reconciler.run()
+
+    assert progress["missing"] == 3 and progress["embedded"] == 3
+    assert progress["orphans"] == 1 and progress["duplicates"] == 1 and progress["deleted"] == 2
+    assert [len(batch) for batch in repository.indexed_batches] == [2, 1]
+
+    indexed = [campaign_id for campaign_id, _ in repository.vectors]
+    assert sorted(indexed) == sorted(str(_id) for _id in repository.mongo_collection.ids[:5])
+
+    checkpoint = reconciler.get_checkpoint()
+    assert checkpoint["status"] == "completed" and checkpoint["lease_until"] is None
+    assert checkpoint["progress"]["last_id"] == str(repository.mongo_collection.ids[4])
+
+
+def test_second_run_is_a_no_op(repository):
+    VectorReconciler(repository).run()
+    progress = VectorReconciler(repository).run()
+    assert progress["missing"] == progress["orphans"] == progress["deleted"] == 0
+
+
+def test_lease_blocks_concurrent_run(repository):
+    first = VectorReconciler(repository)
+    first._acquire(repository.vector_store_name, datetime.now(timezone.utc))
+
+    assert VectorReconciler(repository).run() is None
+
+
+def test_embedding_failures_are_counted_and_retried_next_run(repository):
+    repository.fail_index = True
+    progress = VectorReconciler(repository).run()
+    assert progress["embedded"] == 0 and progress["errors"] == 3
+
+    repository.fail_index = False
+    assert VectorReconciler(repository).run()["embedded"] == 3
+
+
+def test_run_skipped_while_milvus_connecting(repository):
+    repository.milvus.state = CONNECTING
+
+    assert VectorReconciler(repository).run() is None
+    assert repository.indexed_batches == []
@@ -0,0 +1,79 @@
+"""
+Tests for batch video script generation across platforms.
+
+Uses a stub chat model and stubs out the per-platform steps, so no API
+calls are made.
+"""
+
+import json
+import time
+import uuid
+
+from agents.video_script_agent import VideoScriptAgent
+
+
+class StubResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class StubModel:
+    """Counts campaign analyses (intent extraction calls); can fail them."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.analyses = 0
+
+    def invoke(self, messages, **kwargs):
+        self.analyses += 1
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return StubResponse(json.dumps({"content_type": "event", "industry": "fitness"}))
+
+
+class StubPlatformAgent(VideoScriptAgent):
+    """Per-platform steps return the shared analysis; earlier platforms finish last."""
+
+    def generate_video_script_from_campaign(self, campaign_content, platform, target_audience="general audience",
+                                            content_goal="engage and convert", campaign_analysis=None):
+        time.sleep(0.1 if platform == "instagram_reels" else 0.0)
+        return {"platform": platform, "campaign_analysis": campaign_analysis, "error": ""}
+
+
+def _campaign():
+    # Unique text so the shared intent cache never answers for the model
+    return f"HIIT class Saturday 10 AM {uuid.uuid4().hex}"
+
+
+def test_campaign_analyzed_once_and_platform_order_kept():
+    model = StubModel()
+    agent = StubPlatformAgent(model)
+    platforms = ["instagram_reels", "tiktok", "youtube_shorts", "tiktok"]
+
+    results = agent.generate_video_scripts_for_platforms(_campaign(), platforms, target_audience="runners")
+
+    assert model.analyses == 1
+    assert list(results) == ["instagram_reels", "tiktok", "youtube_shorts"]
+    for platform, result in results.items():
+        assert result["platform"] == platform
+        assert result["campaign_analysis"]["industry"] == "fitness"
+        assert result["campaign_analysis"]["target_audience"] == "runners"
+
+
+def test_analysis_failure_fans_out_to_every_platform():
+    model = StubModel(fail=True)
+    agent = StubPlatformAgent(model)
+
+    results = agent.generate_video_scripts_for_platforms(_campaign(), ["tiktok", "instagram_reels"])
+
+    assert model.analyses == 1
+    assert list(results) == ["tiktok", "instagram_reels"]
+    for result in results.values():
+        assert result["error"].startswith("Campaign analysis failed")
+        assert result["full_script"] == "" and result["campaign_analysis"] == {}
+
+
+def test_no_platforms():
+    model = StubModel()
+    assert StubPlatformAgent(model).generate_video_scripts_for_platforms(_campaign(), []) == {}
+    assert model.analyses == 0
@@ -1,6 +1,7 @@
 import os
 import json
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
@@ -30,6 +31,7 @@ class APIUsageTracker:
     def __init__(self, storage_path: str = ".api_usage.json"):
         self.storage_path = Path(storage_path)
         self.usage_data = self._load_usage()
+        self._lock = threading.Lock()  # Agents track requests from worker threads
 
     def _load_usage(self) -> Dict:
         """Load usage from file"""
@@ -57,6 +59,16 @@ class APIUsageTracker:
         metadata: Optional[Dict] = None
     ):
         """Track API request"""
+        with self._lock:
+            self._track_request(model, input_tokens, output_tokens, metadata)
+
+    def _track_request(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        metadata: Optional[Dict] = None
+    ):
         pricing = PRICING.get(model, PRICING["gpt-4o-mini"])
         cost = (
             input_tokens * pricing["input"] +
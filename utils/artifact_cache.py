@@ -0,0 +1,166 @@
+# artifact_cache.py
+"""
+Content-addressed disk cache for export artifacts (PDF / DOCX).
+
+Artifacts are stored under the hash of (HTML hash, format, renderer
+version), so the same campaign HTML is converted once per renderer release
+no matter how often it is viewed, and a renderer upgrade never serves stale
+files. The cache is bounded by total size; when it grows past the limit the
+least recently used files (by mtime, refreshed on every hit) are deleted.
+"""
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".cache/exports"
+DEFAULT_MAX_MB = 512
+EXPORT_FORMAT_VERSION = 1  # bump when the conversion code itself changes
+
+# Packages whose version is part of each format's renderer version
+RENDERER_PACKAGES = {"pdf": ("weasyprint",), "docx": ("weasyprint", "pdf2docx")}
+
+
+def renderer_version(fmt: str) -> str:
+    """Version string of the code producing a format."""
+    versions = [f"v{EXPORT_FORMAT_VERSION}"]
+    for package in RENDERER_PACKAGES.get(fmt, ()):
+        try:
+            versions.append(f"{package}-{metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{package}-missing")
+    return "+".join(versions)
+
+
+def html_hash(html_content: str) -> str:
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """Size-bounded LRU of export artifacts on local disk."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Cache directory (defaults to EXPORT_CACHE_DIR env var or .cache/exports)
+            max_bytes: Size limit (defaults to EXPORT_CACHE_MAX_MB env var or 512 MB)
+        """
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("EXPORT_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+
+        self.directory = Path(directory or os.getenv("EXPORT_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._size = sum(path.stat().st_size for path in self._files())
+
+    def _files(self):
+        if not self.directory.exists():
+            return []
+        return [path for path in self.directory.glob("*/*") if not path.name.endswith(".tmp")]
+
+    def _path(self, digest: str, fmt: str, version: str) -> Path:
+        key = hashlib.sha256(f"{digest}:{fmt}:{version}".encode("utf-8")).hexdigest()
+        return self.directory / key[:2] / f"{key}.{fmt}"
+
+    def exists(self, digest: str, fmt: str, version: str) -> bool:
+        """Whether an artifact is cached (no read, not counted in the stats)."""
+        return self._path(digest, fmt, version).exists()
+
+    def get(self, digest: str, fmt: str, version: str, count: bool = True) -> Optional[bytes]:
+        """
+        Cached artifact, or None.
+
+        Args:
+            digest: SHA-256 of the source HTML (see html_hash)
+            fmt: Export format
+            version: Renderer version (see renderer_version)
+            count: Count the lookup as a hit or miss (False for display-only reads)
+        """
+        path = self._path(digest, fmt, version)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            data = None
+        except OSError as e:
+            logger.warning(f"Failed to read cached export {path}: {e}")
+            data = None
+        if count:
+            self._count("misses" if data is None else "hits")
+        return data
+
+    def put(self, digest: str, fmt: str, version: str, data: bytes):
+        """Store an artifact, then evict least recently used files over the size limit."""
+        path = self._path(digest, fmt, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size  # re-export of a cached artifact
+        except FileNotFoundError:
+            replaced = 0
+        # Write then rename so readers never see a partial file
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+        with self._lock:
+            self._size += len(data) - replaced
+            self._stats["writes"] += 1
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used files until the cache fits its size limit."""
+        with self._lock:
+            files = []
+            for path in self._files():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # removed by another process
+                files.append((stat.st_mtime, stat.st_size, path))
+            size = sum(file_size for _, file_size, _ in files)
+
+            for _, file_size, path in sorted(files, key=lambda f: f[0]):
+                if size <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                size -= file_size
+                self._stats["evictions"] += 1
+            self._size = size
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["bytes"] = self._size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+# Global cache
+_artifact_cache = None
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Get global export artifact cache"""
+    global _artifact_cache
+    if _artifact_cache is None:
+        with _artifact_cache_lock:
+            if _artifact_cache is None:
+                _artifact_cache = ArtifactCache()
+    return _artifact_cache
@@ -0,0 +1,254 @@
+# embedding_service.py
+"""
+Embedding service with batching and a persistent vector cache.
+
+Texts are deduplicated by content hash (per embedding model), looked up in
+an in-process LRU and a persistent store (Redis when available, otherwise
+float32 files on disk), and only the misses are sent to the OpenAI
+embeddings API, many texts per request. Vectors are stored as compact
+float32 blobs (6 KB for a 1536-dim embedding).
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.openai_utils import get_openai_embedding_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MEMORY_ENTRIES = 2048
+DEFAULT_CACHE_DIR = ".cache/embeddings"
+REDIS_KEY_PREFIX = "embedding"
+
+_DEFAULT_STORE = object()
+
+
+def embedding_key(text: str, model_name: str) -> str:
+    """Content hash of a text for one embedding model."""
+    return hashlib.sha256(f"{model_name}\n{text}".encode("utf-8")).hexdigest()
+
+
+class DiskVectorStore:
+    """float32 vectors as one file per key, sharded by key prefix."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.f32"
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        vectors = []
+        for key in keys:
+            try:
+                vectors.append(np.frombuffer(self._path(key).read_bytes(), dtype=np.float32))
+            except FileNotFoundError:
+                vectors.append(None)
+        return vectors
+
+    def set_many(self, items: Dict[str, np.ndarray]):
+        for key, vector in items.items():
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial vector
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(vector.astype(np.float32).tobytes())
+            tmp.replace(path)
+
+
+class RedisVectorStore:
+    """float32 vectors as raw bytes in Redis (MGET / pipelined SET)."""
+
+    def __init__(self, client, ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        blobs = self.client.mget([f"{REDIS_KEY_PREFIX}:{key}" for key in keys])
+        return [np.frombuffer(blob, dtype=np.float32) if blob else None for blob in blobs]
+
+    def set_many(self, items: Dict[str, np.ndarray]):
+        pipeline = self.client.pipeline(transaction=False)
+        for key, vector in items.items():
+            pipeline.set(f"{REDIS_KEY_PREFIX}:{key}", vector.astype(np.float32).tobytes(), ex=self.ttl_seconds)
+        pipeline.execute()
+
+
+def _default_store():
+    """Redis if configured and reachable, else disk; EMBEDDING_CACHE_BACKEND overrides."""
+    backend = os.getenv("EMBEDDING_CACHE_BACKEND", "redis" if os.getenv("REDIS_HOST") else "disk")
+
+    if backend == "none":
+        return None
+    if backend == "redis":
+        from common.redis import get_redis_client
+
+        client = get_redis_client()
+        if client is not None:
+            ttl = os.getenv("EMBEDDING_CACHE_TTL_SECONDS")
+            return RedisVectorStore(client, int(ttl) if ttl else None)
+        logger.warning("Redis unavailable for embedding cache, falling back to disk")
+
+    return DiskVectorStore(os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+
+class EmbeddingService:
+    """Batched, deduplicated, cached embedding generation."""
+
+    def __init__(self, model=None, store=_DEFAULT_STORE, batch_size: int = DEFAULT_BATCH_SIZE, memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        """
+        Initialize embedding service.
+
+        Args:
+            model: (OpenAI client, model name) (defaults to get_openai_embedding_model())
+            store: Persistent vector store (defaults to Redis/disk per env, None disables)
+            batch_size: Texts per embeddings API request
+            memory_entries: Vectors kept in the in-process LRU
+        """
+        self.client, self.model_name = model or get_openai_embedding_model()
+        self.store = _default_store() if store is _DEFAULT_STORE else store
+        self.batch_size = batch_size
+        self.memory_entries = memory_entries
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "texts": 0,
+            "unique_texts": 0,
+            "memory_hits": 0,
+            "store_hits": 0,
+            "misses": 0,
+            "api_requests": 0,
+            "api_seconds": 0.0,
+            "store_errors": 0
+        }
+
+    def embed(self, text: str) -> List[float]:
+        """Embedding of one text."""
+        return self.embed_array([text])[0].tolist()
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings of many texts (in input order)."""
+        return self.embed_array(texts).tolist()
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeddings of many texts as a float32 array.
+
+        Args:
+            texts: Texts to embed (duplicates are embedded once)
+
+        Returns:
+            np.ndarray of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [embedding_key(text, self.model_name) for text in texts]
+        unique = dict(zip(keys, texts))  # key -> text, first occurrence order
+        vectors: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in unique:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+        memory_hits = len(vectors)
+
+        missing = [key for key in unique if key not in vectors]
+        store_hits = 0
+        if missing and self.store is not None:
+            try:
+                for key, vector in zip(missing, self.store.get_many(missing)):
+                    if vector is not None:
+                        vectors[key] = vector
+                        store_hits += 1
+            except Exception as e:
+                logger.warning(f"Embedding cache read failed: {e}")
+                self._count("store_errors", 1)
+
+        missing = [key for key in unique if key not in vectors]
+        if missing:
+            fresh = self._request([unique[key] for key in missing])
+            new_vectors = dict(zip(missing, fresh))
+            vectors.update(new_vectors)
+            if self.store is not None:
+                try:
+                    self.store.set_many(new_vectors)
+                except Exception as e:
+                    logger.warning(f"Embedding cache write failed: {e}")
+                    self._count("store_errors", 1)
+
+        with self._lock:
+            for key in unique:
+                self._memory[key] = vectors[key]
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+            self._stats["texts"] += len(texts)
+            self._stats["unique_texts"] += len(unique)
+            self._stats["memory_hits"] += memory_hits
+            self._stats["store_hits"] += store_hits
+            self._stats["misses"] += len(missing)
+
+        return np.stack([vectors[key] for key in keys])
+
+    def _request(self, texts: List[str]) -> List[np.ndarray]:
+        """Call the embeddings API, batch_size texts per request."""
+        from utils.monitoring import track_metric
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            started = time.perf_counter()
+            response = self.client.embeddings.create(input=batch, model=self.model_name)
+            duration = time.perf_counter() - started
+
+            vectors.extend(
+                np.asarray(item.embedding, dtype=np.float32)
+                for item in sorted(response.data, key=lambda item: item.index)
+            )
+            with self._lock:
+                self._stats["api_requests"] += 1
+                self._stats["api_seconds"] += duration
+            track_metric("embedding_request_seconds", duration, {"texts": len(batch), "model": self.model_name})
+
+        logger.info(f"Embedded {len(texts)} texts in {-(-len(texts) // self.batch_size)} request(s)")
+        return vectors
+
+    def _count(self, name: str, value):
+        with self._lock:
+            self._stats[name] += value
+
+    def get_stats(self) -> Dict:
+        """Cache hit rates and API throughput."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        unique = stats["unique_texts"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["store_hits"]) / unique if unique else 0.0
+        stats["texts_per_second"] = stats["misses"] / stats["api_seconds"] if stats["api_seconds"] else 0.0
+        stats["store"] = type(self.store).__name__ if self.store is not None else None
+        return stats
+
+
+# Global service
+_embedding_service = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get global embedding service"""
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = EmbeddingService()
+    return _embedding_service
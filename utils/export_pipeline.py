@@ -0,0 +1,253 @@
+# export_pipeline.py
+"""
+PDF / DOCX export of rendered campaign HTML.
+
+WeasyPrint (and pdf2docx on top of it) is CPU-bound, so exports run in a
+process pool instead of on the Streamlit request thread. Nothing is
+exported until a format is requested; export_many() yields artifacts as
+they finish so the UI can show each download as soon as it is ready.
+Identical requests already in flight share one job, and finished artifacts
+are kept in a content-addressed disk cache (utils.artifact_cache) so a
+document already exported is served without rendering it again.
+"""
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from utils.artifact_cache import ArtifactCache, get_artifact_cache, html_hash, renderer_version
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+}
+
+
+def render_pdf(html_content: str) -> bytes:
+    """HTML to PDF (WeasyPrint)."""
+    from weasyprint import HTML
+
+    return HTML(string=html_content).write_pdf()
+
+
+def render_docx(html_content: str) -> bytes:
+    """HTML to DOCX via PDF (WeasyPrint + pdf2docx)."""
+    from pdf2docx import Converter
+
+    # Per-job temp files: several conversions may run at once
+    with tempfile.TemporaryDirectory() as directory:
+        pdf_path = os.path.join(directory, "export.pdf")
+        docx_path = os.path.join(directory, "export.docx")
+        with open(pdf_path, "wb") as temp_pdf:
+            temp_pdf.write(render_pdf(html_content))
+
+        cv = Converter(pdf_path)
+        cv.convert(docx_path, start=0, end=None)
+        cv.close()
+
+        with open(docx_path, "rb") as docx_file:
+            return docx_file.read()
+
+
+RENDERERS: Dict[str, Callable[[str], bytes]] = {"pdf": render_pdf, "docx": render_docx}
+
+
+def _version(fmt: str, renderer: Callable[[str], bytes]) -> str:
+    """Cache version of a renderer (package versions for the built-in ones)."""
+    if RENDERERS.get(fmt) is renderer:
+        return renderer_version(fmt)
+    return f"{renderer.__module__}.{renderer.__qualname__}"
+
+
+def _timed(renderer: Callable[[str], bytes], html_content: str) -> Tuple[bytes, float]:
+    started = time.perf_counter()
+    data = renderer(html_content)
+    return data, time.perf_counter() - started
+
+
+class ExportPipeline:
+    """Process pool for HTML exports with in-flight deduplication and an optional artifact cache."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        renderers: Optional[Dict[str, Callable[[str], bytes]]] = None,
+        cache: Optional[ArtifactCache] = None
+    ):
+        """
+        Initialize pipeline (the pool starts on first export).
+
+        Args:
+            max_workers: Worker processes (defaults to EXPORT_WORKERS env var or the CPU count)
+            renderers: Format -> picklable function(html) -> bytes (defaults to PDF and DOCX)
+            cache: Disk cache for finished artifacts (None disables caching)
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv("EXPORT_WORKERS", 0)) or os.cpu_count() or 1
+
+        self.max_workers = max_workers
+        self.renderers = renderers or RENDERERS
+        self.versions = {fmt: _version(fmt, renderer) for fmt, renderer in self.renderers.items()}
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"jobs": 0, "deduplicated": 0, "failures": 0, "cache_hits": 0, "render_seconds": 0.0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a multi-threaded Streamlit server is unsafe
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def cached(self, html_content: str, fmt: str) -> Optional[bytes]:
+        """
+        Cached artifact for a document, without rendering it.
+
+        For showing already exported documents on every rerun: documents not
+        in the cache are not read, and lookups are not counted in the cache
+        stats (only submit() counts, once per export request).
+
+        Args:
+            html_content: Rendered HTML
+            fmt: Export format
+
+        Returns:
+            Artifact bytes, or None if not exported yet (or caching is disabled)
+        """
+        if self.cache is None or fmt not in self.renderers:
+            return None
+        digest = html_hash(html_content)
+        if not self.cache.exists(digest, fmt, self.versions[fmt]):
+            return None
+        return self.cache.get(digest, fmt, self.versions[fmt], count=False)
+
+    def submit(self, html_content: str, fmt: str) -> Future:
+        """
+        Start (or join) an export job; cached artifacts resolve immediately.
+
+        Args:
+            html_content: Rendered HTML
+            fmt: Export format ("pdf" or "docx")
+
+        Returns:
+            Future resolving to (bytes, seconds)
+        """
+        if fmt not in self.renderers:
+            raise ValueError(f"Unsupported export format {fmt!r}")
+
+        key = (html_hash(html_content), fmt)
+        if self.cache is not None:
+            data = self.cache.get(key[0], fmt, self.versions[fmt])
+            if data is not None:
+                with self._lock:
+                    self._stats["cache_hits"] += 1
+                future = Future()
+                future.set_result((data, 0.0))
+                return future
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["deduplicated"] += 1
+                return future
+            try:
+                job = self._pool().submit(_timed, self.renderers[fmt], html_content)
+            except BrokenProcessPool:
+                logger.warning("Export pool broken, restarting it")
+                self._executor = None
+                job = self._pool().submit(_timed, self.renderers[fmt], html_content)
+            # Callers get a separate future resolved only after the artifact is
+            # cached, so a finished export is always visible to cached()
+            future = Future()
+            self._in_flight[key] = future
+            self._stats["jobs"] += 1
+
+        job.add_done_callback(lambda done: self._finished(key, done, future))
+        return future
+
+    def _finished(self, key: Tuple[str, str], job: Future, future: Future):
+        error = None if job.cancelled() else job.exception()
+        if self.cache is not None and not job.cancelled() and error is None:
+            try:
+                self.cache.put(key[0], key[1], self.versions[key[1]], job.result()[0])
+            except OSError as e:
+                logger.warning(f"Failed to cache {key[1]} export: {e}")
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if job.cancelled() or error is not None:
+                self._stats["failures"] += 1
+            else:
+                self._stats["render_seconds"] += job.result()[1]
+
+        if job.cancelled():
+            future.cancel()
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(job.result())
+
+    def export(self, html_content: str, fmt: str) -> bytes:
+        """Export one document (blocks until done)."""
+        return self.submit(html_content, fmt).result()[0]
+
+    def export_many(self, documents: Iterable[Tuple[str, str]], fmt: str) -> Iterator[Tuple[str, Optional[bytes], Optional[Exception]]]:
+        """
+        Export documents in parallel, yielding each as soon as it finishes.
+
+        Args:
+            documents: (key, html) pairs, e.g. (language, html)
+            fmt: Export format
+
+        Yields:
+            (key, bytes, None) or (key, None, exception), in completion order
+        """
+        # Identical documents share one future, so a future can stand for several keys
+        futures = defaultdict(list)
+        for key, html_content in documents:
+            futures[self.submit(html_content, fmt)].append(key)
+        for future in as_completed(futures):
+            try:
+                data, error = future.result()[0], None
+            except Exception as e:
+                logger.error(f"Export of {', '.join(map(str, futures[future]))} to {fmt} failed: {e}")
+                data, error = None, e
+            for key in futures[future]:
+                yield key, data, error
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._in_flight)
+        stats["workers"] = self.max_workers
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global pipeline
+_export_pipeline = None
+_export_pipeline_lock = threading.Lock()
+
+
+def get_export_pipeline() -> ExportPipeline:
+    """Get global export pipeline"""
+    global _export_pipeline
+    if _export_pipeline is None:
+        with _export_pipeline_lock:
+            if _export_pipeline is None:
+                _export_pipeline = ExportPipeline(cache=get_artifact_cache())
+    return _export_pipeline
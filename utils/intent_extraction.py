@@ -0,0 +1,210 @@
+# intent_extraction.py
+"""
+Shared campaign intent extraction
+
+Extracts structured intent (content_type, industry, key message, ...) from free
+campaign text with a single LLM call, and caches the result by content hash so
+the same text fed to several tools (video scripts, templates, viral content)
+is analyzed once per TTL. The cache is a bounded LRU; expired entries are
+purged whenever a new intent is stored.
+"""
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from langchain_core.messages import HumanMessage
+
+from utils.api_cost_tracker import track_openai_request
+from utils.openai_utils import get_openai_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTENT_CACHE_TTL = 3600  # 1 hour
+DEFAULT_INTENT_CACHE_SIZE = 1024
+
+# Common intent schema shared by all agents (field -> default value)
+INTENT_SCHEMA = {
+    "content_type": "generic",
+    "industry": "generic",
+    "key_message": "",
+    "urgency": "evergreen",
+    "emotion": "helpful",
+    "hook_opportunity": "",
+    "key_elements": [],
+    "layout": "balanced",
+    "cta": "none",
+    "tone": "professional"
+}
+
+INTENT_PROMPT = """Analyze this marketing text and extract its structured intent.
+
+Text: "{text}"
+
+Return JSON:
+{{
+    "content_type": "announcement|promotion|update|story|tutorial|transformation|testimonial|event|sale",
+    "industry": "fitness|ecommerce|saas|consulting|education|food|generic",
+    "key_message": "main message in 5-10 words",
+    "urgency": "immediate|time-sensitive|evergreen",
+    "emotion": "exciting|helpful|inspiring|urgent|surprising|educational",
+    "hook_opportunity": "what makes this scroll-stopping (one sentence)",
+    "key_elements": ["field names that should be included"],
+    "layout": "visual-focused|text-focused|balanced",
+    "cta": "buy|register|learn|share|contact|none",
+    "tone": "professional|casual|energetic|inspirational|urgent"
+}}
+
+IMPORTANT:
+- Be specific about content_type and industry (used for pattern matching).
+- Be specific about key_elements. Include fields like:
+  - Text fields: title, description, name, tagline
+  - Media fields: image, photo, logo, video
+  - Data fields: date, time, price, location
+  - Rich content: benefits, features, testimonials
+
+Return ONLY the JSON object.
+"""
+
+
+def content_hash(text: str) -> str:
+    """Hash campaign text after whitespace/case normalization."""
+    normalized = re.sub(r'\s+', ' ', text).strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _parse_json(content: str) -> Dict:
+    """Parse JSON from an LLM response, tolerating code fences."""
+    content = content.replace("```json", "").replace("```", "").strip()
+    return json.loads(content)
+
+
+class IntentExtractor:
+    """LLM intent extraction with an in-process content-hash TTL + LRU cache."""
+
+    def __init__(self, ttl_seconds: Optional[int] = None, maxsize: Optional[int] = None):
+        """
+        Initialize intent extractor.
+
+        Args:
+            ttl_seconds: Cache TTL (defaults to INTENT_CACHE_TTL_SECONDS env var or 1 hour)
+            maxsize: Intents kept (defaults to INTENT_CACHE_SIZE env var or 1024)
+        """
+        if ttl_seconds is None:
+            ttl_seconds = int(os.getenv("INTENT_CACHE_TTL_SECONDS", DEFAULT_INTENT_CACHE_TTL))
+        if maxsize is None:
+            maxsize = int(os.getenv("INTENT_CACHE_SIZE", DEFAULT_INTENT_CACHE_SIZE))
+
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # hash -> (expires_at, intent)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def extract(self, text: str, model=None, agent: str = "intent_extraction") -> Dict:
+        """
+        Extract structured intent from campaign text.
+
+        Args:
+            text: Free campaign text or description
+            model: LangChain chat model (defaults to get_openai_model())
+            agent: Calling agent name (for API cost tracking)
+
+        Returns:
+            Intent dict following INTENT_SCHEMA (a copy, safe to mutate)
+
+        Raises:
+            json.JSONDecodeError: If the LLM response is not valid JSON
+        """
+        key = content_hash(text)
+
+        cached = self._get(key)
+        if cached is not None:
+            logger.info(f"Intent cache hit for {agent} ({key[:12]})")
+            return cached
+
+        logger.info(f"Intent cache miss for {agent} ({key[:12]}), extracting: {text[:100]}...")
+
+        model = model or get_openai_model()
+        response = model.invoke(
+            [HumanMessage(content=INTENT_PROMPT.format(text=text))],
+            response_format={"type": "json_object"}
+        )
+
+        # Track API usage
+        model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        track_openai_request(
+            model=model_name,
+            response=response,
+            metadata={"agent": agent, "step": "extract_intent"}
+        )
+
+        intent = {**INTENT_SCHEMA, **_parse_json(response.content)}
+
+        self._put(key, intent)
+
+        logger.info(f"Intent extracted: {intent.get('content_type')} / {intent.get('industry')}")
+        return copy.deepcopy(intent)
+
+    def _get(self, key: str) -> Optional[Dict]:
+        """Return a copy of a live cache entry, or None."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._cache.pop(key, None)
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def _put(self, key: str, intent: Dict):
+        """Store an intent, dropping expired entries, then least recently used ones over maxsize."""
+        now = time.monotonic()
+        with self._lock:
+            for expired in [k for k, (expires_at, _) in self._cache.items() if expires_at < now]:
+                del self._cache[expired]
+            self._cache[key] = (now + self.ttl_seconds, intent)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached intents."""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+# Global extractor
+_extractor = None
+
+
+def get_intent_extractor() -> IntentExtractor:
+    """Get global intent extractor"""
+    global _extractor
+    if _extractor is None:
+        _extractor = IntentExtractor()
+    return _extractor
+
+
+def extract_intent(text: str, model=None, agent: str = "intent_extraction") -> Dict:
+    """Extract campaign intent through the shared cached extractor."""
+    return get_intent_extractor().extract(text, model=model, agent=agent)
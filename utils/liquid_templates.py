@@ -0,0 +1,163 @@
+# liquid_templates.py
+"""
+Shared Liquid environment and parsed template cache.
+
+Every Liquid render in the app (campaign content, template previews,
+template validation) goes through one Environment and an LRU of parsed
+templates keyed by the SHA-256 of the template source, so a template is
+parsed once and rendered for every language from the same parsed object.
+Parse and render timings are collected for get_liquid_stats().
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from liquid import BoundTemplate, Environment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 256
+
+
+class LiquidTemplateCache:
+    """LRU of parsed templates for one Liquid environment."""
+
+    def __init__(self, environment: Optional[Environment] = None, maxsize: Optional[int] = None):
+        """
+        Initialize cache.
+
+        Args:
+            environment: Liquid environment (a new default Environment if None)
+            maxsize: Parsed templates kept (defaults to LIQUID_TEMPLATE_CACHE_SIZE env var or 256)
+        """
+        if maxsize is None:
+            maxsize = int(os.getenv("LIQUID_TEMPLATE_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+        self.environment = environment or Environment()
+        self.maxsize = maxsize
+        self._templates: "OrderedDict[str, BoundTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "parse_seconds": 0.0,
+            "renders": 0,
+            "render_seconds": 0.0
+        }
+
+    def parse(self, source: str) -> BoundTemplate:
+        """
+        Parsed template for a source string (parsed on first use).
+
+        Args:
+            source: Liquid template source
+
+        Returns:
+            BoundTemplate
+
+        Raises:
+            LiquidError: If the source does not parse (failures are not cached)
+        """
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self._stats["hits"] += 1
+                return template
+
+        started = time.perf_counter()
+        template = self.environment.from_string(source)
+        duration = time.perf_counter() - started
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["parse_seconds"] += duration
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return template
+
+    def render(self, template: Union[str, BoundTemplate], **data) -> str:
+        """Render a template (source or parsed) with data."""
+        if not isinstance(template, BoundTemplate):
+            template = self.parse(template)
+
+        started = time.perf_counter()
+        rendered = template.render(**data)
+        duration = time.perf_counter() - started
+
+        with self._lock:
+            self._stats["renders"] += 1
+            self._stats["render_seconds"] += duration
+        return rendered
+
+    def render_languages(self, template: Union[str, BoundTemplate], content_dict: Dict[str, Dict]) -> Dict[str, str]:
+        """
+        Render one template for every language.
+
+        Args:
+            template: Template source or parsed template (parsed once for all languages)
+            content_dict: Language code -> template data
+
+        Returns:
+            Language code -> rendered output
+        """
+        if not isinstance(template, BoundTemplate):
+            template = self.parse(template)
+        return {lang: self.render(template, **content) for lang, content in content_dict.items()}
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def get_stats(self) -> Dict:
+        """Cache hit rate and average parse / render times."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._templates)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["avg_parse_ms"] = stats["parse_seconds"] / stats["misses"] * 1000 if stats["misses"] else 0.0
+        stats["avg_render_ms"] = stats["render_seconds"] / stats["renders"] * 1000 if stats["renders"] else 0.0
+        return stats
+
+
+# Global cache
+_liquid_cache = None
+_liquid_cache_lock = threading.Lock()
+
+
+def get_liquid_cache() -> LiquidTemplateCache:
+    """Get global Liquid template cache"""
+    global _liquid_cache
+    if _liquid_cache is None:
+        with _liquid_cache_lock:
+            if _liquid_cache is None:
+                _liquid_cache = LiquidTemplateCache()
+    return _liquid_cache
+
+
+def parse_template(source: str) -> BoundTemplate:
+    """Parse Liquid source with the shared environment and cache."""
+    return get_liquid_cache().parse(source)
+
+
+def render_template(template: Union[str, BoundTemplate], **data) -> str:
+    """Render Liquid source or a parsed template with the shared cache."""
+    return get_liquid_cache().render(template, **data)
+
+
+def render_languages(template: Union[str, BoundTemplate], content_dict: Dict[str, Dict]) -> Dict[str, str]:
+    """Render one template for every language with the shared cache."""
+    return get_liquid_cache().render_languages(template, content_dict)
+
+
+def get_liquid_stats() -> Dict:
+    """Parse / render statistics of the shared cache."""
+    return get_liquid_cache().get_stats()
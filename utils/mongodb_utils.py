@@ -1,16 +1,244 @@
 # mongodb_utils.py
+"""
+MongoDB helpers.
+
+get_mongo_client() is the process-wide MongoClient provider: every
+repository reuses one pooled client per connection string instead of
+opening its own. Pool size, timeouts and read preference come from env
+vars; pool utilization is collected by a pymongo pool listener and
+exposed through get_pool_stats() and sent to monitoring by
+report_pool_metrics() (called from the Resources Check page).
+"""
 from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from typing import Dict, Optional
+import logging
 import os
+import threading
 from dotenv import load_dotenv
-from campaign import Campaign
+from bson import ObjectId
+from campaign import Campaign, find_campaign_page
+from repositories.migrations import run_startup_migrations
 
 # Load environment variables from .env file
 load_dotenv(override=True)
 
+logger = logging.getLogger(__name__)
+
+# Pool defaults (pymongo's own defaults are 100 / 0 / 30s / 20s / no socket timeout)
+DEFAULT_MAX_POOL_SIZE = 50
+DEFAULT_MIN_POOL_SIZE = 0
+DEFAULT_SERVER_SELECTION_TIMEOUT_MS = 10000
+DEFAULT_CONNECT_TIMEOUT_MS = 10000
+# No default socket timeout: long aggregations, migrations and reconciliation
+# scans must not be cut off. Set MONGO_SOCKET_TIMEOUT_MS to enable one.
+DEFAULT_READ_PREFERENCE = "primary"
+
+_clients: Dict[str, MongoClient] = {}
+_listeners: Dict[str, "PoolMetricsListener"] = {}
+_clients_lock = threading.Lock()
+
+
+class PoolMetricsListener(ConnectionPoolListener):
+    """Counts connection pool events for one MongoClient."""
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_seconds = 0.0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+        logger.warning(f"MongoDB pool cleared for {event.address}")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning(f"MongoDB connection checkout failed for {event.address}: {event.reason}")
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            # duration is reported by pymongo 4.7+
+            self.checkout_wait_seconds += getattr(event, "duration", 0.0) or 0.0
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def stats(self) -> Dict:
+        """Snapshot of pool counters."""
+        with self._lock:
+            return {
+                "max_pool_size": self.max_pool_size,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "utilization": self.checked_out / self.max_pool_size if self.max_pool_size else 0.0,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_checkout_wait_ms": (
+                    self.checkout_wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0
+                ),
+                "pool_clears": self.pool_clears
+            }
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        logger.warning(f"Invalid {name}={value!r}, using {default}")
+        return default
+
+
+def get_pool_config() -> Dict:
+    """
+    MongoClient pool options from env vars.
+
+    Env vars: MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS (unset = pymongo default, no timeout),
+    MONGO_READ_PREFERENCE (e.g. primaryPreferred).
+
+    Returns:
+        Dict of MongoClient keyword arguments
+    """
+    config = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", DEFAULT_MAX_POOL_SIZE),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", DEFAULT_MIN_POOL_SIZE),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", DEFAULT_SERVER_SELECTION_TIMEOUT_MS),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", DEFAULT_CONNECT_TIMEOUT_MS),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", DEFAULT_READ_PREFERENCE)
+    }
+    socket_timeout_ms = _env_int("MONGO_SOCKET_TIMEOUT_MS", 0)
+    if socket_timeout_ms > 0:
+        config["socketTimeoutMS"] = socket_timeout_ms
+    return config
+
+
+def get_mongo_client(connection_string: Optional[str] = None) -> MongoClient:
+    """
+    Get the shared MongoClient for a connection string.
+
+    MongoClient is thread-safe and pools connections internally, so one
+    client per process (per connection string) is reused by every repository.
+
+    Args:
+        connection_string: MongoDB connection string (defaults to env var)
+
+    Returns:
+        Shared MongoClient
+    """
+    if connection_string is None:
+        connection_string = os.getenv("CONNECTION_STRING_MONGO")
+    if not connection_string:
+        raise ValueError("MongoDB connection string is not set in environment variables.")
+
+    client = _clients.get(connection_string)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(connection_string)
+        if client is None:
+            config = get_pool_config()
+            listener = PoolMetricsListener(config["maxPoolSize"])
+            client = MongoClient(connection_string, event_listeners=[listener], **config)
+            _clients[connection_string] = client
+            _listeners[connection_string] = listener
+            logger.info(
+                f"Created shared MongoClient (maxPoolSize={config['maxPoolSize']}, "
+                f"readPreference={config['readPreference']})"
+            )
+        return client
+
+
+def get_pool_stats() -> Dict[str, Dict]:
+    """
+    Pool utilization per shared client.
+
+    Returns:
+        Dict keyed by database name (host for clients without a default database)
+    """
+    stats = {}
+    for connection_string, listener in list(_listeners.items()):
+        client = _clients[connection_string]
+        try:
+            name = client.get_database().name
+        except Exception:
+            name = ",".join(f"{host}:{port}" for host, port in client.topology_description.server_descriptions())
+        stats[name] = listener.stats()
+    return stats
+
+
+def report_pool_metrics() -> Dict[str, Dict]:
+    """
+    Send current pool utilization to monitoring (one metric set per client).
+
+    Returns:
+        The reported stats, as returned by get_pool_stats()
+    """
+    from utils.monitoring import track_metric
+
+    pool_stats = get_pool_stats()
+    for name, stats in pool_stats.items():
+        tags = {"client": name}
+        track_metric("mongo_pool_checked_out", stats["checked_out"], tags)
+        track_metric("mongo_pool_open_connections", stats["open_connections"], tags)
+        track_metric("mongo_pool_utilization", stats["utilization"], tags)
+        track_metric("mongo_pool_checkout_failures", stats["checkout_failures"], tags)
+    return pool_stats
+
+
+def close_mongo_clients():
+    """Close all shared clients (on shutdown or in tests)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _listeners.clear()
+    logger.info("Closed shared MongoClients")
+
+
 class MongoDBClient:
     def __init__(self, collection_name):
-        self.client = MongoClient(os.getenv("CONNECTION_STRING_MONGO"))
+        self.client = get_mongo_client()
         self.db = self.client.get_database()
+        run_startup_migrations(self.db)
         self.collection = self.db[collection_name]
 
     def get_templates(self):
@@ -26,4 +254,12 @@ class MongoDBClient:
 
     def get_campaigns(self):
         campaigns = self.collection.find()
-        return [Campaign.from_dict(campaign) for campaign in campaigns]
\ No newline at end of file
+        return [Campaign.from_dict(campaign) for campaign in campaigns]
+
+    def get_campaign_page(self, limit=50, after=None):
+        """Campaign summaries (id, name, created_at), newest first; returns (summaries, next cursor)."""
+        return find_campaign_page(self.collection, limit, after)
+
+    def get_campaign(self, campaign_id):
+        campaign = self.collection.find_one({"_id": ObjectId(campaign_id)}, {"analytics": 0})
+        return Campaign.from_dict(campaign) if campaign else None
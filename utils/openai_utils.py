@@ -33,7 +33,11 @@ def get_openai_client():
     return OpenAI(api_key=api_key)
 
 def generate_embeddings(text, model=None):
-    """Generate embeddings using OpenAI"""
-    embedding_model, embedding_model_name = model or get_openai_embedding_model()
+    """Generate embeddings using OpenAI (cached through the shared embedding service)"""
+    if model is None:
+        from utils.embedding_service import get_embedding_service
+        return get_embedding_service().embed(text)
+
+    embedding_model, embedding_model_name = model
     response = embedding_model.embeddings.create(input=[text], model=embedding_model_name)
-    return response.data[0].embedding
\ No newline at end of file
+    return response.data[0].embedding
@@ -0,0 +1,251 @@
+# template_cache.py
+"""
+Read-through cache for content templates.
+
+Template documents are read from MongoDB once and then served from
+memory; parsed Liquid templates come from the shared parse cache
+(utils.liquid_templates), keyed by template source. A background watcher keeps the
+cache coherent: it follows a MongoDB change stream on content_templates
+and falls back to polling an updated_at/count watermark when change
+streams are unavailable (standalone servers). Usage-count-only updates do
+not invalidate the cache, so cached usage_count values may lag. In polling
+mode changes made by other processes are seen within one poll interval if
+they bump updated_at or the document count; edits that do neither (shell
+edits, direct update_one calls) are picked up by a full refresh every
+refresh interval. Each poll runs one $group over the whole collection,
+which is cheap for the small content_templates collection.
+"""
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from liquid import BoundTemplate
+from pymongo import errors
+
+from utils.liquid_templates import parse_template
+from utils.mongodb_utils import get_mongo_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5  # seconds
+DEFAULT_REFRESH_INTERVAL = 300  # seconds between full refreshes in polling mode
+_ALL = object()  # cache key for the full template list
+
+
+def is_relevant_change(event: Dict) -> bool:
+    """
+    Whether a change stream event can change cached templates.
+
+    Updates that only touch usage_count (increment_usage_count) are ignored.
+    """
+    if event.get("operationType") != "update":
+        return True
+    description = event.get("updateDescription") or {}
+    changed = set(description.get("updatedFields") or {}) | set(description.get("removedFields") or [])
+    return not changed <= {"usage_count"}
+
+
+class TemplateCache:
+    """In-process read-through cache of template documents."""
+
+    def __init__(
+        self,
+        collection=None,
+        watch: bool = True,
+        poll_interval: Optional[float] = None,
+        refresh_interval: Optional[float] = None
+    ):
+        """
+        Initialize template cache.
+
+        Args:
+            collection: content_templates collection (defaults to the shared client's database)
+            watch: Start the invalidation watcher; without it entries live until invalidate()
+            poll_interval: Watermark poll interval in seconds when change streams are
+                unavailable (defaults to TEMPLATE_CACHE_POLL_SECONDS env var or 5)
+            refresh_interval: Seconds between full refreshes in polling mode, for edits
+                the watermark cannot see (defaults to TEMPLATE_CACHE_REFRESH_SECONDS
+                env var or 300; 0 disables)
+        """
+        if collection is None:
+            collection = get_mongo_client().get_database().content_templates
+        if poll_interval is None:
+            poll_interval = float(os.getenv("TEMPLATE_CACHE_POLL_SECONDS", DEFAULT_POLL_INTERVAL))
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("TEMPLATE_CACHE_REFRESH_SECONDS", DEFAULT_REFRESH_INTERVAL))
+
+        self.collection = collection
+        self.watch = watch
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self.mode = None  # "change_stream" or "polling" once the watcher runs
+
+        self._docs: Dict = {}  # name (or _ALL) -> document(s), None if not found
+        self._generation = 0
+        self._refreshed_at = time.monotonic()  # last invalidation
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._ready = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, name: str) -> Optional[Dict]:
+        """
+        Get a template document by name.
+
+        Args:
+            name: Template name
+
+        Returns:
+            Template document (a copy, safe to mutate) or None if not found
+        """
+        return copy.deepcopy(self._read(name, lambda: self.collection.find_one({"name": name})))
+
+    def get_all(self) -> List[Dict]:
+        """Get all template documents (copies)."""
+        return copy.deepcopy(self._read(_ALL, lambda: list(self.collection.find())))
+
+    def get_parsed(self, name: str) -> Optional[BoundTemplate]:
+        """
+        Get the parsed Liquid template for a template name.
+
+        Args:
+            name: Template name
+
+        Returns:
+            Parsed liquid Template or None if the template does not exist
+        """
+        doc = self._read(name, lambda: self.collection.find_one({"name": name}))
+        if doc is None:
+            return None
+        return parse_template(doc["liquid_template"])
+
+    def _read(self, key, load):
+        """Serve key from memory or load it, caching unless invalidated meanwhile."""
+        if self.watch:
+            self._ensure_watcher()
+
+        with self._lock:
+            if key in self._docs and self._serving():
+                self.hits += 1
+                return self._docs[key]
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+
+        with self._lock:
+            # Don't cache a result that may predate an invalidation
+            if generation == self._generation:
+                self._docs[key] = value
+        return value
+
+    def _serving(self) -> bool:
+        """Entries are only trusted while something invalidates them."""
+        return not self.watch or self._ready.is_set()
+
+    def invalidate(self):
+        """Drop all cached templates (called by the watcher and after local writes)."""
+        with self._lock:
+            self._docs.clear()
+            self._generation += 1
+            self._refreshed_at = time.monotonic()
+            self.invalidations += 1
+
+    # Invalidation watcher
+
+    def _ensure_watcher(self):
+        if self._watcher is None:
+            with self._lock:
+                if self._watcher is None:
+                    self._watcher = threading.Thread(target=self._watch_loop, name="template-cache-watcher", daemon=True)
+                    self._watcher.start()
+
+    def _watch_loop(self):
+        """Follow the change stream; switch to watermark polling if unsupported."""
+        while True:
+            try:
+                with self.collection.watch() as stream:
+                    self.mode = "change_stream"
+                    # Anything cached before the stream opened may have missed events
+                    self.invalidate()
+                    self._ready.set()
+                    logger.info("Template cache watching content_templates change stream")
+                    for event in stream:
+                        if is_relevant_change(event):
+                            self.invalidate()
+            except errors.OperationFailure as e:
+                logger.info(f"Change streams unavailable ({e}), polling template watermark every {self.poll_interval}s")
+                self._poll_loop()
+                return
+            except Exception as e:
+                logger.warning(f"Template change stream interrupted: {e}; retrying")
+            self._ready.clear()
+            self.invalidate()
+            time.sleep(self.poll_interval)
+
+    def _watermark(self):
+        """(latest updated_at, document count) of the collection."""
+        result = list(self.collection.aggregate([
+            {"$group": {"_id": None, "updated_at": {"$max": "$updated_at"}, "count": {"$sum": 1}}}
+        ]))
+        return (result[0]["updated_at"], result[0]["count"]) if result else (None, 0)
+
+    def _poll(self, watermark):
+        """One poll: invalidate on a watermark change or when the refresh interval has passed."""
+        current = self._watermark()
+        if current != watermark:
+            if watermark is not None:
+                logger.info("Templates changed, invalidating template cache")
+            self.invalidate()
+        elif self.refresh_interval and time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            # Catches edits that change neither updated_at nor the count
+            logger.debug("Template cache refresh interval passed, invalidating")
+            self.invalidate()
+        return current
+
+    def _poll_loop(self):
+        self.mode = "polling"
+        watermark = None
+        while True:
+            try:
+                watermark = self._poll(watermark)
+                self._ready.set()
+            except Exception as e:
+                logger.warning(f"Template watermark poll failed: {e}")
+                self._ready.clear()
+            time.sleep(self.poll_interval)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._docs),
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+# Global cache
+_template_cache = None
+
+
+def get_template_cache() -> TemplateCache:
+    """Get global template cache"""
+    global _template_cache
+    if _template_cache is None:
+        _template_cache = TemplateCache()
+    return _template_cache
+
+
+def invalidate_template_cache():
+    """Invalidate the global cache if it was created (after local template writes)."""
+    if _template_cache is not None:
+        _template_cache.invalidate()
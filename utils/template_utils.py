@@ -4,7 +4,7 @@ Template utilities for AI Template Generator
 
 Provides sample data generation and preview rendering for Liquid templates.
 """
-from liquid import Template as LiquidTemplate, Environment
+from utils.liquid_templates import render_template
 from typing import Dict, List
 import random
 from datetime import datetime, timedelta
@@ -316,10 +316,8 @@ def render_template_preview(liquid_template: str, field_schema: List[Dict], indu
         # Generate sample data
         sample_data = generate_sample_data(field_schema, industry)
 
-        # Render template (pass fields directly, not nested in 'items')
-        env = Environment()
-        template = env.from_string(liquid_template)
-        rendered = template.render(**sample_data)
+        # Render template (pass fields directly, not nested in 'items'); parsed once per source
+        rendered = render_template(liquid_template, **sample_data)
 
         logger.info(f"Template preview rendered successfully ({len(rendered)} chars)")
         return rendered
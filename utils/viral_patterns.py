@@ -39,6 +39,23 @@ class ViralPatternsDB:
             logger.error(f"Error parsing viral patterns JSON: {e}")
             self.patterns = []
 
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """
+        Build lookup indexes over the loaded patterns.
+
+        Patterns are indexed by id and by platform (pre-sorted by success_rate),
+        so per-platform lookups don't rescan and resort the full list.
+        """
+        self._patterns_by_id = {p['id']: p for p in self.patterns}
+        self._patterns_by_platform: Dict[str, List[Dict]] = {}
+        for pattern in self.patterns:
+            for platform in pattern['platform']:
+                self._patterns_by_platform.setdefault(platform, []).append(pattern)
+        for platform_patterns in self._patterns_by_platform.values():
+            platform_patterns.sort(key=lambda p: p['success_rate'], reverse=True)
+
     def get_all_patterns(self) -> List[Dict]:
         """Get all viral patterns."""
         return self.patterns
@@ -53,10 +70,10 @@ class ViralPatternsDB:
         Returns:
             Pattern dict or None if not found
         """
-        for pattern in self.patterns:
-            if pattern['id'] == pattern_id:
-                logger.info(f"Found pattern: {pattern['name']} (id: {pattern_id})")
-                return pattern
+        pattern = self._patterns_by_id.get(pattern_id)
+        if pattern:
+            logger.info(f"Found pattern: {pattern['name']} (id: {pattern_id})")
+            return pattern
 
         logger.warning(f"Pattern not found: {pattern_id}")
         return None
@@ -71,8 +88,7 @@ class ViralPatternsDB:
         Returns:
             List of matching patterns sorted by success_rate
         """
-        matching = [p for p in self.patterns if platform in p['platform']]
-        matching.sort(key=lambda p: p['success_rate'], reverse=True)
+        matching = list(self._patterns_by_platform.get(platform, []))
 
         logger.info(f"Found {len(matching)} patterns for platform: {platform}")
         return matching
@@ -94,8 +110,8 @@ class ViralPatternsDB:
         Returns:
             List of best-matching patterns sorted by success_rate
         """
-        # First filter by platform
-        platform_matches = [p for p in self.patterns if platform in p['platform']]
+        # First filter by platform (index is already sorted by success_rate)
+        platform_matches = self._patterns_by_platform.get(platform, [])
 
         # Then filter by content type in best_for
         content_matches = []
@@ -113,9 +129,7 @@ class ViralPatternsDB:
             logger.info(f"No exact content_type matches for '{content_type}', returning top platform patterns")
             content_matches = platform_matches
 
-        # Sort by success_rate
-        content_matches.sort(key=lambda p: p['success_rate'], reverse=True)
-
+        # Already sorted by success_rate (filtering preserves index order)
         top_patterns = content_matches[:top_n]
         logger.info(
             f"Found {len(top_patterns)} best patterns for platform={platform}, content_type={content_type}"